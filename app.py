@@ -4,8 +4,18 @@ import dash_bootstrap_components as dbc
 from flask import Flask
 import flask
 import os
+import threading
 from dotenv import load_dotenv
 from src.utils.auth import get_user_display_info
+from src.logic.payments import get_payment_processor
+from src.logic.outbox import get_outbox_dispatcher
+from src.logic.kpis import get_kpi_reconciler
+from src.logic.audit import audit, get_audit_log
+from src.logic.reports import get_report_scheduler
+from src.logic.aircraft_conflicts import get_aircraft_schedule_index
+from src.models.audit import AuditCategory
+from src.utils.migrations import run_migrations
+from src.utils.routes import routes
 
 # Load environment variables
 load_dotenv()
@@ -14,6 +24,9 @@ load_dotenv()
 server = Flask(__name__)
 server.secret_key = os.getenv("SECRET_KEY", "default-dev-key-replace-in-production")
 
+# Plain Flask endpoints, e.g. file exports
+server.register_blueprint(routes)
+
 # Initialize the Dash app with the Flask server
 app = dash.Dash(
     __name__,
@@ -186,6 +199,8 @@ def update_navigation(logout_trigger, login_status):
 )
 def handle_logout(n_clicks):
     if n_clicks:
+        audit(AuditCategory.AUTH, "logout")
+        
         # Clear the session
         flask.session.clear()
         
@@ -224,6 +239,8 @@ def handle_logout(n_clicks):
 )
 def nav_logout(n_clicks):
     if n_clicks:
+        audit(AuditCategory.AUTH, "logout")
+        
         # Clear the session
         flask.session.clear()
         
@@ -254,5 +271,48 @@ def nav_logout(n_clicks):
         return logged_out_nav, logged_out_header
     return no_update, no_update
 
+_services_started = False
+_services_lock = threading.Lock()
+
+def start_background_services():
+    """
+    Start the background services once per process.
+
+    Called from the first request rather than at import or under __main__, so
+    they run in whichever process serves requests: only the serving child of
+    the debug reloader, and every worker of a WSGI server.
+    """
+    global _services_started
+    with _services_lock:
+        if _services_started:
+            return
+        _services_started = True
+        
+        # Pick up payments that were still pending when the server last stopped
+        get_payment_processor().resume_pending()
+        
+        # Deliver any messages left in the outbox
+        get_outbox_dispatcher().start()
+        
+        # Recount the admin KPI snapshot now and then periodically
+        get_kpi_reconciler().start()
+        
+        # Write audit events in the background
+        get_audit_log().start()
+        
+        # Build the admin and staff reports in the background
+        get_report_scheduler().start()
+        
+        # Load every aircraft's upcoming schedules for the conflict checks on schedule creation
+        get_aircraft_schedule_index().refresh()
+
+@server.before_request
+def _start_background_services():
+    if not _services_started:
+        start_background_services()
+
 if __name__ == '__main__':
-    app.run_server(debug=True) 
\ No newline at end of file
+    # Add any tables or indexes introduced since the database was created
+    run_migrations()
+    
+    app.run_server(debug=True)
\ No newline at end of file
@@ -0,0 +1,82 @@
+// Live flight boards. Each browser tab holds one EventSource on
+// /events/flight-board and buffers the change events it receives; every board
+// on the page applies the buffered events to its own rows in the browser, so
+// an unchanged board costs no request at all.
+
+(function () {
+    var MAX_BUFFERED_EVENTS = 200;
+
+    var stream = {source: null, events: []};
+
+    function connect(since) {
+        var url = "/events/flight-board" + (since === null || since === undefined ? "" : "?since=" + since);
+        var source = new EventSource(url);
+        source.onmessage = function (message) {
+            stream.events.push(JSON.parse(message.data));
+            if (stream.events.length > MAX_BUFFERED_EVENTS) {
+                stream.events.splice(0, stream.events.length - MAX_BUFFERED_EVENTS);
+            }
+        };
+        // The server fell behind on this stream; reconnect and let it catch up from the last event
+        source.addEventListener("reset", function () {
+            var last = stream.events.length ? stream.events[stream.events.length - 1].version : since;
+            source.close();
+            connect(last);
+        });
+        stream.source = source;
+    }
+
+    function lastDay(day, days) {
+        var end = new Date(day + "T00:00:00Z");
+        end.setUTCDate(end.getUTCDate() + days);
+        return end.toISOString().slice(0, 10);
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        flight_board: {
+            apply_events: function (n_intervals, reload, data, state) {
+                var no_update = window.dash_clientside.no_update;
+                var triggered = window.dash_clientside.callback_context.triggered;
+
+                // A full reload sent by the server
+                if (reload && triggered.some(function (t) { return t.prop_id.indexOf("flight-board-reload") !== -1; })) {
+                    return [reload.data, reload.state, no_update];
+                }
+                if (!state || !window.EventSource) {
+                    return [no_update, no_update, no_update];
+                }
+                if (!stream.source) {
+                    connect(state.version);
+                }
+
+                var pending = stream.events.filter(function (event) { return event.version > state.version; });
+                if (!pending.length) {
+                    return [no_update, no_update, no_update];
+                }
+                // Events were missed between the board's version and the first one buffered
+                if (pending[0].since > state.version) {
+                    return [no_update, no_update, {version: state.version, requested: n_intervals}];
+                }
+
+                var end = lastDay(state.day, state.days);
+                var rows = data.slice();
+                for (var i = 0; i < pending.length; i++) {
+                    for (var j = 0; j < pending[i].rows.length; j++) {
+                        var row = Object.assign({}, pending[i].rows[j]);
+                        var position = state.index[String(row.id)];
+                        var onBoard = row.day >= state.day && row.day < end;
+                        delete row.day;
+                        if (position !== undefined && onBoard) {
+                            rows[position] = row;
+                        } else if (position !== undefined || onBoard) {
+                            // A schedule joined or left the board; the server rebuilds it
+                            return [no_update, no_update, {version: state.version, requested: n_intervals}];
+                        }
+                    }
+                }
+                var updated = Object.assign({}, state, {version: pending[pending.length - 1].version});
+                return [rows, updated, no_update];
+            }
+        }
+    });
+})();
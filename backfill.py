@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+import argparse
+from src.utils.database import get_session
+from src.utils.migrations import run_migrations
+from src.logic.ratings import backfill_rating_aggregates, BACKFILL_CHUNK_SIZE
+from src.logic.kpis import reconcile_kpis
+from src.logic.booking_stats import backfill_booking_daily_stats
+
+def backfill_ratings(args):
+    """Rebuild the rating aggregates from every existing rating"""
+    session = get_session()
+    try:
+        total = backfill_rating_aggregates(session, chunk_size=args.chunk_size)
+        session.commit()
+        print(f"Aggregated {total} ratings")
+    except Exception as e:
+        session.rollback()
+        print(f"Error backfilling rating aggregates: {e}")
+        raise
+    finally:
+        session.close()
+
+def backfill_kpis(args):
+    """Recount the admin KPI snapshot from the source tables"""
+    session = get_session()
+    try:
+        reconcile_kpis(session)
+        session.commit()
+        print("Recounted the KPI snapshot")
+    except Exception as e:
+        session.rollback()
+        print(f"Error recounting KPI snapshot: {e}")
+        raise
+    finally:
+        session.close()
+
+def backfill_daily_stats(args):
+    """Rebuild the daily booking and revenue rollup from every booking"""
+    session = get_session()
+    try:
+        days = backfill_booking_daily_stats(session)
+        session.commit()
+        print(f"Rolled up bookings for {days} days")
+    except Exception as e:
+        session.rollback()
+        print(f"Error backfilling booking daily stats: {e}")
+        raise
+    finally:
+        session.close()
+
+# Available backfills, by command name
+COMMANDS = {
+    "rating-aggregates": backfill_ratings,
+    "kpis": backfill_kpis,
+    "booking-daily-stats": backfill_daily_stats,
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="One-time backfills of derived tables")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    parser.add_argument("--chunk-size", type=int, default=BACKFILL_CHUNK_SIZE)
+    args = parser.parse_args()
+    
+    # Make sure the target tables exist first
+    run_migrations()
+    
+    print(f"Running backfill: {args.command}")
+    COMMANDS[args.command](args)
@@ -0,0 +1,129 @@
+"""
+Aircraft conflict checks for new schedules: an overlap query per proposed
+schedule versus the in-memory aircraft schedule index, against a fleet
+with a year of back-to-back schedules. Also times rebuilding the index, as
+done on startup.
+
+Run from the repository root:
+    python -m benchmarks.aircraft_conflicts [--aircraft 50] [--flights-per-day 6] [--days 365] [--checks 2000]
+"""
+
+import argparse
+import datetime
+import random
+from benchmarks.common import use_temp_database, seed_minimal, Timer
+
+use_temp_database()
+
+from sqlalchemy import insert, select
+from src.utils.database import session_factory
+from src.utils.migrations import run_migrations
+from src.models.aircraft import Aircraft
+from src.models.flight import Flight, FlightSchedule, FlightStatus
+from src.logic.aircraft_conflicts import AircraftScheduleIndex, ScheduleConflict, MIN_TURNAROUND_MINUTES
+
+TURNAROUND = datetime.timedelta(minutes=MIN_TURNAROUND_MINUTES)
+
+def seed(session, user_id, aircraft, flights_per_day, days):
+    """A fleet flying 90 minute sectors with 45 minute turns, every day for days"""
+    session.execute(insert(Aircraft), [
+        {
+            "model_number": "A320-200", "serial_number": f"LOAD-{i}", "registration_number": f"G-L{i:03d}",
+            "manufacturer": "Airbus", "date_of_manufacture": datetime.date(2015, 1, 1),
+            "aircraft_class": "Narrow-body", "generic_name": "Airbus A320", "number_of_engines": 2,
+        }
+        for i in range(aircraft)
+    ])
+    aircraft_ids = [row.id for row in session.query(Aircraft.id).filter(Aircraft.serial_number.like("LOAD-%"))]
+    session.execute(insert(Flight), [
+        {"flight_number": f"NL{i:03d}", "aircraft_id": aircraft_id, "created_by_user_id": user_id, "base_cost": 99.99}
+        for i, aircraft_id in enumerate(aircraft_ids)
+    ])
+    flight_ids = [row.id for row in session.query(Flight.id).filter(Flight.flight_number.like("NL%"))]
+
+    first_day = datetime.datetime.combine(datetime.date.today() + datetime.timedelta(days=1), datetime.time(6, 0))
+    for day in range(days):
+        first = first_day + datetime.timedelta(days=day)
+        session.execute(insert(FlightSchedule), [
+            {
+                "flight_id": flight_id, "departure_airport": "LHR", "arrival_airport": "EDI",
+                "scheduled_departure_time": first + datetime.timedelta(minutes=135 * leg),
+                "scheduled_arrival_time": first + datetime.timedelta(minutes=135 * leg + 90),
+                "status": FlightStatus.SCHEDULED,
+            }
+            for flight_id in flight_ids
+            for leg in range(flights_per_day)
+        ])
+    session.commit()
+    return aircraft_ids, first_day
+
+def overlap_query(session, aircraft_id, departure, arrival):
+    """The straightforward check: ask the database for a clashing schedule"""
+    return session.execute(select(FlightSchedule.id).join(
+        Flight, FlightSchedule.flight_id == Flight.id
+    ).where(
+        Flight.aircraft_id == aircraft_id,
+        FlightSchedule.status != FlightStatus.CANCELLED,
+        FlightSchedule.scheduled_departure_time < arrival + TURNAROUND,
+        FlightSchedule.scheduled_arrival_time > departure - TURNAROUND
+    ).limit(1)).scalar()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--aircraft", type=int, default=50)
+    parser.add_argument("--flights-per-day", type=int, default=6)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--checks", type=int, default=2000)
+    args = parser.parse_args()
+
+    run_migrations()
+    session = session_factory()
+    user, _, _ = seed_minimal(session, schedules=0)
+    aircraft_ids, first_day = seed(session, user.id, args.aircraft, args.flights_per_day, args.days)
+    print(f"{args.aircraft * args.flights_per_day * args.days} schedules on {args.aircraft} aircraft")
+
+    index = AircraftScheduleIndex()
+    with Timer() as timer:
+        index.refresh(session)
+    print(f"  rebuild index        {timer.elapsed * 1000:>9.1f} ms")
+
+    # Random 90 minute slots over the year; with the fleet this busy, most of them clash
+    random.seed(1)
+    proposals = [
+        (
+            random.choice(aircraft_ids),
+            first_day + datetime.timedelta(days=random.randrange(args.days), minutes=15 * random.randrange(96))
+        )
+        for _ in range(args.checks)
+    ]
+    proposals = [(aircraft_id, departure, departure + datetime.timedelta(minutes=90)) for aircraft_id, departure in proposals]
+
+    with Timer() as timer:
+        clashes = sum(
+            overlap_query(session, aircraft_id, departure, arrival) is not None
+            for aircraft_id, departure, arrival in proposals
+        )
+    print(f"  overlap query        {timer.elapsed * 1e6 / len(proposals):>9.1f} us/check   ({clashes} clashes)")
+
+    # A rejection also reads the conflicting schedule to describe it, so free slots are timed on their own
+    def clashes_in_index(aircraft_id, departure, arrival):
+        try:
+            index.check(session, {aircraft_id: [(departure, arrival)]})
+            return False
+        except ScheduleConflict:
+            return True
+
+    with Timer() as timer:
+        clashing = [clashes_in_index(*proposal) for proposal in proposals]
+    print(f"  schedule index       {timer.elapsed * 1e6 / len(proposals):>9.1f} us/check   ({sum(clashing)} clashes)")
+
+    free = [proposal for proposal, clash in zip(proposals, clashing) if not clash]
+    with Timer() as timer:
+        for proposal in free:
+            clashes_in_index(*proposal)
+    print(f"  index, free slots    {timer.elapsed * 1e6 / len(free):>9.1f} us/check")
+
+    session.close()
+
+if __name__ == "__main__":
+    main()
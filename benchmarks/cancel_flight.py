@@ -0,0 +1,111 @@
+"""
+Cancelling a full 300-seat flight: row-by-row handling versus the set-based handler.
+
+Run from the repository root:
+    python -m benchmarks.cancel_flight [--seats 300] [--rounds 5]
+"""
+
+import argparse
+import datetime
+from benchmarks.common import use_temp_database, seed_minimal, Timer
+
+use_temp_database()
+
+from sqlalchemy import insert, update, func
+from src.utils.database import init_db, session_factory
+from src.models.booking import Booking, PaymentStatus
+from src.models.flight import FlightSchedule, FlightStatus
+from src.logic.disruption import handle_schedule_cancellation, SEAT_HOLDING_STATUSES
+
+def fill(session, user_id, schedule_id, count, offset):
+    """Insert seat-holding bookings directly, bypassing the ORM"""
+    now = datetime.datetime.now()
+    session.execute(insert(Booking), [
+        {
+            "passenger_id": user_id,
+            "flight_schedule_id": schedule_id,
+            "booking_date": now - datetime.timedelta(minutes=i),
+            "confirmation_code": f"B{offset + i:07d}",
+            "cost_charged": 99.99,
+            "thank_you_sent": False,
+            "payment_status": PaymentStatus.COMPLETED,
+        }
+        for i in range(count)
+    ])
+
+def reset(session, cancelled, booking_ids):
+    """Put the cancelled flight and its bookings back as they were"""
+    session.execute(
+        update(Booking).where(Booking.id.in_(booking_ids)).values(
+            flight_schedule_id=cancelled.id, payment_status=PaymentStatus.COMPLETED
+        )
+    )
+    cancelled.status = FlightStatus.SCHEDULED
+    session.commit()
+
+def row_by_row(session, cancelled, capacity):
+    """The naive approach: load every booking, find it a seat, update it"""
+    cancelled.status = FlightStatus.CANCELLED
+    candidates = session.query(FlightSchedule).filter(
+        FlightSchedule.id != cancelled.id,
+        FlightSchedule.departure_airport == cancelled.departure_airport,
+        FlightSchedule.arrival_airport == cancelled.arrival_airport,
+        FlightSchedule.scheduled_departure_time > cancelled.scheduled_departure_time
+    ).order_by(FlightSchedule.scheduled_departure_time).all()
+
+    bookings = session.query(Booking).filter(
+        Booking.flight_schedule_id == cancelled.id,
+        Booking.payment_status.in_(SEAT_HOLDING_STATUSES)
+    ).order_by(Booking.booking_date, Booking.id).all()
+
+    for booking in bookings:
+        for candidate in candidates:
+            booked = session.query(func.count(Booking.id)).filter(
+                Booking.flight_schedule_id == candidate.id,
+                Booking.payment_status.in_(SEAT_HOLDING_STATUSES)
+            ).scalar()
+            if booked < capacity:
+                booking.flight_schedule_id = candidate.id
+                break
+        else:
+            booking.payment_status = PaymentStatus.REFUNDED
+        session.flush()
+    session.commit()
+
+def set_based(session, cancelled, capacity):
+    cancelled.status = FlightStatus.CANCELLED
+    handle_schedule_cancellation(session, cancelled)
+    session.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seats", type=int, default=300)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    init_db()
+    session = session_factory()
+    user, _, schedules = seed_minimal(session, schedules=4, capacity=args.seats)
+    cancelled, later = schedules[0], schedules[1:]
+
+    # A full flight to cancel, and later flights on the same route with room for a third each
+    fill(session, user.id, cancelled.id, args.seats, 0)
+    for index, schedule in enumerate(later):
+        fill(session, user.id, schedule.id, args.seats * 2 // 3, (index + 1) * args.seats)
+    session.commit()
+    booking_ids = [row.id for row in session.query(Booking.id).filter(Booking.flight_schedule_id == cancelled.id)]
+
+    print(f"Cancelling a flight with {len(booking_ids)} bookings ({args.rounds} rounds each)")
+    for label, strategy in (("row by row", row_by_row), ("set based", set_based)):
+        timings = []
+        for _ in range(args.rounds):
+            with Timer() as timer:
+                strategy(session, cancelled, args.seats)
+            timings.append(timer.elapsed)
+            reset(session, cancelled, booking_ids)
+        print(f"  {label:<12} best {min(timings) * 1000:>9.1f} ms   mean {sum(timings) / len(timings) * 1000:>9.1f} ms")
+
+    session.close()
+
+if __name__ == "__main__":
+    main()
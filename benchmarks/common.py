@@ -0,0 +1,68 @@
+"""
+Shared setup for the benchmark scripts.
+
+Every benchmark runs against a throwaway SQLite file so it never touches
+northeastern_airways.db. Call use_temp_database() before importing anything
+from src, because the engine is created when src.utils.database is imported.
+"""
+
+import atexit
+import datetime
+import os
+import shutil
+import tempfile
+import time
+
+def use_temp_database():
+    """Point DATABASE_URL at a fresh temporary SQLite file and return its path"""
+    directory = tempfile.mkdtemp(prefix="ne-airways-bench-")
+    atexit.register(shutil.rmtree, directory, ignore_errors=True)
+    path = os.path.join(directory, "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    return path
+
+def seed_minimal(session, schedules=1, capacity=189):
+    """Create one passenger, aircraft and flight with a number of upcoming schedules"""
+    from src.models.user import User
+    from src.models.aircraft import Aircraft
+    from src.models.flight import Flight, FlightSchedule, FlightStatus
+
+    user = User(
+        first_name="Bench", last_name="User", email="bench@example.com",
+        password_hash="x", phone_number="0", street="1 Bench Street",
+        city="London", postal_code="E1 6AN", country="United Kingdom"
+    )
+    aircraft = Aircraft(
+        model_number="A320-200", serial_number="BENCH-1", registration_number="G-BNCH",
+        manufacturer="Airbus", date_of_manufacture=datetime.date(2015, 1, 1),
+        aircraft_class="Narrow-body", generic_name="Airbus A320", number_of_engines=2,
+        aip_info=f"Max altitude: 39,000ft, Range: 6,100km, Capacity: {capacity} passengers"
+    )
+    flight = Flight(flight_number="NE999", aircraft=aircraft, created_by_user=user, base_cost=99.99)
+
+    departure = datetime.datetime.now().replace(minute=0, second=0, microsecond=0) + datetime.timedelta(days=1)
+    flight_schedules = [
+        FlightSchedule(
+            flight=flight,
+            departure_airport="LHR",
+            arrival_airport="EDI",
+            scheduled_departure_time=departure + datetime.timedelta(hours=3 * i),
+            scheduled_arrival_time=departure + datetime.timedelta(hours=3 * i, minutes=90),
+            status=FlightStatus.SCHEDULED
+        )
+        for i in range(schedules)
+    ]
+
+    session.add_all([user, aircraft, flight] + flight_schedules)
+    session.commit()
+    return user, flight, flight_schedules
+
+class Timer:
+    """Context manager measuring wall-clock seconds"""
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
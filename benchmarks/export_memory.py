@@ -0,0 +1,74 @@
+"""
+Memory use of the streaming booking export: the process's resident set size is
+sampled after every chunk while a full CSV export is read and discarded.
+
+Linux only (reads /proc/self/status). Run from the repository root:
+    python -m benchmarks.export_memory [--bookings 3000000] [--batch-size 1000]
+"""
+
+import argparse
+import datetime
+import gc
+from benchmarks.common import use_temp_database, seed_minimal, Timer
+
+use_temp_database()
+
+from sqlalchemy import insert
+from src.utils.database import init_db, session_factory
+from src.models.booking import Booking, PaymentStatus
+from src.logic.exports import stream_bookings_csv
+
+# Rows per INSERT batch while seeding
+SEED_CHUNK = 50000
+
+def rss_kb():
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+def seed(session, user_id, schedule_id, bookings):
+    booked = datetime.datetime.now() - datetime.timedelta(days=30)
+    for start in range(0, bookings, SEED_CHUNK):
+        session.execute(insert(Booking), [
+            {
+                "passenger_id": user_id,
+                "flight_schedule_id": schedule_id,
+                "booking_date": booked + datetime.timedelta(seconds=i),
+                "confirmation_code": f"X{i:09d}",
+                "cost_charged": 99.99,
+                "thank_you_sent": False,
+                "payment_status": PaymentStatus.COMPLETED,
+            }
+            for i in range(start, min(start + SEED_CHUNK, bookings))
+        ])
+        session.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bookings", type=int, default=3000000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    init_db()
+    session = session_factory()
+    user, _, schedules = seed_minimal(session, schedules=1)
+    with Timer() as timer:
+        seed(session, user.id, schedules[0].id, args.bookings)
+    session.close()
+    print(f"Seeded {args.bookings} bookings in {timer.elapsed:.1f} s")
+
+    gc.collect()
+    baseline = peak = rss_kb()
+    exported_bytes = 0
+    with Timer() as timer:
+        for chunk in stream_bookings_csv(args.batch_size):
+            exported_bytes += len(chunk)
+            peak = max(peak, rss_kb())
+
+    print(f"Exported {exported_bytes / 1e6:.0f} MB of CSV in {timer.elapsed:.1f} s")
+    print(f"RSS before {baseline / 1024:.1f} MB, peak {peak / 1024:.1f} MB (+{(peak - baseline) / 1024:.1f} MB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Bookings per second: one commit per booking versus the group-commit writer.
+Both paths do the same work after each commit: repricing the schedule and
+dropping the passenger's cached itineraries.
+
+Run from the repository root:
+    python -m benchmarks.group_commit [--bookings 2000] [--threads 16]
+"""
+
+import argparse
+import threading
+from benchmarks.common import use_temp_database, seed_minimal, Timer
+
+use_temp_database()
+
+from src.utils.database import init_db, session_factory
+from src.logic.bookings import place_booking
+from src.logic.booking_queue import BookingCommitQueue
+
+def run_threads(threads, bookings, work):
+    """Split the bookings across worker threads, like concurrent web requests"""
+    per_thread = bookings // threads
+    workers = [threading.Thread(target=work, args=(per_thread,)) for _ in range(threads)]
+    with Timer() as timer:
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    return per_thread * threads, timer.elapsed
+
+def per_request_commit(user_id, schedule_id, bookings, threads):
+    def work(count):
+        session = session_factory()
+        try:
+            for _ in range(count):
+                place_booking(session, user_id, schedule_id, 1)
+        finally:
+            session.close()
+
+    return run_threads(threads, bookings, work)
+
+def group_commit(user_id, schedule_id, bookings, threads):
+    booking_queue = BookingCommitQueue()
+    booking_queue.start()
+
+    def work(count):
+        for _ in range(count):
+            booking_queue.submit(user_id, schedule_id, 1).result()
+
+    try:
+        return run_threads(threads, bookings, work)
+    finally:
+        booking_queue.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bookings", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=16)
+    args = parser.parse_args()
+
+    init_db()
+    session = session_factory()
+    user, _, schedules = seed_minimal(session)
+    user_id, schedule_id = user.id, schedules[0].id
+    session.close()
+
+    print(f"Booking {args.bookings} seats from {args.threads} threads")
+    for label, strategy in (("per-request commit", per_request_commit), ("group commit", group_commit)):
+        count, elapsed = strategy(user_id, schedule_id, args.bookings, args.threads)
+        print(f"  {label:<20} {count / elapsed:>10,.0f} bookings/s  ({elapsed:.2f}s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Home page latency with a large bookings table: the old two queries plus lazy
+loads, the single UNION ALL dashboard query, and the per-user cache.
+
+Run from the repository root:
+    python -m benchmarks.home_dashboard [--bookings 1000000] [--users 10000] [--samples 200]
+"""
+
+import argparse
+import datetime
+import random
+from benchmarks.common import use_temp_database, seed_minimal, Timer
+
+use_temp_database()
+
+from sqlalchemy import insert
+from src.utils.database import session_factory
+from src.utils.migrations import run_migrations
+from src.models.user import User
+from src.models.booking import Booking, PaymentStatus
+from src.models.flight import FlightSchedule, FlightStatus
+from src.logic.itineraries import home_dashboard
+from src.logic.itinerary_cache import ItineraryCache
+
+# Rows per INSERT batch while seeding
+SEED_CHUNK = 50000
+
+def seed(session, flight_id, bookings, users, schedules):
+    """Bulk insert passengers, a year of schedules either side of today, and bookings"""
+    now = datetime.datetime.now().replace(minute=0, second=0, microsecond=0)
+
+    session.execute(insert(User), [
+        {
+            "first_name": "Load", "last_name": f"Test {i}", "email": f"load{i}@example.com",
+            "password_hash": "x", "phone_number": "0", "street": "1 Load Street",
+            "city": "London", "postal_code": "E1 6AN", "country": "United Kingdom",
+        }
+        for i in range(users)
+    ])
+    user_ids = [row.id for row in session.query(User.id)]
+
+    session.execute(insert(FlightSchedule), [
+        {
+            "flight_id": flight_id, "departure_airport": "LHR", "arrival_airport": "EDI",
+            "scheduled_departure_time": now + datetime.timedelta(hours=i * 2 - schedules),
+            "scheduled_arrival_time": now + datetime.timedelta(hours=i * 2 - schedules, minutes=90),
+            "status": FlightStatus.SCHEDULED,
+        }
+        for i in range(schedules)
+    ])
+    schedule_ids = [row.id for row in session.query(FlightSchedule.id)]
+
+    rng = random.Random(0)
+    for start in range(0, bookings, SEED_CHUNK):
+        session.execute(insert(Booking), [
+            {
+                "passenger_id": rng.choice(user_ids),
+                "flight_schedule_id": rng.choice(schedule_ids),
+                "booking_date": now - datetime.timedelta(minutes=rng.randrange(500000)),
+                "confirmation_code": f"L{i:09d}",
+                "cost_charged": 99.99,
+                "thank_you_sent": False,
+                "payment_status": PaymentStatus.COMPLETED,
+            }
+            for i in range(start, min(start + SEED_CHUNK, bookings))
+        ])
+    session.commit()
+    return user_ids
+
+def two_queries(session, user_id):
+    """What the home page used to do: two ORM queries, then lazy loads per card"""
+    now = datetime.datetime.now()
+    upcoming = session.query(Booking).join(Booking.flight_schedule).filter(
+        Booking.passenger_id == user_id,
+        Booking.flight_schedule.has(FlightSchedule.scheduled_departure_time > now)
+    ).order_by(FlightSchedule.scheduled_departure_time.asc()).limit(3).all()
+    session.query(Booking).join(Booking.flight_schedule).filter(
+        Booking.passenger_id == user_id
+    ).order_by(Booking.booking_date.desc()).limit(3).all()
+    for booking in upcoming:
+        booking.flight_schedule.flight.flight_number
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bookings", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--schedules", type=int, default=8760)
+    parser.add_argument("--samples", type=int, default=200)
+    args = parser.parse_args()
+
+    run_migrations()
+    session = session_factory()
+    _, flight, _ = seed_minimal(session, schedules=0)
+    with Timer() as timer:
+        user_ids = seed(session, flight.id, args.bookings, args.users, args.schedules)
+    session.close()
+    print(f"Seeded {args.bookings} bookings for {len(user_ids)} users in {timer.elapsed:.1f} s")
+
+    sample = random.Random(1).sample(user_ids, min(args.samples, len(user_ids)))
+    cache = ItineraryCache(session_factory)
+
+    def run_two_queries(user_id):
+        session = session_factory()
+        try:
+            two_queries(session, user_id)
+        finally:
+            session.close()
+
+    def run_single_query(user_id):
+        session = session_factory()
+        try:
+            home_dashboard(session, user_id)
+        finally:
+            session.close()
+
+    print(f"Home page data for {len(sample)} users")
+    for label, load in (
+        ("two queries + lazy", run_two_queries),
+        ("single query", run_single_query),
+        ("cache (cold)", cache.home),
+        ("cache (warm)", cache.home),
+    ):
+        timings = []
+        for user_id in sample:
+            with Timer() as timer:
+                load(user_id)
+            timings.append(timer.elapsed)
+        timings.sort()
+        print(
+            f"  {label:<20} p50 {timings[len(timings) // 2] * 1000:>8.2f} ms"
+            f"   p95 {timings[int(len(timings) * 0.95)] * 1000:>8.2f} ms"
+        )
+
+if __name__ == "__main__":
+    main()
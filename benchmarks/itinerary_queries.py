@@ -0,0 +1,130 @@
+"""
+Statements issued to render the My Bookings tabs for a frequent flyer:
+lazy-loaded ORM bookings versus the itinerary read model.
+
+Exits non-zero if the read model goes over its query budget, so it can be
+run as a check as well as a benchmark.
+
+Run from the repository root:
+    python -m benchmarks.itinerary_queries [--past 200] [--upcoming 20]
+"""
+
+import argparse
+import datetime
+import sys
+from benchmarks.common import use_temp_database, seed_minimal, Timer
+
+use_temp_database()
+
+from sqlalchemy import event, insert
+from src.utils.database import session_factory, engine
+from src.utils.migrations import run_migrations
+from src.models.booking import Booking, PaymentStatus
+from src.models.flight import FlightSchedule, FlightStatus
+from src.models.rating import Rating
+from src.logic.itineraries import upcoming_itineraries, past_itineraries
+
+# Most statements either tab may issue, however long the history
+QUERY_BUDGET = 2
+
+class QueryCounter:
+    """Counts statements sent to the engine while active"""
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+def seed_history(session, user_id, flight_id, past, upcoming):
+    """One schedule per trip, half of the past trips rated"""
+    now = datetime.datetime.now().replace(minute=0, second=0, microsecond=0)
+    departures = [now - datetime.timedelta(days=i + 1) for i in range(past)]
+    departures += [now + datetime.timedelta(days=i + 1) for i in range(upcoming)]
+
+    schedules = [
+        FlightSchedule(
+            flight_id=flight_id, departure_airport="LHR", arrival_airport="EDI",
+            scheduled_departure_time=departure,
+            scheduled_arrival_time=departure + datetime.timedelta(minutes=90),
+            status=FlightStatus.LANDED if departure < now else FlightStatus.SCHEDULED
+        )
+        for departure in departures
+    ]
+    session.add_all(schedules)
+    session.flush()
+
+    bookings = [
+        Booking(
+            passenger_id=user_id, flight_schedule_id=schedule.id,
+            confirmation_code=f"H{index:07d}", cost_charged=99.99,
+            payment_status=PaymentStatus.COMPLETED
+        )
+        for index, schedule in enumerate(schedules)
+    ]
+    session.add_all(bookings)
+    session.flush()
+    session.execute(insert(Rating), [
+        {"booking_id": booking.id, "stars": 4, "created_at": now}
+        for booking in bookings[:past:2]
+    ])
+    session.commit()
+
+def lazy_cards(session, user_id, upcoming):
+    """What the tabs used to do: load bookings, then touch each relationship"""
+    now = datetime.datetime.now()
+    comparison = (
+        FlightSchedule.scheduled_departure_time > now if upcoming
+        else FlightSchedule.scheduled_departure_time <= now
+    )
+    bookings = session.query(Booking).join(Booking.flight_schedule).filter(
+        Booking.passenger_id == user_id, comparison
+    ).all()
+    for booking in bookings:
+        booking.flight_schedule.flight.flight_number
+        if not upcoming:
+            booking.rating
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--past", type=int, default=200)
+    parser.add_argument("--upcoming", type=int, default=20)
+    args = parser.parse_args()
+
+    run_migrations()
+    session = session_factory()
+    user, flight, _ = seed_minimal(session, schedules=0)
+    seed_history(session, user.id, flight.id, args.past, args.upcoming)
+    user_id = user.id
+    session.close()
+
+    print(f"Rendering My Bookings for {args.past} past and {args.upcoming} upcoming trips")
+    over_budget = False
+    for label, upcoming, read_model in (
+        ("upcoming", True, upcoming_itineraries),
+        ("past", False, past_itineraries),
+    ):
+        for approach, load in (
+            ("lazy loading", lambda session: lazy_cards(session, user_id, upcoming)),
+            ("read model", lambda session: read_model(session, user_id)),
+        ):
+            # A fresh session each time, so nothing is served from the identity map
+            session = session_factory()
+            with QueryCounter() as counter, Timer() as timer:
+                load(session)
+            session.close()
+            print(f"  {label:<9} {approach:<13} {counter.count:>5} queries {timer.elapsed * 1000:>8.1f} ms")
+            if approach == "read model" and counter.count > QUERY_BUDGET:
+                over_budget = True
+
+    if over_budget:
+        print(f"Read model exceeded the budget of {QUERY_BUDGET} queries per tab")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Repricing many schedules: the vectorised fare computation, a full price table
+refresh from the database, and the incremental update after a booking.
+
+Run from the repository root:
+    python -m benchmarks.pricing [--schedules 100000] [--rounds 5]
+"""
+
+import argparse
+import datetime
+import numpy as np
+from benchmarks.common import use_temp_database, seed_minimal, Timer
+
+use_temp_database()
+
+from sqlalchemy import insert
+from src.utils.database import init_db, session_factory
+from src.models.flight import FlightSchedule, FlightStatus
+from src.logic.pricing import PriceTable, compute_fares
+
+def add_schedules(session, flight_id, count):
+    """Insert upcoming schedules directly, bypassing the ORM"""
+    start = datetime.datetime.now().replace(minute=0, second=0, microsecond=0) + datetime.timedelta(days=1)
+    session.execute(insert(FlightSchedule), [
+        {
+            "flight_id": flight_id,
+            "departure_airport": "LHR",
+            "arrival_airport": "EDI",
+            "scheduled_departure_time": start + datetime.timedelta(minutes=5 * i),
+            "scheduled_arrival_time": start + datetime.timedelta(minutes=5 * i + 90),
+            "status": FlightStatus.SCHEDULED,
+        }
+        for i in range(count)
+    ])
+    session.commit()
+
+def report(label, timings):
+    print(f"  {label:<22} best {min(timings) * 1000:>9.2f} ms   mean {sum(timings) / len(timings) * 1000:>9.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--schedules", type=int, default=100000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    # Pure computation on synthetic inputs
+    rng = np.random.default_rng(0)
+    inputs = (
+        rng.uniform(50, 300, args.schedules),
+        rng.uniform(0, 365, args.schedules),
+        rng.uniform(0, 1, args.schedules),
+        rng.integers(0, 7, args.schedules),
+        rng.uniform(0.5, 1.5, args.schedules),
+    )
+    print(f"Pricing {args.schedules} schedules ({args.rounds} rounds each)")
+    timings = []
+    for _ in range(args.rounds):
+        with Timer() as timer:
+            compute_fares(*inputs)
+        timings.append(timer.elapsed)
+    report("compute_fares", timings)
+
+    # Full refresh from the database
+    init_db()
+    session = session_factory()
+    _, flight, _ = seed_minimal(session, schedules=0)
+    add_schedules(session, flight.id, args.schedules)
+    table = PriceTable(session_factory)
+    timings = []
+    for _ in range(args.rounds):
+        with Timer() as timer:
+            table.refresh(session)
+        timings.append(timer.elapsed)
+    report("refresh from database", timings)
+
+    # Incremental repricing after single bookings
+    schedule_ids = rng.choice(table._schedule_id, size=1000)
+    with Timer() as timer:
+        for schedule_id in schedule_ids:
+            table.record_booking(int(schedule_id))
+    print(f"  {'record_booking':<22} {timer.elapsed / len(schedule_ids) * 1e6:>9.1f} us per booking")
+
+    session.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Generating a full summer season timetable: one ORM insert and commit per
+schedule (what building it through the single Create Schedule form amounts
+to), one ORM flush for the whole season, and the recurring schedule
+generator's batched Core insert.
+
+The season runs from the last Sunday of March to the last Saturday of
+October next year, with every flight departing at each of the given times
+every day. The database has the board and search triggers installed, as in
+production, and the generator checks every departure against the aircraft
+schedule index.
+
+Run from the repository root:
+    python -m benchmarks.recurring_schedules [--flights 20] [--times 06:00,09:30,13:00,16:30,20:00]
+"""
+
+import argparse
+import datetime
+from benchmarks.common import use_temp_database, seed_minimal, Timer
+
+use_temp_database()
+
+from sqlalchemy import insert, delete, func
+from src.utils.database import session_factory
+from src.utils.migrations import run_migrations
+from src.models.aircraft import Aircraft
+from src.models.flight import Flight, FlightSchedule
+from src.logic.schedules import RecurringSchedule, create_recurring_schedules, parse_departure_times, WEEKDAYS
+
+def last_weekday(year, month, weekday):
+    day = datetime.date(year, month + 1, 1) - datetime.timedelta(days=1)
+    return day - datetime.timedelta(days=(day.weekday() - weekday) % 7)
+
+def season_patterns(flight_ids, times):
+    year = datetime.date.today().year + 1
+    start, end = last_weekday(year, 3, 6), last_weekday(year, 10, 5)
+    return [
+        RecurringSchedule(flight_id, "LHR", "EDI", times, range(len(WEEKDAYS)), start, end)
+        for flight_id in flight_ids
+    ]
+
+def one_commit_per_schedule(session, patterns):
+    for pattern in patterns:
+        for departure, arrival in pattern.occurrences():
+            session.add(FlightSchedule(
+                flight_id=pattern.flight_id, departure_airport=pattern.origin, arrival_airport=pattern.destination,
+                scheduled_departure_time=departure, scheduled_arrival_time=arrival, status=pattern.status
+            ))
+            session.commit()
+
+def one_orm_flush(session, patterns):
+    session.add_all([
+        FlightSchedule(
+            flight_id=pattern.flight_id, departure_airport=pattern.origin, arrival_airport=pattern.destination,
+            scheduled_departure_time=departure, scheduled_arrival_time=arrival, status=pattern.status
+        )
+        for pattern in patterns
+        for departure, arrival in pattern.occurrences()
+    ])
+    session.commit()
+
+def recurring_generator(session, patterns):
+    for pattern in patterns:
+        create_recurring_schedules(session, pattern, now=datetime.datetime.now())
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--flights", type=int, default=20)
+    parser.add_argument("--times", default="06:00,09:30,13:00,16:30,20:00")
+    args = parser.parse_args()
+
+    run_migrations()
+    session = session_factory()
+    user, _, _ = seed_minimal(session, schedules=0)
+    # One aircraft per flight, so the timetable passes the aircraft conflict checks
+    session.execute(insert(Aircraft), [
+        {
+            "model_number": "A320-200", "serial_number": f"SEASON-{i}", "registration_number": f"G-S{i:03d}",
+            "manufacturer": "Airbus", "date_of_manufacture": datetime.date(2015, 1, 1),
+            "aircraft_class": "Narrow-body", "generic_name": "Airbus A320", "number_of_engines": 2,
+        }
+        for i in range(args.flights - 1)
+    ])
+    aircraft_ids = [row.id for row in session.query(Aircraft.id).filter(Aircraft.serial_number.like("SEASON-%"))]
+    session.execute(insert(Flight), [
+        {"flight_number": f"NS{i:03d}", "aircraft_id": aircraft_id, "created_by_user_id": user.id, "base_cost": 99.99}
+        for i, aircraft_id in enumerate(aircraft_ids)
+    ])
+    session.commit()
+    flight_ids = [row.id for row in session.query(Flight.id).order_by(Flight.id)]
+    patterns = season_patterns(flight_ids, parse_departure_times(args.times))
+    season = sum(1 for _ in patterns[0].occurrences())
+    print(f"Summer season {patterns[0].start_date} to {patterns[0].end_date}: {season} departures per flight")
+
+    # Committing row by row is far too slow for the whole fleet, so it gets one flight's season
+    for label, strategy, count in (
+        ("commit per schedule", one_commit_per_schedule, 1),
+        ("one ORM flush", one_orm_flush, len(patterns)),
+        ("recurring generator", recurring_generator, len(patterns)),
+    ):
+        with Timer() as timer:
+            strategy(session, patterns[:count])
+        created = session.query(func.count(FlightSchedule.id)).scalar()
+        print(f"  {label:<20} {timer.elapsed * 1000:>9.1f} ms   {created:>6} schedules   "
+              f"{timer.elapsed * 1e6 / created:>7.1f} us/schedule")
+        session.execute(delete(FlightSchedule))
+        session.commit()
+
+    session.close()
+
+if __name__ == "__main__":
+    main()
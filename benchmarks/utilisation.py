@@ -0,0 +1,87 @@
+"""
+Aircraft utilisation over a year of schedules for the whole fleet: loading
+the block intervals, and the vectorized block hour, turnaround and idle time
+computation.
+
+Run from the repository root:
+    python -m benchmarks.utilisation [--aircraft 50] [--flights-per-day 6] [--days 365]
+"""
+
+import argparse
+import datetime
+from benchmarks.common import use_temp_database, seed_minimal, Timer
+
+use_temp_database()
+
+from sqlalchemy import insert
+from src.utils.database import init_db, session_factory
+from src.models.aircraft import Aircraft
+from src.models.flight import Flight, FlightSchedule, FlightStatus
+from src.logic.utilisation import aircraft_utilisation, load_intervals
+
+def seed(session, user_id, aircraft, flights_per_day, days):
+    """A fleet flying back-to-back 90 minute sectors with 45 minute turns, every day for days"""
+    session.execute(insert(Aircraft), [
+        {
+            "model_number": "A320-200", "serial_number": f"LOAD-{i}", "registration_number": f"G-L{i:03d}",
+            "manufacturer": "Airbus", "date_of_manufacture": datetime.date(2015, 1, 1),
+            "aircraft_class": "Narrow-body", "generic_name": "Airbus A320", "number_of_engines": 2,
+        }
+        for i in range(aircraft)
+    ])
+    aircraft_ids = [row.id for row in session.query(Aircraft.id).filter(Aircraft.serial_number.like("LOAD-%"))]
+    session.execute(insert(Flight), [
+        {"flight_number": f"NL{i:03d}", "aircraft_id": aircraft_id, "created_by_user_id": user_id, "base_cost": 99.99}
+        for i, aircraft_id in enumerate(aircraft_ids)
+    ])
+    flight_ids = [row.id for row in session.query(Flight.id).filter(Flight.flight_number.like("NL%"))]
+
+    today = datetime.datetime.combine(datetime.date.today(), datetime.time(6, 0))
+    for day in range(days):
+        first = today + datetime.timedelta(days=day)
+        session.execute(insert(FlightSchedule), [
+            {
+                "flight_id": flight_id, "departure_airport": "LHR", "arrival_airport": "EDI",
+                "scheduled_departure_time": first + datetime.timedelta(minutes=135 * leg),
+                "scheduled_arrival_time": first + datetime.timedelta(minutes=135 * leg + 90),
+                "status": FlightStatus.SCHEDULED,
+            }
+            for flight_id in flight_ids
+            for leg in range(flights_per_day)
+        ])
+    session.commit()
+    return aircraft * flights_per_day * days
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--aircraft", type=int, default=50)
+    parser.add_argument("--flights-per-day", type=int, default=6)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    init_db()
+    session = session_factory()
+    user, _, _ = seed_minimal(session, schedules=0)
+    with Timer() as timer:
+        schedules = seed(session, user.id, args.aircraft, args.flights_per_day, args.days)
+    print(f"Seeded {schedules} schedules for {args.aircraft} aircraft in {timer.elapsed:.1f} s")
+
+    today = datetime.date.today()
+    start = datetime.datetime.combine(today, datetime.time.min)
+    with Timer() as timer:
+        tails, _, _ = load_intervals(session, start, start + datetime.timedelta(days=args.days))
+    print(f"  load intervals      {timer.elapsed * 1000:>8.1f} ms   ({len(tails)} schedules)")
+
+    with Timer() as timer:
+        report = aircraft_utilisation(session, today, args.days)
+    print(f"  utilisation report  {timer.elapsed * 1000:>8.1f} ms")
+
+    busiest = report.iloc[0]
+    print(
+        f"  busiest: {busiest.registration_number} {busiest.block_hours_per_day:.1f} block h/day, "
+        f"turnaround {busiest.mean_turnaround_minutes:.0f} min"
+    )
+    session.close()
+
+if __name__ == "__main__":
+    main()
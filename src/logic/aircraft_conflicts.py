@@ -0,0 +1,264 @@
+import bisect
+import datetime
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from sqlalchemy import select
+from src.utils.database import session_factory
+from src.models.aircraft import Aircraft
+from src.models.flight import Flight, FlightSchedule, FlightStatus
+
+# Load environment variables
+load_dotenv()
+
+# Ground time an aircraft needs between arriving and departing again
+MIN_TURNAROUND_MINUTES = int(os.getenv("MIN_TURNAROUND_MINUTES", "30"))
+
+# The index is rebuilt in the background this often to pick up schedules written by other processes
+AIRCRAFT_SCHEDULE_INDEX_TTL_SECONDS = float(os.getenv("AIRCRAFT_SCHEDULE_INDEX_TTL_SECONDS", "300"))
+
+class ScheduleConflict(ValueError):
+    """A schedule would put an aircraft on two flights at once, or turn it around too quickly"""
+
+    def __init__(self, message, departure, arrival, conflicting_schedule_id=None):
+        super().__init__(message)
+        self.departure = departure
+        self.arrival = arrival
+        self.conflicting_schedule_id = conflicting_schedule_id
+
+class AircraftTimeline:
+    """One aircraft's schedules as parallel lists sorted by departure"""
+    __slots__ = ("departures", "arrivals", "schedule_ids", "longest")
+
+    def __init__(self):
+        self.departures = []
+        self.arrivals = []
+        self.schedule_ids = []
+        self.longest = datetime.timedelta(0)
+
+    def add(self, departure, arrival, schedule_id):
+        position = bisect.bisect_right(self.departures, departure)
+        self.departures.insert(position, departure)
+        self.arrivals.insert(position, arrival)
+        self.schedule_ids.insert(position, schedule_id)
+        self.longest = max(self.longest, arrival - departure)
+
+    def remove(self, departure, schedule_id):
+        position = bisect.bisect_left(self.departures, departure)
+        while position < len(self.departures) and self.departures[position] == departure:
+            if self.schedule_ids[position] == schedule_id:
+                del self.departures[position], self.arrivals[position], self.schedule_ids[position]
+                return
+            position += 1
+
+    def conflict(self, departure, arrival, turnaround):
+        """Position of a schedule that overlaps [departure, arrival) or is within turnaround of it, or None"""
+        # Anything departing more than the longest block time earlier has landed long before
+        start = bisect.bisect_left(self.departures, departure - self.longest - turnaround)
+        end = bisect.bisect_left(self.departures, arrival + turnaround)
+        for position in range(start, end):
+            if self.arrivals[position] + turnaround > departure:
+                return position
+        return None
+
+def _add_schedules(timelines, schedules, aircraft_id, added):
+    timeline = timelines.get(aircraft_id)
+    if timeline is None:
+        timeline = timelines[aircraft_id] = AircraftTimeline()
+    for departure, arrival, schedule_id in added:
+        # A rebuild may already have read a schedule that is replayed onto it
+        if schedule_id not in schedules:
+            timeline.add(departure, arrival, schedule_id)
+            schedules[schedule_id] = (aircraft_id, departure)
+
+def _discard_schedules(timelines, schedules, schedule_ids):
+    for schedule_id in schedule_ids:
+        entry = schedules.pop(schedule_id, None)
+        if entry is not None:
+            aircraft_id, departure = entry
+            timelines[aircraft_id].remove(departure, schedule_id)
+
+class AircraftScheduleIndex:
+    """
+    Every aircraft's upcoming schedules, held in memory for conflict checks.
+
+    Each aircraft has a timeline sorted by departure, so checking a new
+    schedule is a binary search for the few schedules close enough to clash
+    with it rather than a query. Cancelled schedules are left out. Writers
+    hold the lock from check() until they have committed and add()ed their
+    schedules, so two creates cannot both claim the same slot.
+
+    The index is loaded on startup, or by the first check if that comes
+    sooner. Every ttl seconds it is rebuilt on a background thread to pick
+    up schedules written by other processes: the rebuild reads without the
+    lock, replays the add() and discard() calls made while it was reading,
+    and swaps the new timelines in, so checks never wait for the database.
+    """
+
+    def __init__(self, session_factory=session_factory, ttl=AIRCRAFT_SCHEDULE_INDEX_TTL_SECONDS,
+                 turnaround_minutes=MIN_TURNAROUND_MINUTES):
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self.turnaround = datetime.timedelta(minutes=turnaround_minutes)
+        self.refreshed_at = None
+        self.lock = threading.RLock()
+        self._timelines = {}
+        self._schedules = {}
+        # Changes made while a rebuild reads, per rebuild in progress, to replay onto its result
+        self._journals = []
+        self._refreshing = False
+        self._refresh_lock = threading.Lock()
+
+    def refresh(self, session=None):
+        """Rebuild every aircraft's timeline from the database and swap them in"""
+        journal = []
+        with self.lock:
+            self._journals.append(journal)
+        try:
+            own_session = session is None
+            session = session or self.session_factory()
+            try:
+                # Past schedules can no longer clash with a new one
+                rows = session.execute(select(
+                    Flight.aircraft_id,
+                    FlightSchedule.scheduled_departure_time,
+                    FlightSchedule.scheduled_arrival_time,
+                    FlightSchedule.id
+                ).join(
+                    Flight, FlightSchedule.flight_id == Flight.id
+                ).where(
+                    FlightSchedule.scheduled_arrival_time >= datetime.datetime.now() - self.turnaround,
+                    FlightSchedule.status != FlightStatus.CANCELLED
+                ).order_by(Flight.aircraft_id, FlightSchedule.scheduled_departure_time)).all()
+            finally:
+                if own_session:
+                    session.close()
+
+            timelines, schedules = {}, {}
+            for aircraft_id, departure, arrival, schedule_id in rows:
+                timeline = timelines.get(aircraft_id)
+                if timeline is None:
+                    timeline = timelines[aircraft_id] = AircraftTimeline()
+                # Rows arrive in departure order, so appending keeps each timeline sorted
+                timeline.departures.append(departure)
+                timeline.arrivals.append(arrival)
+                timeline.schedule_ids.append(schedule_id)
+                timeline.longest = max(timeline.longest, arrival - departure)
+                schedules[schedule_id] = (aircraft_id, departure)
+
+            with self.lock:
+                for change, *arguments in journal:
+                    change(timelines, schedules, *arguments)
+                self._timelines, self._schedules = timelines, schedules
+                self.refreshed_at = time.time()
+        finally:
+            with self.lock:
+                self._journals.remove(journal)
+
+    def _ensure_fresh(self, session):
+        if self.refreshed_at is None:
+            # Nothing to check against yet, so the very first load happens in the check
+            self.refresh(session)
+        elif time.time() - self.refreshed_at > self.ttl:
+            # Schedules from other processes are rare; keep checking against these while the rebuild runs
+            self._refresh_in_background()
+
+    def _refresh_in_background(self):
+        """Start a rebuild on its own thread unless one is already running"""
+        with self._refresh_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._background_refresh, name="aircraft-index-refresh", daemon=True).start()
+
+    def _background_refresh(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            print(f"Error refreshing aircraft schedule index: {e}")
+        finally:
+            with self._refresh_lock:
+                self._refreshing = False
+
+    def check(self, session, intervals_by_aircraft):
+        """
+        Raise ScheduleConflict for the first of the proposed {aircraft_id:
+        [(departure, arrival), ...]} schedules that clashes with one already
+        on the aircraft, or with another of the proposed ones.
+        """
+        with self.lock:
+            self._ensure_fresh(session)
+            for aircraft_id, intervals in intervals_by_aircraft.items():
+                timeline = self._timelines.get(aircraft_id)
+                proposed = AircraftTimeline()
+                for departure, arrival in sorted(intervals):
+                    position = timeline.conflict(departure, arrival, self.turnaround) if timeline else None
+                    if position is not None:
+                        raise self._conflict(session, departure, arrival, timeline.schedule_ids[position])
+                    if proposed.conflict(departure, arrival, self.turnaround) is not None:
+                        raise ScheduleConflict(
+                            f"The new schedules put the aircraft on two flights within {self._minutes} minutes "
+                            f"around {departure:%Y-%m-%d %H:%M}",
+                            departure, arrival
+                        )
+                    proposed.add(departure, arrival, None)
+
+    def add(self, aircraft_id, schedules):
+        """Record committed (departure, arrival, schedule_id) schedules of an aircraft"""
+        schedules = list(schedules)
+        with self.lock:
+            _add_schedules(self._timelines, self._schedules, aircraft_id, schedules)
+            for journal in self._journals:
+                journal.append((_add_schedules, aircraft_id, schedules))
+
+    def discard(self, schedule_ids):
+        """Free the slots of schedules that no longer fly, e.g. after a cancellation"""
+        schedule_ids = list(schedule_ids)
+        with self.lock:
+            _discard_schedules(self._timelines, self._schedules, schedule_ids)
+            for journal in self._journals:
+                journal.append((_discard_schedules, schedule_ids))
+
+    @property
+    def _minutes(self):
+        return int(self.turnaround.total_seconds() // 60)
+
+    def _conflict(self, session, departure, arrival, schedule_id):
+        """A ScheduleConflict describing the schedule in the way"""
+        row = session.query(
+            Aircraft.registration_number,
+            Flight.flight_number,
+            FlightSchedule.departure_airport,
+            FlightSchedule.arrival_airport,
+            FlightSchedule.scheduled_departure_time,
+            FlightSchedule.scheduled_arrival_time
+        ).join(Flight, FlightSchedule.flight_id == Flight.id).join(
+            Aircraft, Flight.aircraft_id == Aircraft.id
+        ).filter(FlightSchedule.id == schedule_id).first()
+        if row is None:
+            return ScheduleConflict(
+                f"The aircraft is already scheduled around {departure:%Y-%m-%d %H:%M} (schedule {schedule_id})",
+                departure, arrival, schedule_id
+            )
+
+        registration, flight_number, origin, destination, other_departure, other_arrival = row
+        overlaps = other_departure < arrival and departure < other_arrival
+        return ScheduleConflict(
+            f"{registration} is already flying {flight_number} {origin} → {destination} "
+            f"{other_departure:%Y-%m-%d %H:%M}–{other_arrival:%H:%M} (schedule {schedule_id}), which "
+            + (f"overlaps the departure at {departure:%Y-%m-%d %H:%M}" if overlaps else
+               f"leaves less than {self._minutes} minutes to turn around for the departure at {departure:%Y-%m-%d %H:%M}"),
+            departure, arrival, schedule_id
+        )
+
+_aircraft_schedule_index = None
+_aircraft_schedule_index_lock = threading.Lock()
+
+def get_aircraft_schedule_index():
+    """Get the shared aircraft schedule index"""
+    global _aircraft_schedule_index
+    with _aircraft_schedule_index_lock:
+        if _aircraft_schedule_index is None:
+            _aircraft_schedule_index = AircraftScheduleIndex()
+        return _aircraft_schedule_index
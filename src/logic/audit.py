@@ -0,0 +1,193 @@
+import atexit
+import collections
+import datetime
+import os
+import threading
+import flask
+from dotenv import load_dotenv
+from sqlalchemy import insert, delete, select
+from src.utils.database import session_factory
+from src.models.audit import AuditEvent, ArchivedAuditEvent
+
+# Load environment variables
+load_dotenv()
+
+# Events held in memory; when the writer falls this far behind the oldest are dropped
+AUDIT_BUFFER_SIZE = int(os.getenv("AUDIT_BUFFER_SIZE", "100000"))
+
+# Events per INSERT, and how long the writer waits for a batch to fill
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+AUDIT_FLUSH_INTERVAL_SECONDS = float(os.getenv("AUDIT_FLUSH_INTERVAL_SECONDS", "1"))
+
+# Days events stay in the live table before being rotated into the archive
+AUDIT_RETENTION_DAYS = int(os.getenv("AUDIT_RETENTION_DAYS", "90"))
+
+# How often the writer rotates old events out of the live table
+AUDIT_ROTATION_INTERVAL = datetime.timedelta(hours=1)
+
+# Rows returned by the admin view
+AUDIT_QUERY_LIMIT = 500
+
+AUDIT_FIELDS = ("occurred_at", "category", "action", "actor_id", "actor", "target", "ip_address", "details")
+
+class AuditLog:
+    """
+    Append-only audit log with a background writer.
+
+    record() only appends a tuple to an in-memory ring buffer (a bounded
+    deque, whose append is thread-safe), so auditing costs a request a few
+    microseconds and never a database write. The writer thread drains the
+    buffer with one multi-row INSERT per batch, wakes early when a batch is
+    full, and every AUDIT_ROTATION_INTERVAL moves events older than the
+    retention period into the archive table so the live table and its
+    indexes stay small.
+    """
+
+    def __init__(self, session_factory=session_factory, buffer_size=AUDIT_BUFFER_SIZE,
+                 batch_size=AUDIT_BATCH_SIZE, flush_interval=AUDIT_FLUSH_INTERVAL_SECONDS,
+                 retention_days=AUDIT_RETENTION_DAYS):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention = datetime.timedelta(days=retention_days)
+        self.dropped = 0
+        self._buffer = collections.deque(maxlen=buffer_size)
+        self._thread = None
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._rotated_at = None
+
+        # Write out whatever is still buffered when the process exits
+        atexit.register(self.stop)
+
+    def record(self, category, action, target=None, details=None, actor_id=None, actor=None):
+        """Queue an event; the actor and IP address default to the current request's"""
+        ip_address = None
+        if flask.has_request_context():
+            actor_id = actor_id or flask.session.get("user_id")
+            actor = actor or flask.session.get("user_email")
+            ip_address = flask.request.remote_addr
+
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append((
+            datetime.datetime.utcnow(), category, action, actor_id, actor,
+            str(target) if target is not None else None, ip_address, details
+        ))
+
+        if self._thread is None:
+            self.start()
+        elif len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def start(self):
+        """Start the writer thread if it is not running"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """Flush the buffer and stop the writer"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stopping.set()
+            self._wakeup.set()
+            thread.join()
+        self.flush()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+                self._rotate_if_due()
+            except Exception as e:
+                print(f"Error writing audit events: {e}")
+
+    def flush(self):
+        """Write every buffered event, a batch per INSERT; returns how many were written"""
+        written = 0
+        with self._flush_lock:
+            while self._buffer:
+                batch = []
+                while self._buffer and len(batch) < self.batch_size:
+                    batch.append(self._buffer.popleft())
+                self._write(batch)
+                written += len(batch)
+        if self.dropped:
+            print(f"Audit buffer overflowed; {self.dropped} events were dropped")
+            self.dropped = 0
+        return written
+
+    def _write(self, batch):
+        session = self.session_factory()
+        try:
+            session.execute(insert(AuditEvent), [dict(zip(AUDIT_FIELDS, event)) for event in batch])
+            session.commit()
+        except Exception:
+            session.rollback()
+            # Put the batch back so it is retried on the next flush
+            self._buffer.extendleft(reversed(batch))
+            raise
+        finally:
+            session.close()
+
+    def _rotate_if_due(self):
+        now = datetime.datetime.utcnow()
+        if self._rotated_at is None or now - self._rotated_at >= AUDIT_ROTATION_INTERVAL:
+            rotate_audit_events(self.session_factory, now - self.retention)
+            self._rotated_at = now
+
+def rotate_audit_events(session_factory, cutoff):
+    """Move events older than cutoff into the archive in one transaction; returns how many moved"""
+    session = session_factory()
+    try:
+        old = AuditEvent.occurred_at < cutoff
+        # The archive numbers rows itself: SQLite reuses the ids of deleted rows,
+        # so a live event can have the id of one archived earlier
+        session.execute(insert(ArchivedAuditEvent).from_select(
+            AUDIT_FIELDS,
+            select(*(getattr(AuditEvent, column) for column in AUDIT_FIELDS)).where(old).order_by(AuditEvent.id)
+        ))
+        moved = session.execute(delete(AuditEvent).where(old)).rowcount
+        session.commit()
+        return moved
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+def audit_events(session, start=None, end=None, actor=None, category=None, limit=AUDIT_QUERY_LIMIT):
+    """Most recent events first, within a time range and optionally for one actor (email)"""
+    query = session.query(AuditEvent)
+    if actor:
+        query = query.filter(AuditEvent.actor == actor)
+    if start:
+        query = query.filter(AuditEvent.occurred_at >= start)
+    if end:
+        query = query.filter(AuditEvent.occurred_at < end)
+    if category:
+        query = query.filter(AuditEvent.category == category)
+    return query.order_by(AuditEvent.occurred_at.desc()).limit(limit).all()
+
+_audit_log = None
+_audit_log_lock = threading.Lock()
+
+def get_audit_log():
+    """Get the shared audit log"""
+    global _audit_log
+    with _audit_log_lock:
+        if _audit_log is None:
+            _audit_log = AuditLog()
+        return _audit_log
+
+def audit(category, action, target=None, details=None, actor_id=None, actor=None):
+    """Record an audit event on the shared log"""
+    (_audit_log or get_audit_log()).record(category, action, target, details, actor_id, actor)
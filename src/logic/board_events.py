@@ -0,0 +1,198 @@
+import json
+import os
+import queue
+import threading
+from dotenv import load_dotenv
+from src.utils.database import engine, session_factory
+from src.logic.flight_board import board_version, changed_board_rows
+
+# Load environment variables
+load_dotenv()
+
+# How often the publisher asks SQLite whether anything was committed
+BOARD_EVENTS_POLL_SECONDS = float(os.getenv("BOARD_EVENTS_POLL_SECONDS", "0.5"))
+
+# Idle streams send a comment this often so proxies keep them open and dead ones are noticed
+BOARD_EVENTS_KEEPALIVE_SECONDS = 15
+
+# How long a disconnected browser waits before reconnecting
+BOARD_EVENTS_RETRY_MILLISECONDS = 3000
+
+# Events a slow subscriber may fall behind by before its stream is reset
+BOARD_EVENTS_QUEUE_SIZE = 100
+
+class Subscription:
+    """One subscriber's queue of events"""
+
+    def __init__(self, size=BOARD_EVENTS_QUEUE_SIZE):
+        self.events = queue.Queue(maxsize=size)
+        self.overflowed = False
+
+    def put(self, event):
+        try:
+            self.events.put_nowait(event)
+        except queue.Full:
+            # The subscriber missed events, so it can no longer patch; it has to reload
+            self.overflowed = True
+
+class EventBus:
+    """In-process publish/subscribe; every subscriber gets each event on its own queue"""
+
+    def __init__(self):
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        subscription = Subscription()
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def has_subscribers(self):
+        return bool(self._subscriptions)
+
+    def publish(self, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription.put(event)
+
+def board_event(session, since):
+    """The schedules changed after version since as one event, or None if nothing changed"""
+    version = board_version(session)
+    if version <= since:
+        return None
+    return {
+        "since": since,
+        "version": version,
+        "rows": [
+            dict(row.as_record(), day=row.scheduled_departure_time.date().isoformat())
+            for row in changed_board_rows(session, since)
+        ],
+    }
+
+class BoardEventPublisher:
+    """
+    Publishes flight board changes to the bus.
+
+    Each poll is a PRAGMA data_version on a connection kept for the purpose:
+    SQLite bumps it whenever another connection commits, from this process or
+    any other, so an idle database costs one pragma per poll. Only when it
+    moves does the publisher read the schedules with a newer change_seq and
+    publish them as one event.
+    """
+
+    def __init__(self, bus, engine=engine, session_factory=session_factory, interval=BOARD_EVENTS_POLL_SECONDS):
+        self.bus = bus
+        self.engine = engine
+        self.session_factory = session_factory
+        self.interval = interval
+        self.version = None
+        self._thread = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the publisher thread if it is not running"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="board-events", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stopping.set()
+            thread.join()
+
+    def _run(self):
+        data_version = None
+        with self.engine.connect() as connection:
+            while not self._stopping.is_set():
+                try:
+                    current = connection.exec_driver_sql("PRAGMA data_version").scalar()
+                    connection.rollback()
+                    if current != data_version:
+                        data_version = current
+                        self.publish_changes()
+                except Exception as e:
+                    print(f"Error publishing flight board changes: {e}")
+                self._stopping.wait(self.interval)
+
+    def publish_changes(self):
+        session = self.session_factory()
+        try:
+            if self.version is None:
+                self.version = board_version(session)
+                return
+            event = board_event(session, self.version)
+            if event is not None:
+                self.version = event["version"]
+                if self.bus.has_subscribers():
+                    self.bus.publish(event)
+        finally:
+            session.close()
+
+class BoardEvents:
+    """The bus and its publisher; the publisher starts with the first subscriber"""
+
+    def __init__(self):
+        self.bus = EventBus()
+        self.publisher = BoardEventPublisher(self.bus)
+
+    def stream(self, since=None):
+        """
+        Server-sent events for a board at version since: first whatever it
+        missed, then every change as it is published.
+        """
+        subscription = self.bus.subscribe()
+        self.publisher.start()
+        try:
+            # Subscribed before reading the catch-up, so no change falls in between
+            session = session_factory()
+            try:
+                catch_up = board_event(session, since) if since is not None else None
+                version = catch_up["version"] if catch_up else since
+            finally:
+                session.close()
+
+            yield f"retry: {BOARD_EVENTS_RETRY_MILLISECONDS}\n\n"
+            if catch_up:
+                yield _format_event(catch_up)
+
+            while True:
+                if subscription.overflowed:
+                    yield "event: reset\ndata: {}\n\n"
+                    return
+                try:
+                    event = subscription.events.get(timeout=BOARD_EVENTS_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                # Already sent as part of the catch-up
+                if version is not None and event["version"] <= version:
+                    continue
+                version = event["version"]
+                yield _format_event(event)
+        finally:
+            self.bus.unsubscribe(subscription)
+
+def _format_event(event):
+    return f"id: {event['version']}\ndata: {json.dumps(event)}\n\n"
+
+_board_events = None
+_board_events_lock = threading.Lock()
+
+def get_board_events():
+    """Get the shared board event bus"""
+    global _board_events
+    with _board_events_lock:
+        if _board_events is None:
+            _board_events = BoardEvents()
+        return _board_events
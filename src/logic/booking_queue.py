@@ -0,0 +1,194 @@
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from dotenv import load_dotenv
+from sqlalchemy.orm import joinedload
+from src.utils.database import session_factory
+from src.models.flight import FlightSchedule
+from src.logic.bookings import BookingResult, new_booking, build_booking, after_bookings_committed
+from src.logic.pricing import get_price_table
+
+# Load environment variables
+load_dotenv()
+
+# Group commit is opt-in; without it every booking commits on its own
+GROUP_COMMIT_ENABLED = os.getenv("BOOKING_GROUP_COMMIT", "false").lower() in ("1", "true", "yes")
+GROUP_COMMIT_MAX_BATCH = int(os.getenv("BOOKING_GROUP_COMMIT_MAX_BATCH", "64"))
+GROUP_COMMIT_MAX_WAIT_MS = float(os.getenv("BOOKING_GROUP_COMMIT_MAX_WAIT_MS", "5"))
+GROUP_COMMIT_TIMEOUT_SECONDS = 10
+
+class BookingIntent:
+    """A booking request waiting for the writer thread"""
+    __slots__ = ("passenger_id", "flight_schedule_id", "passengers", "future")
+
+    def __init__(self, passenger_id, flight_schedule_id, passengers):
+        self.passenger_id = passenger_id
+        self.flight_schedule_id = flight_schedule_id
+        self.passengers = passengers
+        self.future = Future()
+
+class BookingCommitQueue:
+    """
+    Single-writer booking pipeline.
+
+    Callers submit booking intents and get a Future back. One writer thread
+    drains the queue and commits intents in small batches, so a burst of
+    bookings shares one commit (and one fsync) instead of paying for one each.
+    """
+
+    def __init__(self, session_factory=session_factory, max_batch=GROUP_COMMIT_MAX_BATCH,
+                 max_wait_ms=GROUP_COMMIT_MAX_WAIT_MS):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the writer thread if it is not already running"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="booking-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """Commit whatever is queued and stop the writer thread"""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def submit(self, passenger_id, flight_schedule_id, passengers=1):
+        """Queue a booking and return a Future resolving to a BookingResult"""
+        self.start()
+        intent = BookingIntent(passenger_id, flight_schedule_id, passengers)
+        self._queue.put(intent)
+        return intent.future
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            # Gather more intents until the batch is full or the wait is over
+            batch = [first]
+            stopping = False
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    intent = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if intent is None:
+                    stopping = True
+                    break
+                batch.append(intent)
+
+            try:
+                self._commit_batch(batch)
+            except Exception as e:
+                # The writer thread must outlive any one batch
+                print(f"Error in booking writer: {e}")
+            if stopping:
+                return
+
+    def _commit_batch(self, batch):
+        """Commit a batch in one transaction; every intent's future is resolved, whatever fails"""
+        session = self.session_factory()
+        try:
+            self._commit_pending(session, batch)
+        except Exception as e:
+            print(f"Error committing booking batch: {e}")
+            try:
+                session.rollback()
+            except Exception:
+                pass
+            for intent in batch:
+                if not intent.future.done():
+                    intent.future.set_exception(e)
+        finally:
+            session.close()
+
+    def _commit_pending(self, session, batch):
+        """Book a batch in one transaction, falling back to one commit per intent if that fails"""
+        # Load every schedule the batch needs in one query
+        schedule_ids = {intent.flight_schedule_id for intent in batch}
+        schedules = {
+            schedule.id: schedule
+            for schedule in session.query(FlightSchedule).options(
+                joinedload(FlightSchedule.flight)
+            ).filter(FlightSchedule.id.in_(schedule_ids))
+        }
+
+        fares = get_price_table().fares_for(session, schedules)
+
+        pending = []
+        for intent in batch:
+            flight_schedule = schedules.get(intent.flight_schedule_id)
+            if flight_schedule is None:
+                intent.future.set_exception(ValueError("Flight not found"))
+                continue
+            fare = fares.get(flight_schedule.id, flight_schedule.flight.base_cost)
+            booking = new_booking(intent.passenger_id, flight_schedule, intent.passengers, fare)
+            pending.append((intent, booking))
+        session.add_all([booking for _, booking in pending])
+
+        if not pending:
+            return
+
+        try:
+            # Flush first so the results can be read before commit expires them
+            session.flush()
+            results = [(intent, BookingResult.from_booking(booking)) for intent, booking in pending]
+            session.commit()
+        except Exception:
+            session.rollback()
+            self._commit_individually(session, [intent for intent, _ in pending])
+            return
+
+        # The bookings are committed, so callers hear about them before any cache upkeep
+        for intent, result in results:
+            intent.future.set_result(result)
+        after_bookings_committed(
+            Counter(intent.flight_schedule_id for intent, _ in results),
+            {intent.passenger_id for intent, _ in results}
+        )
+
+    def _commit_individually(self, session, intents):
+        """Retry each intent on its own so one bad booking does not fail the batch"""
+        for intent in intents:
+            try:
+                booking = build_booking(
+                    session, intent.passenger_id, intent.flight_schedule_id, intent.passengers
+                )
+                session.flush()
+                result = BookingResult.from_booking(booking)
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                intent.future.set_exception(e)
+                continue
+            intent.future.set_result(result)
+            after_bookings_committed({intent.flight_schedule_id: 1}, {intent.passenger_id})
+
+_booking_queue = None
+_booking_queue_lock = threading.Lock()
+
+def get_booking_queue():
+    """Get the shared booking queue, or None when group commit is disabled"""
+    global _booking_queue
+    if not GROUP_COMMIT_ENABLED:
+        return None
+
+    with _booking_queue_lock:
+        if _booking_queue is None:
+            _booking_queue = BookingCommitQueue()
+        return _booking_queue
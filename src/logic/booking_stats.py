@@ -0,0 +1,161 @@
+import datetime
+from sqlalchemy import event, inspect, select, func, literal, case
+from sqlalchemy.dialects.sqlite import insert
+from src.models.booking import Booking, BookingDailyStats, PaymentStatus
+
+# Days shown in the revenue trend report, and the rolling average window
+REVENUE_TREND_DAYS = 30
+ROLLING_AVERAGE_DAYS = 7
+
+stats = BookingDailyStats.__table__
+
+COUNTERS = ("booking_count", "revenue", "refund_count", "refunded_amount")
+
+def _upsert(statement):
+    """Add a statement's counter values onto any existing row for the same day"""
+    return statement.on_conflict_do_update(
+        index_elements=["day"],
+        set_={name: stats.c[name] + statement.excluded[name] for name in COUNTERS}
+    )
+
+def _record(connection, day, booking_count=0, revenue=0.0, refund_count=0, refunded_amount=0.0):
+    connection.execute(_upsert(insert(stats).values(
+        day=day,
+        booking_count=booking_count,
+        revenue=revenue,
+        refund_count=refund_count,
+        refunded_amount=refunded_amount
+    )))
+
+def _booking_day(booking):
+    return (booking.booking_date or datetime.datetime.utcnow()).date()
+
+def _counters(payment_status, cost_charged):
+    """What one booking adds to its day: a failed payment is neither a booking nor revenue"""
+    if payment_status == PaymentStatus.FAILED:
+        return 0, 0.0, 0, 0.0
+    refunded = payment_status == PaymentStatus.REFUNDED
+    return 1, cost_charged, int(refunded), cost_charged if refunded else 0.0
+
+# Bookings made, refunded or failed through the ORM update the rollup in the same flush
+
+@event.listens_for(Booking, "after_insert")
+def _booking_inserted(mapper, connection, target):
+    counters = _counters(target.payment_status, target.cost_charged)
+    if any(counters):
+        _record(connection, _booking_day(target), *counters)
+
+@event.listens_for(Booking, "after_update")
+def _booking_updated(mapper, connection, target):
+    history = inspect(target).attrs.payment_status.history
+    if not history.has_changes() or not history.deleted:
+        return
+    before = _counters(history.deleted[0], target.cost_charged)
+    after = _counters(target.payment_status, target.cost_charged)
+    if before != after:
+        _record(connection, _booking_day(target), *(new - old for new, old in zip(after, before)))
+
+@event.listens_for(Booking, "after_delete")
+def _booking_deleted(mapper, connection, target):
+    counters = _counters(target.payment_status, target.cost_charged)
+    if any(counters):
+        _record(connection, _booking_day(target), *(-counter for counter in counters))
+
+def record_refunds(session, *criteria):
+    """
+    Count bookings matching criteria as refunded, in one INSERT ... SELECT.
+
+    For bulk UPDATEs that refund bookings without loading them; call it in the
+    same transaction, before the update changes which rows match.
+    """
+    day = func.date(Booking.booking_date)
+    session.execute(_upsert(insert(stats).from_select(
+        ["day", "booking_count", "revenue", "refund_count", "refunded_amount"],
+        select(
+            day, literal(0), literal(0.0), func.count(Booking.id), func.sum(Booking.cost_charged)
+        ).where(
+            *criteria, Booking.payment_status.not_in([PaymentStatus.REFUNDED, PaymentStatus.FAILED])
+        ).group_by(day)
+    )))
+
+def record_failures(session, *criteria):
+    """
+    Take bookings matching criteria out of the rollup, in one INSERT ... SELECT.
+
+    For bulk UPDATEs that mark payments FAILED; call it in the same
+    transaction, before the update changes which rows match.
+    """
+    day = func.date(Booking.booking_date)
+    refunded = Booking.payment_status == PaymentStatus.REFUNDED
+    session.execute(_upsert(insert(stats).from_select(
+        ["day", "booking_count", "revenue", "refund_count", "refunded_amount"],
+        select(
+            day,
+            -func.count(Booking.id),
+            -func.sum(Booking.cost_charged),
+            -func.sum(case((refunded, 1), else_=0)),
+            -func.sum(case((refunded, Booking.cost_charged), else_=0.0))
+        ).where(
+            *criteria, Booking.payment_status != PaymentStatus.FAILED
+        ).group_by(day)
+    )))
+
+def backfill_booking_daily_stats(session):
+    """Rebuild the rollup from every booking in one pass; returns the number of days written"""
+    session.query(BookingDailyStats).delete()
+
+    day = func.date(Booking.booking_date)
+    refunded = Booking.payment_status == PaymentStatus.REFUNDED
+    result = session.execute(insert(stats).from_select(
+        ["day", "booking_count", "revenue", "refund_count", "refunded_amount"],
+        select(
+            day,
+            func.count(Booking.id),
+            func.sum(Booking.cost_charged),
+            func.sum(case((refunded, 1), else_=0)),
+            func.sum(case((refunded, Booking.cost_charged), else_=0.0))
+        ).where(
+            Booking.payment_status != PaymentStatus.FAILED
+        ).group_by(day)
+    ))
+    return result.rowcount
+
+def revenue_between(session, first_day, last_day):
+    """(bookings, gross revenue, net revenue) for booking days first_day..last_day inclusive"""
+    bookings, revenue, net_revenue = session.query(
+        func.sum(BookingDailyStats.booking_count),
+        func.sum(BookingDailyStats.revenue),
+        func.sum(BookingDailyStats.revenue - BookingDailyStats.refunded_amount)
+    ).filter(
+        BookingDailyStats.day >= first_day,
+        BookingDailyStats.day <= last_day
+    ).one()
+    return bookings or 0, revenue or 0.0, net_revenue or 0.0
+
+def revenue_trends(session, today, days=REVENUE_TREND_DAYS, window=ROLLING_AVERAGE_DAYS):
+    """
+    The last few days of the rollup, newest first, with a rolling average of net revenue.
+
+    The window reads a few days before the first one shown, so every row's
+    average covers a full window where there is data for it.
+    """
+    first_shown = today - datetime.timedelta(days=days - 1)
+    net_revenue = BookingDailyStats.revenue - BookingDailyStats.refunded_amount
+    rows = select(
+        BookingDailyStats.day,
+        BookingDailyStats.booking_count,
+        BookingDailyStats.revenue,
+        BookingDailyStats.refund_count,
+        net_revenue.label("net_revenue"),
+        func.avg(net_revenue).over(
+            order_by=BookingDailyStats.day,
+            rows=(-(window - 1), 0)
+        ).label("rolling_net_revenue")
+    ).where(
+        BookingDailyStats.day >= first_shown - datetime.timedelta(days=window - 1),
+        BookingDailyStats.day <= today
+    ).subquery()
+
+    return session.execute(
+        select(rows).where(rows.c.day >= first_shown).order_by(rows.c.day.desc())
+    ).all()
@@ -0,0 +1,68 @@
+from src.models.flight import FlightSchedule
+from src.models.booking import Booking, PaymentStatus
+from src.utils.seed_db import generate_confirmation_code
+from src.logic.pricing import get_price_table
+from src.logic.itinerary_cache import get_itinerary_cache
+
+class BookingResult:
+    """What a caller gets back once its booking is committed"""
+    __slots__ = ("booking_id", "confirmation_code", "cost_charged")
+
+    def __init__(self, booking_id, confirmation_code, cost_charged):
+        self.booking_id = booking_id
+        self.confirmation_code = confirmation_code
+        self.cost_charged = cost_charged
+
+    @classmethod
+    def from_booking(cls, booking):
+        return cls(booking.id, booking.confirmation_code, booking.cost_charged)
+
+def new_booking(passenger_id, flight_schedule, passengers, fare):
+    """Create (but do not add) a booking for an already loaded flight schedule at a per-seat fare"""
+    # Calculate cost
+    passengers = int(passengers) if passengers else 1
+    total_cost = round(fare * passengers, 2)
+
+    # Payment is taken asynchronously, so every booking starts out pending
+    return Booking(
+        passenger_id=passenger_id,
+        flight_schedule_id=flight_schedule.id,
+        confirmation_code=generate_confirmation_code(),
+        cost_charged=total_cost,
+        payment_status=PaymentStatus.PENDING
+    )
+
+def build_booking(session, passenger_id, flight_schedule_id, passengers):
+    """Create a booking in the given session without committing it"""
+    flight_schedule = session.query(FlightSchedule).filter_by(id=flight_schedule_id).first()
+    if not flight_schedule:
+        raise ValueError("Flight not found")
+
+    fare = get_price_table().fare_for(session, flight_schedule)
+    booking = new_booking(passenger_id, flight_schedule, passengers, fare)
+    session.add(booking)
+    return booking
+
+def place_booking(session, passenger_id, flight_schedule_id, passengers):
+    """Create and commit a single booking, returning its BookingResult"""
+    booking = build_booking(session, passenger_id, flight_schedule_id, passengers)
+
+    # Flush first so the result can be read before commit expires the booking
+    session.flush()
+    result = BookingResult.from_booking(booking)
+    session.commit()
+
+    after_bookings_committed({flight_schedule_id: 1}, {passenger_id})
+    return result
+
+def after_bookings_committed(seat_changes, passenger_ids):
+    """
+    Reprice the booked schedules, whose load factor went up, and drop the
+    passengers' cached itineraries. Shared by every booking path.
+    """
+    try:
+        get_price_table().record_bookings(seat_changes)
+        get_itinerary_cache().invalidate_users(passenger_ids)
+    except Exception as e:
+        # The bookings stand; the caches catch up on their next refresh
+        print(f"Error updating caches after booking: {e}")
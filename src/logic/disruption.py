@@ -0,0 +1,125 @@
+import datetime
+from sqlalchemy import select, update, func
+from src.models.aircraft import Aircraft, DEFAULT_SEAT_CAPACITY
+from src.models.booking import Booking, PaymentStatus
+from src.models.flight import Flight, FlightSchedule, FlightStatus
+from src.logic.booking_stats import record_refunds
+
+# How far after the cancelled departure we look for a replacement flight
+REBOOKING_WINDOW = datetime.timedelta(days=7)
+
+# Bookings that hold a seat; failed and refunded bookings are left alone
+SEAT_HOLDING_STATUSES = (PaymentStatus.PENDING, PaymentStatus.PROCESSING, PaymentStatus.COMPLETED)
+
+class DisruptionResult:
+    """Outcome of handling a cancelled schedule"""
+    __slots__ = ("rebooked", "refunded")
+
+    def __init__(self):
+        # Maps replacement schedule id -> number of bookings moved onto it
+        self.rebooked = {}
+        self.refunded = 0
+
+    @property
+    def total_rebooked(self):
+        return sum(self.rebooked.values())
+
+def seat_inventory(session, schedule_ids):
+    """Free seats per schedule: aircraft capacity minus seat-holding bookings"""
+    if not schedule_ids:
+        return {}
+
+    booked = select(
+        Booking.flight_schedule_id,
+        func.count(Booking.id).label("booked")
+    ).where(
+        Booking.flight_schedule_id.in_(schedule_ids),
+        Booking.payment_status.in_(SEAT_HOLDING_STATUSES)
+    ).group_by(Booking.flight_schedule_id).subquery()
+
+    rows = session.query(
+        FlightSchedule.id,
+        Flight.aircraft_id,
+        func.coalesce(booked.c.booked, 0)
+    ).join(Flight).outerjoin(
+        booked, booked.c.flight_schedule_id == FlightSchedule.id
+    ).filter(FlightSchedule.id.in_(schedule_ids)).all()
+
+    # The fleet is small, so capacities are read once for the aircraft involved, from the typed column
+    aircraft_ids = {aircraft_id for _, aircraft_id, _ in rows}
+    capacities = dict(session.query(
+        Aircraft.id, func.coalesce(Aircraft.capacity, DEFAULT_SEAT_CAPACITY)
+    ).filter(Aircraft.id.in_(aircraft_ids)).all())
+
+    return {
+        schedule_id: max(capacities.get(aircraft_id, 0) - booked_count, 0)
+        for schedule_id, aircraft_id, booked_count in rows
+    }
+
+def handle_schedule_cancellation(session, schedule, rebook=True):
+    """
+    Deal with every booking on a cancelled schedule in a few set-based statements.
+
+    With rebook=True, bookings are moved (earliest booked first) onto the next
+    schedules on the same route that still have free seats, one UPDATE per
+    replacement schedule. Whatever does not fit, or everything when
+    rebook=False, is marked REFUNDED in a single UPDATE. The caller commits.
+    """
+    # Flush the caller's pending changes; the bulk updates below expire the session
+    session.flush()
+
+    result = DisruptionResult()
+    holding = (
+        Booking.flight_schedule_id == schedule.id,
+        Booking.payment_status.in_(SEAT_HOLDING_STATUSES)
+    )
+
+    remaining = session.query(func.count(Booking.id)).filter(*holding).scalar() or 0
+    if remaining == 0:
+        return result
+
+    if rebook:
+        candidate_ids = [row.id for row in session.query(FlightSchedule.id).filter(
+            FlightSchedule.id != schedule.id,
+            FlightSchedule.departure_airport == schedule.departure_airport,
+            FlightSchedule.arrival_airport == schedule.arrival_airport,
+            FlightSchedule.status != FlightStatus.CANCELLED,
+            FlightSchedule.scheduled_departure_time > schedule.scheduled_departure_time,
+            FlightSchedule.scheduled_departure_time <= schedule.scheduled_departure_time + REBOOKING_WINDOW
+        ).order_by(FlightSchedule.scheduled_departure_time)]
+        free_seats = seat_inventory(session, candidate_ids)
+
+        for candidate_id in candidate_ids:
+            take = min(free_seats.get(candidate_id, 0), remaining)
+            if take == 0:
+                continue
+
+            # Move the next block of bookings, earliest booked first
+            block = select(Booking.id).where(*holding).order_by(
+                Booking.booking_date, Booking.id
+            ).limit(take)
+            session.execute(
+                update(Booking)
+                .where(Booking.id.in_(block.scalar_subquery()))
+                .values(flight_schedule_id=candidate_id)
+                .execution_options(synchronize_session=False)
+            )
+            result.rebooked[candidate_id] = take
+            remaining -= take
+            if remaining == 0:
+                break
+
+    if remaining:
+        # Count the refunds in the revenue rollup while the rows still match
+        record_refunds(session, *holding)
+        session.execute(
+            update(Booking)
+            .where(*holding)
+            .values(payment_status=PaymentStatus.REFUNDED)
+            .execution_options(synchronize_session=False)
+        )
+        result.refunded = remaining
+
+    # The bulk updates bypass the identity map, so drop any stale bookings it holds
+    session.expire_all()
+    return result
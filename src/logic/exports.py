@@ -0,0 +1,163 @@
+import csv
+import datetime
+import enum
+import io
+import os
+import tempfile
+from dotenv import load_dotenv
+from sqlalchemy import select
+from src.utils.database import session_factory
+from src.models.user import User
+from src.models.booking import Booking
+from src.models.flight import Flight, FlightSchedule
+
+# Parquet export is optional and needs pyarrow
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# Load environment variables
+load_dotenv()
+
+# Rows read from the database per transaction, and written per CSV chunk or Parquet row group
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+# Bytes per chunk when streaming a finished Parquet file
+EXPORT_FILE_CHUNK_SIZE = 64 * 1024
+
+# Export columns in file order
+BOOKING_EXPORT_COLUMNS = [
+    Booking.id.label("booking_id"),
+    Booking.confirmation_code.label("confirmation_code"),
+    Booking.booking_date.label("booking_date"),
+    Booking.payment_status.label("payment_status"),
+    Booking.cost_charged.label("cost_charged"),
+    User.id.label("passenger_id"),
+    User.first_name.label("passenger_first_name"),
+    User.last_name.label("passenger_last_name"),
+    User.email.label("passenger_email"),
+    Flight.flight_number.label("flight_number"),
+    FlightSchedule.id.label("schedule_id"),
+    FlightSchedule.departure_airport.label("departure_airport"),
+    FlightSchedule.arrival_airport.label("arrival_airport"),
+    FlightSchedule.scheduled_departure_time.label("scheduled_departure_time"),
+    FlightSchedule.scheduled_arrival_time.label("scheduled_arrival_time"),
+    FlightSchedule.status.label("schedule_status"),
+]
+
+def parquet_available():
+    return pyarrow is not None
+
+def booking_export_statement(after_id=0, batch_size=EXPORT_BATCH_SIZE):
+    """The next batch of bookings after after_id, joined with their passenger, schedule and flight"""
+    return select(*BOOKING_EXPORT_COLUMNS).join(
+        User, Booking.passenger_id == User.id
+    ).join(
+        FlightSchedule, Booking.flight_schedule_id == FlightSchedule.id
+    ).join(
+        Flight, FlightSchedule.flight_id == Flight.id
+    ).where(Booking.id > after_id).order_by(Booking.id).limit(batch_size)
+
+def _plain(value):
+    """A value as written to CSV"""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(sep=" ")
+    return value
+
+def _arrow_value(value):
+    return value.value if isinstance(value, enum.Enum) else value
+
+def _booking_batches(batch_size):
+    """The export rows in batches read by booking id, each in its own short transaction"""
+    after_id = 0
+    while True:
+        # The session is closed before the batch is handed on: an open read holds
+        # SQLite's shared lock, which would block every write while a slow download runs
+        session = session_factory()
+        try:
+            batch = session.execute(booking_export_statement(after_id, batch_size)).all()
+        finally:
+            session.close()
+        if not batch:
+            return
+        yield batch
+        if len(batch) < batch_size:
+            return
+        after_id = batch[-1].booking_id
+
+def booking_export_batches(batch_size=EXPORT_BATCH_SIZE):
+    """
+    Yield the export as lists of plain-value rows, one list per batch.
+
+    No transaction stays open between batches, so the export can outlive the
+    request that started it and be consumed at any pace.
+    """
+    for batch in _booking_batches(batch_size):
+        yield [[_plain(value) for value in row] for row in batch]
+
+def export_column_names():
+    return [column.name for column in BOOKING_EXPORT_COLUMNS]
+
+def stream_bookings_csv(batch_size=EXPORT_BATCH_SIZE):
+    """Yield the booking export as CSV text, one chunk per batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(export_column_names())
+    for rows in booking_export_batches(batch_size):
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def _parquet_schema():
+    return pyarrow.schema([
+        ("booking_id", pyarrow.int64()),
+        ("confirmation_code", pyarrow.string()),
+        ("booking_date", pyarrow.timestamp("us")),
+        ("payment_status", pyarrow.string()),
+        ("cost_charged", pyarrow.float64()),
+        ("passenger_id", pyarrow.int64()),
+        ("passenger_first_name", pyarrow.string()),
+        ("passenger_last_name", pyarrow.string()),
+        ("passenger_email", pyarrow.string()),
+        ("flight_number", pyarrow.string()),
+        ("schedule_id", pyarrow.int64()),
+        ("departure_airport", pyarrow.string()),
+        ("arrival_airport", pyarrow.string()),
+        ("scheduled_departure_time", pyarrow.timestamp("us")),
+        ("scheduled_arrival_time", pyarrow.timestamp("us")),
+        ("schedule_status", pyarrow.string()),
+    ])
+
+def stream_bookings_parquet(batch_size=EXPORT_BATCH_SIZE):
+    """
+    Yield the booking export as a Parquet file, one row group per batch.
+
+    Parquet writes its footer last, so the file is built in a temporary file
+    on disk and then streamed; memory holds one batch at a time either way.
+    """
+    if pyarrow is None:
+        raise RuntimeError("Parquet export needs pyarrow installed")
+
+    schema = _parquet_schema()
+    with tempfile.TemporaryFile() as spool:
+        with pyarrow.parquet.ParquetWriter(spool, schema) as writer:
+            for batch in _booking_batches(batch_size):
+                columns = zip(*batch)
+                writer.write_batch(pyarrow.record_batch([
+                    pyarrow.array([_arrow_value(value) for value in values], type=field.type)
+                    for values, field in zip(columns, schema)
+                ], schema=schema))
+
+        spool.seek(0)
+        while True:
+            chunk = spool.read(EXPORT_FILE_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
@@ -0,0 +1,127 @@
+import datetime
+import threading
+import time
+from sqlalchemy import text, func
+from src.models.aircraft import Aircraft
+from src.models.flight import Flight, FlightSchedule, FlightStatus
+
+# Seconds a board version read from the database is reused by every open board in the process
+BOARD_VERSION_TTL_SECONDS = 1.0
+
+# Schedule fields shown on the board; changing any of them moves the schedule to a new version
+BOARD_TRACKED_COLUMNS = (
+    "flight_id", "departure_airport", "arrival_airport", "departure_gate",
+    "scheduled_departure_time", "scheduled_arrival_time", "status",
+)
+
+# Every insert or tracked update stamps the row with the next change_seq, so
+# "what changed since version v" is an index range scan on change_seq > v. Done
+# in triggers so bulk Core writes are tracked as well as ORM ones.
+_NEXT_SEQ = "(SELECT COALESCE(MAX(change_seq), 0) + 1 FROM flight_schedules)"
+BOARD_TRIGGERS = {
+    "flight_schedules_board_ai": (
+        f"CREATE TRIGGER flight_schedules_board_ai AFTER INSERT ON flight_schedules BEGIN "
+        f"UPDATE flight_schedules SET change_seq = {_NEXT_SEQ} WHERE id = new.id; END"
+    ),
+    "flight_schedules_board_au": (
+        f"CREATE TRIGGER flight_schedules_board_au AFTER UPDATE OF {', '.join(BOARD_TRACKED_COLUMNS)} "
+        f"ON flight_schedules BEGIN "
+        f"UPDATE flight_schedules SET change_seq = {_NEXT_SEQ} WHERE id = new.id; END"
+    ),
+}
+
+def install_board_triggers(engine):
+    """Create the change_seq triggers if they are missing"""
+    with engine.begin() as connection:
+        existing = {row[0] for row in connection.execute(text(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'flight_schedules'"
+        ))}
+        for name, ddl in BOARD_TRIGGERS.items():
+            if name not in existing:
+                connection.execute(text(ddl))
+
+def board_version(session):
+    """Latest change_seq; one seek on its index"""
+    return session.query(func.max(FlightSchedule.change_seq)).scalar() or 0
+
+class BoardVersionCache:
+    """Shares one version read between every board polling in this process"""
+
+    def __init__(self, ttl=BOARD_VERSION_TTL_SECONDS):
+        self.ttl = ttl
+        self._version = None
+        self._read_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, session):
+        with self._lock:
+            now = time.monotonic()
+            if self._version is None or now - self._read_at >= self.ttl:
+                self._version = board_version(session)
+                self._read_at = now
+            return self._version
+
+_board_version_cache = BoardVersionCache()
+
+def current_board_version(session):
+    return _board_version_cache.get(session)
+
+class BoardRow:
+    """One schedule as shown on the board"""
+    __slots__ = (
+        "schedule_id", "flight_number", "departure_airport", "arrival_airport",
+        "scheduled_departure_time", "scheduled_arrival_time", "registration_number",
+        "status", "departure_gate"
+    )
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    def as_record(self):
+        """The row as DataTable data; "id" lets the table keep track of rows"""
+        return {
+            "id": self.schedule_id,
+            "Departure": self.scheduled_departure_time.strftime("%H:%M"),
+            "Arrival": self.scheduled_arrival_time.strftime("%H:%M"),
+            "Flight": self.flight_number,
+            "Route": f"{self.departure_airport} → {self.arrival_airport}",
+            "Aircraft": self.registration_number,
+            "Status": self.status.value if self.status else FlightStatus.SCHEDULED.value,
+            "Gate": self.departure_gate or "TBA",
+        }
+
+def day_bounds(day, days=1):
+    """[start, end) datetimes covering a run of calendar days, for index range scans"""
+    start = datetime.datetime.combine(day, datetime.time.min)
+    return start, start + datetime.timedelta(days=days)
+
+def _board_query(session):
+    return session.query(
+        FlightSchedule.id,
+        Flight.flight_number,
+        FlightSchedule.departure_airport,
+        FlightSchedule.arrival_airport,
+        FlightSchedule.scheduled_departure_time,
+        FlightSchedule.scheduled_arrival_time,
+        Aircraft.registration_number,
+        FlightSchedule.status,
+        FlightSchedule.departure_gate
+    ).join(
+        Flight, FlightSchedule.flight_id == Flight.id
+    ).join(
+        Aircraft, Flight.aircraft_id == Aircraft.id
+    )
+
+def board_rows(session, start, end):
+    """Schedules departing in [start, end) with their flight and aircraft, in one range query"""
+    query = _board_query(session).filter(
+        FlightSchedule.scheduled_departure_time >= start,
+        FlightSchedule.scheduled_departure_time < end
+    ).order_by(FlightSchedule.scheduled_departure_time, FlightSchedule.id)
+    return [BoardRow(*row) for row in query]
+
+def changed_board_rows(session, since):
+    """Every schedule changed after version since, wherever it now departs"""
+    query = _board_query(session).filter(FlightSchedule.change_seq > since)
+    return [BoardRow(*row) for row in query]
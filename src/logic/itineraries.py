@@ -0,0 +1,204 @@
+import datetime
+from sqlalchemy import select, union_all, literal, func, case, or_, and_, text, event
+from src.models.booking import Booking, PaymentStatus
+from src.models.flight import Flight, FlightSchedule
+from src.models.rating import Rating
+
+# Past bookings shown per page of the history
+HISTORY_PAGE_SIZE = 10
+
+# Bookings in each list on the home page
+HOME_DASHBOARD_SIZE = 3
+
+# bookings.departure_time mirrors the schedule's departure so the history can
+# be paged on an index of the bookings table alone. Done in triggers so bulk
+# Core writes (rebooking moves bookings between schedules) keep it in step too.
+_SCHEDULE_DEPARTURE = "(SELECT scheduled_departure_time FROM flight_schedules WHERE id = new.flight_schedule_id)"
+BOOKING_DEPARTURE_TRIGGERS = {
+    "bookings_departure_ai": (
+        f"CREATE TRIGGER bookings_departure_ai AFTER INSERT ON bookings BEGIN "
+        f"UPDATE bookings SET departure_time = {_SCHEDULE_DEPARTURE} WHERE id = new.id; END"
+    ),
+    "bookings_departure_au": (
+        f"CREATE TRIGGER bookings_departure_au AFTER UPDATE OF flight_schedule_id ON bookings BEGIN "
+        f"UPDATE bookings SET departure_time = {_SCHEDULE_DEPARTURE} WHERE id = new.id; END"
+    ),
+    "flight_schedules_departure_au": (
+        "CREATE TRIGGER flight_schedules_departure_au AFTER UPDATE OF scheduled_departure_time "
+        "ON flight_schedules BEGIN "
+        "UPDATE bookings SET departure_time = new.scheduled_departure_time WHERE flight_schedule_id = new.id; END"
+    ),
+}
+
+def create_booking_departure_triggers(connection):
+    """Create whichever departure_time triggers are missing"""
+    existing = {row[0] for row in connection.execute(text(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger'"
+    ))}
+    for name, ddl in BOOKING_DEPARTURE_TRIGGERS.items():
+        if name not in existing:
+            connection.execute(text(ddl))
+
+@event.listens_for(Booking.__table__, "after_create")
+def _create_triggers_with_table(target, connection, **kw):
+    # A database built by create_all alone (init_db, seed_db) gets the triggers too
+    create_booking_departure_triggers(connection)
+
+def install_booking_departure_triggers(engine):
+    """Create the departure_time triggers if they are missing and fill it in for older bookings"""
+    with engine.begin() as connection:
+        create_booking_departure_triggers(connection)
+        connection.execute(text(
+            "UPDATE bookings SET departure_time = (SELECT scheduled_departure_time FROM flight_schedules "
+            "WHERE id = bookings.flight_schedule_id) WHERE departure_time IS NULL"
+        ))
+
+class ItineraryRecord:
+    """Everything a booking card shows, read in a single flat row"""
+    __slots__ = (
+        "booking_id", "confirmation_code", "cost_charged", "payment_status",
+        "flight_number", "departure_airport", "arrival_airport", "departure_terminal",
+        "scheduled_departure_time", "scheduled_arrival_time", "status", "rating_stars",
+        "booking_date"
+    )
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    @property
+    def has_rating(self):
+        return self.rating_stars is not None
+
+def itinerary_query(session, user_id):
+    """Bookings joined to their schedule, flight and (optional) rating as plain columns"""
+    return session.query(
+        Booking.id,
+        Booking.confirmation_code,
+        Booking.cost_charged,
+        Booking.payment_status,
+        Flight.flight_number,
+        FlightSchedule.departure_airport,
+        FlightSchedule.arrival_airport,
+        FlightSchedule.departure_terminal,
+        FlightSchedule.scheduled_departure_time,
+        FlightSchedule.scheduled_arrival_time,
+        FlightSchedule.status,
+        Rating.stars,
+        Booking.booking_date
+    ).join(
+        FlightSchedule, Booking.flight_schedule_id == FlightSchedule.id
+    ).join(
+        Flight, FlightSchedule.flight_id == Flight.id
+    ).outerjoin(
+        Rating, Rating.booking_id == Booking.id
+    ).filter(Booking.passenger_id == user_id)
+
+def upcoming_itineraries(session, user_id, now=None):
+    """A user's bookings departing after now, soonest first, in one statement"""
+    now = now or datetime.datetime.now()
+    rows = itinerary_query(session, user_id).filter(
+        FlightSchedule.scheduled_departure_time > now
+    ).order_by(FlightSchedule.scheduled_departure_time.asc(), Booking.id.asc())
+    return [ItineraryRecord(*row) for row in rows]
+
+def past_itineraries(session, user_id, limit=None, before=None, now=None):
+    """
+    A user's bookings that have already departed, most recent first, in one statement.
+
+    Pages are read with a keyset rather than an offset: pass the cursor of the
+    last record shown as before=(departure, booking_id) and only older rows are
+    returned. Filtering and ordering use the booking's own copy of the departure,
+    so each page is a seek on ix_bookings_passenger_departure that stops after
+    limit rows, and later pages cost the same as the first.
+    """
+    now = now or datetime.datetime.now()
+    query = itinerary_query(session, user_id).filter(
+        Booking.departure_time <= now
+    )
+    if before is not None:
+        departure, booking_id = before
+        query = query.filter(or_(
+            Booking.departure_time < departure,
+            and_(Booking.departure_time == departure, Booking.id < booking_id)
+        ))
+    query = query.order_by(Booking.departure_time.desc(), Booking.id.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    return [ItineraryRecord(*row) for row in query]
+
+def itinerary_cursor(itinerary):
+    """Keyset position of a record, for fetching the page after it"""
+    return itinerary.scheduled_departure_time, itinerary.booking_id
+
+def past_itineraries_page(session, user_id, before=None, now=None):
+    """One page of past itineraries and the cursor of the page after it (None on the last page)"""
+    # Read one extra row to find out whether another page follows
+    itineraries = past_itineraries(session, user_id, limit=HISTORY_PAGE_SIZE + 1, before=before, now=now)
+    page = itineraries[:HISTORY_PAGE_SIZE]
+    next_cursor = itinerary_cursor(page[-1]) if len(itineraries) > HISTORY_PAGE_SIZE else None
+    return page, next_cursor
+
+def booking_history_summary(session, user_id, now=None):
+    """Trips taken and lifetime spend on paid bookings, aggregated in SQL"""
+    now = now or datetime.datetime.now()
+    trips, total_spend = session.query(
+        func.sum(case((FlightSchedule.scheduled_departure_time <= now, 1), else_=0)),
+        func.sum(Booking.cost_charged)
+    ).join(
+        FlightSchedule, Booking.flight_schedule_id == FlightSchedule.id
+    ).filter(
+        Booking.passenger_id == user_id,
+        Booking.payment_status == PaymentStatus.COMPLETED
+    ).one()
+    return trips or 0, total_spend or 0.0
+
+class HomeDashboard:
+    """The home page's upcoming and recent bookings plus the user's booking counts"""
+    __slots__ = ("upcoming", "recent", "total_bookings", "upcoming_bookings")
+
+    def __init__(self, upcoming, recent, total_bookings, upcoming_bookings):
+        self.upcoming = upcoming
+        self.recent = recent
+        self.total_bookings = total_bookings
+        self.upcoming_bookings = upcoming_bookings
+
+def home_dashboard(session, user_id, now=None, size=HOME_DASHBOARD_SIZE):
+    """
+    Both home page lists and the booking count in a single round trip.
+
+    The next few upcoming bookings and the most recently made ones are read as
+    two limited subqueries combined with UNION ALL; every row also carries the
+    user's total and upcoming booking counts as scalar subqueries.
+    """
+    now = now or datetime.datetime.now()
+    upcoming = itinerary_query(session, user_id).filter(
+        FlightSchedule.scheduled_departure_time > now
+    ).order_by(
+        FlightSchedule.scheduled_departure_time.asc(), Booking.id.asc()
+    ).limit(size).subquery()
+    recent = itinerary_query(session, user_id).order_by(
+        Booking.booking_date.desc(), Booking.id.desc()
+    ).limit(size).subquery()
+    total = select(func.count(Booking.id)).where(Booking.passenger_id == user_id).scalar_subquery()
+    upcoming_total = select(func.count(Booking.id)).join(
+        FlightSchedule, Booking.flight_schedule_id == FlightSchedule.id
+    ).where(
+        Booking.passenger_id == user_id,
+        FlightSchedule.scheduled_departure_time > now
+    ).scalar_subquery()
+
+    statement = union_all(*(
+        select(literal(section).label("section"), total.label("total"), upcoming_total.label("upcoming_total"), rows)
+        for section, rows in (("upcoming", upcoming), ("recent", recent))
+    ))
+
+    sections = {"upcoming": [], "recent": []}
+    total_bookings = upcoming_bookings = 0
+    for section, total_bookings, upcoming_bookings, *values in session.execute(statement):
+        sections[section].append(ItineraryRecord(*values))
+
+    # UNION ALL does not promise to keep each branch's order
+    sections["upcoming"].sort(key=lambda itinerary: (itinerary.scheduled_departure_time, itinerary.booking_id))
+    sections["recent"].sort(key=lambda itinerary: (itinerary.booking_date, itinerary.booking_id), reverse=True)
+    return HomeDashboard(sections["upcoming"], sections["recent"], total_bookings, upcoming_bookings)
@@ -0,0 +1,147 @@
+import datetime
+import threading
+from src.utils.database import session_factory
+from src.models.booking import Booking
+from src.logic.itineraries import (
+    upcoming_itineraries, past_itineraries_page, booking_history_summary, home_dashboard
+)
+
+# Safety net for changes made outside the app; normal changes invalidate entries directly
+ITINERARY_CACHE_MAX_AGE = datetime.timedelta(minutes=10)
+
+class UserItineraries:
+    """A snapshot of one user's bookings as shown on the bookings page"""
+    __slots__ = ("upcoming", "past", "past_cursor", "trips", "total_spend")
+
+    def __init__(self, upcoming, past, past_cursor, trips, total_spend):
+        self.upcoming = upcoming
+        # First page of history, and the cursor for the page after it
+        self.past = past
+        self.past_cursor = past_cursor
+        self.trips = trips
+        self.total_spend = total_spend
+
+class CachedValue:
+    __slots__ = ("value", "valid_until")
+
+    def __init__(self, value, valid_until):
+        self.value = value
+        self.valid_until = valid_until
+
+class PendingLoads:
+    """Loads of one user's views in flight, and invalidations since the first began"""
+    __slots__ = ("count", "generation")
+
+    def __init__(self):
+        self.count = 0
+        self.generation = 0
+
+class ItineraryCache:
+    """
+    Per-user itinerary snapshots shared by the home page and the bookings page.
+
+    Each page's view of a user is cached separately, and all of a user's
+    views are dropped together when they book or rate a flight, when a
+    schedule they are booked on changes, or when their next flight departs
+    (at which point it moves from upcoming to past).
+    """
+
+    def __init__(self, session_factory=session_factory, max_age=ITINERARY_CACHE_MAX_AGE):
+        self.session_factory = session_factory
+        self.max_age = max_age
+        self._entries = {}
+        # Only users with a load in flight are tracked; an invalidation bumps
+        # their generation so a load that raced it is not stored
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        """The user's bookings page snapshot, loaded from the database only when not cached"""
+        return self._get(user_id, "bookings", self._load_bookings)
+
+    def home(self, user_id):
+        """The user's HomeDashboard, loaded from the database only when not cached"""
+        return self._get(user_id, "home", self._load_home)
+
+    def _get(self, user_id, view, loader):
+        now = datetime.datetime.now()
+        with self._lock:
+            cached = self._entries.get(user_id, {}).get(view)
+            if cached is not None and now < cached.valid_until:
+                return cached.value
+            pending = self._pending.setdefault(user_id, PendingLoads())
+            pending.count += 1
+            generation = pending.generation
+
+        stored = False
+        try:
+            session = self.session_factory()
+            try:
+                value, next_departure = loader(session, user_id, now)
+            finally:
+                session.close()
+
+            # The snapshot goes stale once the next upcoming flight departs
+            valid_until = now + self.max_age
+            if next_departure is not None:
+                valid_until = min(valid_until, next_departure)
+            stored = True
+        finally:
+            with self._lock:
+                # An invalidation during the load may have come after the rows were read
+                if stored and pending.generation == generation:
+                    self._entries.setdefault(user_id, {})[view] = CachedValue(value, valid_until)
+                pending.count -= 1
+                if pending.count == 0:
+                    del self._pending[user_id]
+        return value
+
+    @staticmethod
+    def _load_bookings(session, user_id, now):
+        upcoming = upcoming_itineraries(session, user_id, now)
+        past, past_cursor = past_itineraries_page(session, user_id, now=now)
+        trips, total_spend = booking_history_summary(session, user_id, now)
+        next_departure = upcoming[0].scheduled_departure_time if upcoming else None
+        return UserItineraries(upcoming, past, past_cursor, trips, total_spend), next_departure
+
+    @staticmethod
+    def _load_home(session, user_id, now):
+        dashboard = home_dashboard(session, user_id, now)
+        next_departure = dashboard.upcoming[0].scheduled_departure_time if dashboard.upcoming else None
+        return dashboard, next_departure
+
+    def invalidate(self, user_id):
+        """Forget one user's snapshots"""
+        self.invalidate_users([user_id])
+
+    def invalidate_users(self, user_ids):
+        """Forget the snapshots of several users"""
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+                pending = self._pending.get(user_id)
+                if pending is not None:
+                    pending.generation += 1
+
+    def invalidate_bookings(self, session, booking_ids):
+        """Forget the snapshots of whoever holds the given bookings"""
+        if not booking_ids:
+            return
+        rows = session.query(Booking.passenger_id).filter(Booking.id.in_(booking_ids)).distinct()
+        self.invalidate_users([row.passenger_id for row in rows])
+
+def schedule_passenger_ids(session, schedule_id):
+    """Users booked on a schedule, i.e. whose itineraries a change to it affects"""
+    rows = session.query(Booking.passenger_id).filter(Booking.flight_schedule_id == schedule_id).distinct()
+    return [row.passenger_id for row in rows]
+
+_itinerary_cache = None
+_itinerary_cache_lock = threading.Lock()
+
+def get_itinerary_cache():
+    """Get the shared itinerary cache"""
+    global _itinerary_cache
+    with _itinerary_cache_lock:
+        if _itinerary_cache is None:
+            _itinerary_cache = ItineraryCache()
+        return _itinerary_cache
@@ -0,0 +1,189 @@
+import datetime
+import os
+import threading
+from dotenv import load_dotenv
+from sqlalchemy import event, update, select, func, literal
+from sqlalchemy.dialects.sqlite import insert
+from src.utils.database import session_factory
+from src.models.user import User
+from src.models.role import Role, UserRole
+from src.models.aircraft import Aircraft
+from src.models.flight import Flight, FlightSchedule
+from src.models.booking import Booking
+from src.models.kpi import KpiSnapshot
+
+# Load environment variables
+load_dotenv()
+
+KPI_RECONCILE_INTERVAL_SECONDS = float(os.getenv("KPI_RECONCILE_INTERVAL_SECONDS", "900"))
+
+# The snapshot is a single row
+KPI_ROW_ID = 1
+
+# Days of per-day booking counts kept, enough for "today" and "this week"
+KPI_DAILY_WINDOW_DAYS = 8
+
+ADMIN_ROLES = ("admin",)
+STAFF_ROLES = ("technical_staff", "non_technical_staff")
+
+snapshot = KpiSnapshot.__table__
+
+def _apply(connection, **values):
+    """Apply column expressions to the snapshot row on the flushing connection"""
+    connection.execute(update(snapshot).where(snapshot.c.id == KPI_ROW_ID).values(**values))
+
+def _add(connection, **deltas):
+    """Increment snapshot counters by the given amounts"""
+    _apply(connection, **{name: snapshot.c[name] + delta for name, delta in deltas.items()})
+
+def _day_path(moment):
+    return f'$."{moment.date().isoformat()}"'
+
+# Counters kept in step with ORM inserts and deletes. They run inside the flush,
+# so a counter changes in the same transaction as the row it counts. Core bulk
+# writes skip these hooks and are picked up by the next reconciliation.
+
+@event.listens_for(Booking, "after_insert")
+def _booking_inserted(mapper, connection, target):
+    path = _day_path(target.booking_date or datetime.datetime.utcnow())
+    daily = func.coalesce(snapshot.c.daily_bookings, "{}")
+    _apply(
+        connection,
+        total_bookings=snapshot.c.total_bookings + 1,
+        total_revenue=snapshot.c.total_revenue + (target.cost_charged or 0),
+        daily_bookings=func.json_set(daily, path, func.coalesce(func.json_extract(daily, path), 0) + 1)
+    )
+
+@event.listens_for(Booking, "after_delete")
+def _booking_deleted(mapper, connection, target):
+    _add(connection, total_bookings=-1, total_revenue=-(target.cost_charged or 0))
+
+@event.listens_for(User, "after_insert")
+def _user_inserted(mapper, connection, target):
+    role_names = {role.name for role in target.roles}
+    _add(
+        connection,
+        total_users=1,
+        admin_users=int(bool(role_names & set(ADMIN_ROLES))),
+        staff_users=int(bool(role_names & set(STAFF_ROLES)))
+    )
+
+@event.listens_for(Flight, "after_insert")
+def _flight_inserted(mapper, connection, target):
+    _add(connection, total_flights=1)
+
+@event.listens_for(Flight, "after_delete")
+def _flight_deleted(mapper, connection, target):
+    _add(connection, total_flights=-1)
+
+@event.listens_for(FlightSchedule, "after_insert")
+def _schedule_inserted(mapper, connection, target):
+    _add(connection, total_schedules=1)
+
+@event.listens_for(FlightSchedule, "after_delete")
+def _schedule_deleted(mapper, connection, target):
+    _add(connection, total_schedules=-1)
+
+@event.listens_for(Aircraft, "after_insert")
+def _aircraft_inserted(mapper, connection, target):
+    _add(connection, total_aircraft=1)
+
+@event.listens_for(Aircraft, "after_delete")
+def _aircraft_deleted(mapper, connection, target):
+    _add(connection, total_aircraft=-1)
+
+def record_bulk_schedules(connection, count):
+    """Count schedules written with a Core bulk insert, which skips the hooks above"""
+    _add(connection, total_schedules=count)
+
+def _users_with_roles(role_names):
+    return select(func.count(func.distinct(UserRole.user_id))).join(
+        Role, UserRole.role_id == Role.id
+    ).where(Role.name.in_(role_names)).scalar_subquery()
+
+def reconcile_kpis(session):
+    """Recount every KPI from the source tables and overwrite the snapshot; the caller commits"""
+    session.execute(insert(snapshot).values(id=KPI_ROW_ID).on_conflict_do_nothing())
+
+    since = datetime.datetime.now() - datetime.timedelta(days=KPI_DAILY_WINDOW_DAYS)
+    per_day = select(
+        func.date(Booking.booking_date).label("day"),
+        func.count(Booking.id).label("bookings")
+    ).where(Booking.booking_date >= since).group_by(func.date(Booking.booking_date)).subquery()
+
+    # One statement, so no counter update can land between the reads and the write
+    session.execute(update(snapshot).where(snapshot.c.id == KPI_ROW_ID).values(
+        total_users=select(func.count(User.id)).scalar_subquery(),
+        admin_users=_users_with_roles(ADMIN_ROLES),
+        staff_users=_users_with_roles(STAFF_ROLES),
+        total_bookings=select(func.count(Booking.id)).scalar_subquery(),
+        total_revenue=select(func.coalesce(func.sum(Booking.cost_charged), 0.0)).scalar_subquery(),
+        daily_bookings=select(
+            func.coalesce(func.json_group_object(per_day.c.day, per_day.c.bookings), literal("{}"))
+        ).scalar_subquery(),
+        total_flights=select(func.count(Flight.id)).scalar_subquery(),
+        total_schedules=select(func.count(FlightSchedule.id)).scalar_subquery(),
+        total_aircraft=select(func.count(Aircraft.id)).scalar_subquery(),
+        reconciled_at=datetime.datetime.utcnow()
+    ))
+
+def get_kpi_snapshot(session):
+    """The KPI snapshot row, built by a reconciliation the first time it is needed"""
+    row = session.get(KpiSnapshot, KPI_ROW_ID)
+    if row is None or row.reconciled_at is None:
+        reconcile_kpis(session)
+        session.commit()
+        row = session.get(KpiSnapshot, KPI_ROW_ID, populate_existing=True)
+    return row
+
+class KpiReconciler:
+    """Periodically recounts the KPI snapshot to correct any drift, e.g. from bulk writes"""
+
+    def __init__(self, session_factory=session_factory, interval=KPI_RECONCILE_INTERVAL_SECONDS):
+        self.session_factory = session_factory
+        self.interval = interval
+        self._thread = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the reconciler thread if it is not running"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="kpi-reconciler", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stopping.set()
+            thread.join()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self.reconcile()
+            self._stopping.wait(self.interval)
+
+    def reconcile(self):
+        session = self.session_factory()
+        try:
+            reconcile_kpis(session)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"Error reconciling KPI snapshot: {e}")
+        finally:
+            session.close()
+
+_kpi_reconciler = None
+_kpi_reconciler_lock = threading.Lock()
+
+def get_kpi_reconciler():
+    """Get the shared KPI reconciler"""
+    global _kpi_reconciler
+    with _kpi_reconciler_lock:
+        if _kpi_reconciler is None:
+            _kpi_reconciler = KpiReconciler()
+        return _kpi_reconciler
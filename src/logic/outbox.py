@@ -0,0 +1,251 @@
+import abc
+import datetime
+import json
+import os
+import random
+import smtplib
+import threading
+from email.message import EmailMessage
+from dotenv import load_dotenv
+from sqlalchemy import update, select, or_, and_
+from src.utils.database import session_factory
+from src.models.booking import Booking
+from src.models.outbox import OutboxMessage, OutboxStatus
+
+# Load environment variables
+load_dotenv()
+
+COMPANY_NAME = os.getenv("COMPANY_NAME", "Northeastern Airways")
+OUTBOX_SENDER = os.getenv("OUTBOX_SENDER", "file")
+OUTBOX_FROM_ADDRESS = os.getenv("ADMIN_EMAIL", "admin@northeastern-airways.com")
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+OUTBOX_POLL_INTERVAL_SECONDS = float(os.getenv("OUTBOX_POLL_INTERVAL_SECONDS", "5"))
+OUTBOX_MAX_ATTEMPTS = 8
+
+# A message claimed longer ago than this belongs to a dispatcher that stopped mid-send
+OUTBOX_CLAIM_TIMEOUT_SECONDS = float(os.getenv("OUTBOX_CLAIM_TIMEOUT_SECONDS", "600"))
+
+# Retry delays double from the base up to the cap, with some jitter
+OUTBOX_BACKOFF_BASE_SECONDS = 5
+OUTBOX_BACKOFF_MAX_SECONDS = 60 * 60
+
+THANK_YOU = "thank_you"
+
+class MessageSender(abc.ABC):
+    """Interface every outbox sender implements"""
+
+    @abc.abstractmethod
+    def send(self, message):
+        """Deliver one OutboxMessage; raise to have it retried later"""
+
+class SmtpSender(MessageSender):
+    """Sends through an SMTP server, e.g. a local debugging server on port 1025"""
+
+    def __init__(self, host=None, port=None):
+        self.host = host or os.getenv("SMTP_HOST", "localhost")
+        self.port = port or int(os.getenv("SMTP_PORT", "1025"))
+
+    def send(self, message):
+        email = EmailMessage()
+        email["From"] = OUTBOX_FROM_ADDRESS
+        email["To"] = message.recipient
+        email["Subject"] = message.subject
+        email.set_content(message.body)
+        with smtplib.SMTP(self.host, self.port, timeout=10) as smtp:
+            smtp.send_message(email)
+
+class FileSender(MessageSender):
+    """Appends messages to a JSON-lines file instead of sending them"""
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv("OUTBOX_FILE", "outbox_messages.jsonl")
+        self._lock = threading.Lock()
+
+    def send(self, message):
+        record = {
+            "id": message.id,
+            "kind": message.kind,
+            "to": message.recipient,
+            "subject": message.subject,
+            "body": message.body,
+            "sent_at": datetime.datetime.utcnow().isoformat(),
+        }
+        with self._lock, open(self.path, "a", encoding="utf-8") as sink:
+            sink.write(json.dumps(record) + "\n")
+
+# Senders selectable through the OUTBOX_SENDER environment variable
+SENDERS = {
+    "smtp": SmtpSender,
+    "file": FileSender,
+}
+
+def queue_thank_you(session, booking):
+    """Add a thank-you message for a rated booking to the caller's transaction"""
+    passenger = booking.passenger
+    flight = booking.flight_schedule.flight
+    session.add(OutboxMessage(
+        kind=THANK_YOU,
+        booking_id=booking.id,
+        recipient=passenger.email,
+        subject=f"Thank you for flying with {COMPANY_NAME}",
+        body=(
+            f"Dear {passenger.first_name},\n\n"
+            f"Thank you for flying with us on flight {flight.flight_number} and for taking "
+            f"the time to rate your journey. Your feedback helps us improve our service.\n\n"
+            f"We look forward to welcoming you aboard again soon!\n\n"
+            f"{COMPANY_NAME}"
+        )
+    ))
+
+def backoff_delay(attempts):
+    """Seconds to wait before the next attempt after this many failures"""
+    delay = min(OUTBOX_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), OUTBOX_BACKOFF_MAX_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+class OutboxDispatcher:
+    """
+    Drains the outbox on a background thread.
+
+    Due messages are claimed in batches by moving them to SENDING in one
+    UPDATE, so a message is taken by one dispatcher however many processes
+    run one. Each is then handed to the sender and its outcome committed
+    straight away, so a crash re-sends at most the message in flight;
+    claims older than OUTBOX_CLAIM_TIMEOUT_SECONDS are taken up again.
+    Failed messages are retried with exponential backoff until
+    OUTBOX_MAX_ATTEMPTS, after which they are marked FAILED. Callers only
+    ever notify() the thread, so writing a message never waits on delivery.
+    """
+
+    def __init__(self, sender, session_factory=session_factory, batch_size=OUTBOX_BATCH_SIZE,
+                 poll_interval=OUTBOX_POLL_INTERVAL_SECONDS, max_attempts=OUTBOX_MAX_ATTEMPTS):
+        self.sender = sender
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self._thread = None
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the dispatcher thread if it is not running"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="outbox-dispatcher", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """Finish the current batch and stop"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stopping.set()
+            self._wakeup.set()
+            thread.join()
+
+    def notify(self):
+        """Tell the dispatcher new messages are waiting; returns immediately"""
+        self.start()
+        self._wakeup.set()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                # Keep going while full batches come back, then wait for more
+                while self.dispatch() == self.batch_size and not self._stopping.is_set():
+                    pass
+            except Exception as e:
+                print(f"Error dispatching outbox messages: {e}")
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def _claim(self, session, now):
+        """Move a batch of due messages to SENDING and return them, detached from the session"""
+        stale = now - datetime.timedelta(seconds=OUTBOX_CLAIM_TIMEOUT_SECONDS)
+        due = or_(
+            and_(OutboxMessage.status == OutboxStatus.PENDING, OutboxMessage.next_attempt_at <= now),
+            and_(OutboxMessage.status == OutboxStatus.SENDING, OutboxMessage.claimed_at < stale)
+        )
+        claimed = session.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id.in_(
+                select(OutboxMessage.id).where(due).order_by(OutboxMessage.id).limit(self.batch_size)
+            ), due)
+            .values(status=OutboxStatus.SENDING, claimed_at=now)
+            .returning(OutboxMessage.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        session.commit()
+        if not claimed:
+            return []
+
+        messages = session.query(OutboxMessage).filter(
+            OutboxMessage.id.in_(claimed)
+        ).order_by(OutboxMessage.id).all()
+        # Detached, so the commit after each send does not expire them
+        session.expunge_all()
+        return messages
+
+    def dispatch(self):
+        """Claim and send one batch of due messages; returns how many were attempted"""
+        session = self.session_factory()
+        try:
+            now = datetime.datetime.utcnow()
+            messages = self._claim(session, now)
+
+            for message in messages:
+                try:
+                    self.sender.send(message)
+                except Exception as e:
+                    attempts = message.attempts + 1
+                    outcome = {"attempts": attempts, "last_error": str(e)}
+                    if attempts >= self.max_attempts:
+                        outcome["status"] = OutboxStatus.FAILED
+                    else:
+                        outcome["status"] = OutboxStatus.PENDING
+                        outcome["next_attempt_at"] = now + datetime.timedelta(seconds=backoff_delay(attempts))
+                else:
+                    outcome = {
+                        "attempts": message.attempts + 1,
+                        "status": OutboxStatus.SENT,
+                        "sent_at": datetime.datetime.utcnow(),
+                    }
+                    # The thank-you flag records delivery, not the request to send
+                    if message.kind == THANK_YOU and message.booking_id:
+                        session.execute(
+                            update(Booking)
+                            .where(Booking.id == message.booking_id)
+                            .values(thank_you_sent=True)
+                            .execution_options(synchronize_session=False)
+                        )
+
+                # Each outcome is committed as soon as it is known, so a crash never re-sends it
+                session.execute(
+                    update(OutboxMessage)
+                    .where(OutboxMessage.id == message.id)
+                    .values(**outcome)
+                    .execution_options(synchronize_session=False)
+                )
+                session.commit()
+            return len(messages)
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+_outbox_dispatcher = None
+_outbox_dispatcher_lock = threading.Lock()
+
+def get_outbox_dispatcher():
+    """Get the shared outbox dispatcher using the configured sender"""
+    global _outbox_dispatcher
+    with _outbox_dispatcher_lock:
+        if _outbox_dispatcher is None:
+            sender_class = SENDERS.get(OUTBOX_SENDER)
+            if sender_class is None:
+                raise ValueError(f"Unknown outbox sender: {OUTBOX_SENDER}")
+            _outbox_dispatcher = OutboxDispatcher(sender_class())
+        return _outbox_dispatcher
@@ -0,0 +1,292 @@
+import abc
+import datetime
+import os
+import queue
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from sqlalchemy import update, or_, and_
+from src.utils.database import session_factory
+from src.models.booking import Booking, PaymentStatus
+from src.logic.itinerary_cache import get_itinerary_cache
+from src.logic.pricing import get_price_table
+from src.logic.booking_stats import record_failures
+
+# Load environment variables
+load_dotenv()
+
+PAYMENT_GATEWAY = os.getenv("PAYMENT_GATEWAY", "simulated")
+PAYMENT_WORKERS = int(os.getenv("PAYMENT_WORKERS", "4"))
+
+# A booking claimed longer ago than this belongs to a process that stopped mid-charge
+PAYMENT_CLAIM_TIMEOUT_SECONDS = float(os.getenv("PAYMENT_CLAIM_TIMEOUT_SECONDS", "600"))
+PAYMENT_FLUSH_INTERVAL_SECONDS = float(os.getenv("PAYMENT_FLUSH_INTERVAL_SECONDS", "0.5"))
+PAYMENT_FLUSH_MAX_BATCH = 200
+
+class PaymentGateway(abc.ABC):
+    """Interface every payment gateway implements"""
+
+    @abc.abstractmethod
+    def charge(self, booking_id, amount):
+        """
+        Charge the amount for a booking.
+
+        Returns True when the payment was captured and False when it was
+        declined. Raising counts as a failed payment. Bookings are claimed
+        before they are charged, so each is charged once; only a charge cut
+        off by a crash is sent again after a restart, so implementations
+        should still treat booking_id as an idempotency key.
+        """
+
+    @abc.abstractmethod
+    def refund(self, booking_id, amount):
+        """
+        Give back a captured payment, for a booking refunded while its charge
+        was already at the gateway. Returns True once the money is returned;
+        raising or returning False leaves it to be refunded by hand.
+        """
+
+class SimulatedGateway(PaymentGateway):
+    """Local stand-in for a real gateway with configurable latency and decline rate"""
+
+    def __init__(self, latency_ms=None, failure_rate=None):
+        if latency_ms is None:
+            latency_ms = float(os.getenv("PAYMENT_GATEWAY_LATENCY_MS", "800"))
+        if failure_rate is None:
+            failure_rate = float(os.getenv("PAYMENT_GATEWAY_FAILURE_RATE", "0.02"))
+        self.latency = latency_ms / 1000.0
+        self.failure_rate = failure_rate
+
+    def charge(self, booking_id, amount):
+        time.sleep(self.latency)
+        return random.random() >= self.failure_rate
+
+    def refund(self, booking_id, amount):
+        time.sleep(self.latency)
+        return True
+
+# Gateways selectable through the PAYMENT_GATEWAY environment variable
+GATEWAYS = {
+    "simulated": SimulatedGateway,
+}
+
+class PaymentProcessor:
+    """
+    Takes payments off the request path.
+
+    Bookings are submitted as PENDING and charged by a pool of worker threads.
+    A worker first claims its booking by moving it to PROCESSING, so a
+    booking is charged once however many processes resume payments, and
+    not at all once it is no longer pending, e.g. refunded. A charge that
+    was already at the gateway when its booking was refunded is given back. Outcomes are collected and
+    written back by a single flusher thread in batched UPDATE statements,
+    one per resulting status.
+    """
+
+    def __init__(self, gateway, session_factory=session_factory, workers=PAYMENT_WORKERS,
+                 flush_interval=PAYMENT_FLUSH_INTERVAL_SECONDS, max_batch=PAYMENT_FLUSH_MAX_BATCH):
+        self.gateway = gateway
+        self.session_factory = session_factory
+        self.workers = workers
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._executor = None
+        self._outcomes = queue.Queue()
+        self._flusher = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the worker pool and the status flusher if they are not running"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="payment-worker")
+            if self._flusher is None or not self._flusher.is_alive():
+                self._stopping.clear()
+                self._flusher = threading.Thread(target=self._run_flusher, name="payment-flusher", daemon=True)
+                self._flusher.start()
+
+    def stop(self):
+        """Wait for in-flight payments, write their outcomes and stop"""
+        with self._lock:
+            executor, flusher = self._executor, self._flusher
+            self._executor = self._flusher = None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        if flusher is not None:
+            self._stopping.set()
+            flusher.join()
+
+    def submit(self, booking_id, amount):
+        """Queue a pending booking for payment and return immediately"""
+        self.start()
+        self._executor.submit(self._charge, booking_id, amount)
+
+    def resume_pending(self):
+        """
+        Claim and resubmit bookings still pending, and those whose claim has
+        gone stale, e.g. after a restart interrupted them; returns how many.
+        """
+        now = datetime.datetime.utcnow()
+        stale = now - datetime.timedelta(seconds=PAYMENT_CLAIM_TIMEOUT_SECONDS)
+        session = self.session_factory()
+        try:
+            # One UPDATE claims them all, so a second process resuming at the same time finds none left
+            claimed = session.execute(
+                update(Booking)
+                .where(or_(
+                    Booking.payment_status == PaymentStatus.PENDING,
+                    and_(
+                        Booking.payment_status == PaymentStatus.PROCESSING,
+                        or_(Booking.payment_claimed_at.is_(None), Booking.payment_claimed_at < stale)
+                    )
+                ))
+                .values(payment_status=PaymentStatus.PROCESSING, payment_claimed_at=now)
+                .returning(Booking.id, Booking.cost_charged)
+            ).all()
+            session.commit()
+        finally:
+            session.close()
+
+        self.start()
+        for booking_id, amount in claimed:
+            self._executor.submit(self._charge, booking_id, amount, claimed=True)
+        return len(claimed)
+
+    def _claim(self, booking_id):
+        """Move a pending booking to PROCESSING; returns False if it was not pending"""
+        session = self.session_factory()
+        try:
+            claimed = session.execute(
+                update(Booking)
+                .where(Booking.id == booking_id, Booking.payment_status == PaymentStatus.PENDING)
+                .values(payment_status=PaymentStatus.PROCESSING, payment_claimed_at=datetime.datetime.utcnow())
+                .returning(Booking.id)
+            ).first()
+            session.commit()
+            return claimed is not None
+        finally:
+            session.close()
+
+    def _charge(self, booking_id, amount, claimed=False):
+        if not claimed:
+            try:
+                claimed = self._claim(booking_id)
+            except Exception as e:
+                # Left pending, so the next resume picks it up
+                print(f"Error claiming payment for booking {booking_id}: {e}")
+                return
+            if not claimed:
+                # Claimed by another process, or no longer pending, e.g. refunded
+                return
+        try:
+            captured = self.gateway.charge(booking_id, amount)
+        except Exception as e:
+            print(f"Payment gateway error for booking {booking_id}: {e}")
+            captured = False
+        self._outcomes.put((booking_id, PaymentStatus.COMPLETED if captured else PaymentStatus.FAILED))
+
+    def _give_back(self, booking_id, amount):
+        try:
+            refunded = self.gateway.refund(booking_id, amount)
+        except Exception as e:
+            print(f"Payment gateway error refunding booking {booking_id}: {e}")
+            refunded = False
+        if not refunded:
+            print(f"Booking {booking_id} was refunded but its payment of {amount:.2f} was captured; refund it by hand")
+
+    def _run_flusher(self):
+        while True:
+            stopping = self._stopping.wait(self.flush_interval)
+            self.flush()
+            if stopping:
+                return
+
+    def flush(self):
+        """Write the outcomes collected so far in batches; returns how many were written"""
+        written = 0
+        # Only drain what is already queued, so outcomes put back after a failure wait for the next flush
+        remaining = self._outcomes.qsize()
+        while remaining > 0:
+            batch = []
+            while len(batch) < min(self.max_batch, remaining):
+                try:
+                    batch.append(self._outcomes.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                break
+            remaining -= len(batch)
+            if self._apply(batch):
+                written += len(batch)
+        return written
+
+    def _apply(self, outcomes):
+        """Apply a batch of outcomes with one UPDATE per target status; returns whether it committed"""
+        by_status = {}
+        for booking_id, status in outcomes:
+            by_status.setdefault(status, []).append(booking_id)
+
+        session = self.session_factory()
+        try:
+            released = Counter()
+            captured = []
+            for status, booking_ids in by_status.items():
+                # Only bookings still being charged move, so a refund issued meanwhile is never overwritten
+                moving = (Booking.id.in_(booking_ids), Booking.payment_status == PaymentStatus.PROCESSING)
+                if status == PaymentStatus.FAILED:
+                    # Declined bookings leave the revenue rollup while the rows still match
+                    record_failures(session, *moving)
+                moved = dict(session.execute(
+                    update(Booking)
+                    .where(*moving)
+                    .values(payment_status=status)
+                    .returning(Booking.id, Booking.flight_schedule_id)
+                ).all())
+                if status == PaymentStatus.FAILED:
+                    released.update(moved.values())
+                elif status == PaymentStatus.COMPLETED:
+                    # Refunded while the charge was at the gateway, e.g. by a cancellation
+                    missed = set(booking_ids) - moved.keys()
+                    if missed:
+                        captured.extend(session.query(Booking.id, Booking.cost_charged).filter(
+                            Booking.id.in_(missed), Booking.payment_status == PaymentStatus.REFUNDED
+                        ).all())
+            session.commit()
+
+            # A refunded booking is never left charged
+            for booking_id, amount in captured:
+                self._give_back(booking_id, amount)
+
+            # A declined booking no longer holds its seat, so its schedule's fare comes down again
+            get_price_table().record_bookings({schedule_id: -seats for schedule_id, seats in released.items()})
+
+            # Payment status shows on the passengers' booking cards
+            get_itinerary_cache().invalidate_bookings(session, [booking_id for booking_id, _ in outcomes])
+            return True
+        except Exception as e:
+            session.rollback()
+            print(f"Error updating payment statuses: {e}")
+            # Put the outcomes back so the next flush retries them
+            for outcome in outcomes:
+                self._outcomes.put(outcome)
+            return False
+        finally:
+            session.close()
+
+_payment_processor = None
+_payment_processor_lock = threading.Lock()
+
+def get_payment_processor():
+    """Get the shared payment processor using the configured gateway"""
+    global _payment_processor
+    with _payment_processor_lock:
+        if _payment_processor is None:
+            gateway_class = GATEWAYS.get(PAYMENT_GATEWAY)
+            if gateway_class is None:
+                raise ValueError(f"Unknown payment gateway: {PAYMENT_GATEWAY}")
+            _payment_processor = PaymentProcessor(gateway_class())
+        return _payment_processor
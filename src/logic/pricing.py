@@ -0,0 +1,360 @@
+import datetime
+import threading
+import time
+import numpy as np
+from sqlalchemy import select, func
+from src.utils.database import session_factory
+from src.models.aircraft import Aircraft, DEFAULT_SEAT_CAPACITY
+from src.models.booking import Booking
+from src.models.flight import Flight, FlightSchedule, FlightStatus
+from src.logic.disruption import SEAT_HOLDING_STATUSES
+
+# Fare multipliers by day of week (Monday first); Friday and weekend cost more
+DAY_OF_WEEK_MULTIPLIERS = np.array([1.00, 0.95, 0.95, 1.00, 1.15, 1.10, 1.05])
+
+# Last-minute premium: up to +50%, decaying with this many days to departure
+ADVANCE_PURCHASE_PREMIUM = 0.5
+ADVANCE_PURCHASE_DECAY_DAYS = 7.0
+
+# Load-factor premium: +60% on a full flight, growing quadratically
+LOAD_FACTOR_PREMIUM = 0.6
+
+# Route demand: +/-20% per unit of demand above or below the average route
+ROUTE_DEMAND_SENSITIVITY = 0.2
+ROUTE_DEMAND_WINDOW = datetime.timedelta(days=30)
+
+# Final fare stays within this band around the flight's base cost
+MIN_FARE_MULTIPLIER = 0.8
+MAX_FARE_MULTIPLIER = 2.5
+
+# Full repricing interval; fares depend on days to departure, so they drift with time
+PRICE_TABLE_TTL_SECONDS = 15 * 60
+
+# Julian day number of 1970-01-01 00:00
+UNIX_EPOCH_JULIAN_DAY = 2440587.5
+
+def _epoch_days(moment):
+    """Days since 1970-01-01 for a naive datetime, matching what julianday() gives for stored times"""
+    return (moment - datetime.datetime(1970, 1, 1)).total_seconds() / 86400.0
+
+def compute_fares(base_cost, days_to_departure, load_factor, weekday, route_demand):
+    """
+    Price many schedules at once.
+
+    All arguments are equal-length arrays: base cost per seat, days until
+    departure, booked seats / capacity, departure weekday (0 = Monday), and
+    route demand relative to the average route (1.0 = average).
+    """
+    base_cost = np.asarray(base_cost, dtype=np.float64)
+    days = np.maximum(np.asarray(days_to_departure, dtype=np.float64), 0.0)
+    load = np.clip(np.asarray(load_factor, dtype=np.float64), 0.0, 1.0)
+    weekday = np.asarray(weekday, dtype=np.intp)
+    demand = np.asarray(route_demand, dtype=np.float64)
+
+    multiplier = 1.0 + ADVANCE_PURCHASE_PREMIUM * np.exp(-days / ADVANCE_PURCHASE_DECAY_DAYS)
+    multiplier *= 1.0 + LOAD_FACTOR_PREMIUM * load * load
+    multiplier *= DAY_OF_WEEK_MULTIPLIERS[weekday]
+    multiplier *= np.clip(1.0 + ROUTE_DEMAND_SENSITIVITY * (demand - 1.0), 0.9, 1.3)
+    np.clip(multiplier, MIN_FARE_MULTIPLIER, MAX_FARE_MULTIPLIER, out=multiplier)
+
+    return np.round(base_cost * multiplier, 2)
+
+class PriceTable:
+    """
+    Cached per-seat fares for every upcoming schedule, held as NumPy arrays.
+
+    A full refresh reprices everything in one vectorised pass. Bookings only
+    change one schedule's load factor, so record_booking() updates that
+    schedule's seat count and reprices just that row. Once the table is
+    older than ttl, lookups keep using it while a background thread reprices
+    everything and swaps the new arrays in, so no request waits for a refresh
+    after the first. Loads run without the lock; seat changes and discards
+    made while one runs are replayed onto its result before it is swapped in.
+    """
+
+    def __init__(self, session_factory=session_factory, ttl=PRICE_TABLE_TTL_SECONDS):
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self.refreshed_at = None
+        self._lock = threading.RLock()
+        self._refreshing = False
+        self._refresh_lock = threading.Lock()
+        # (seat changes, discarded ids) made while a load reads, per load in progress, to replay onto its result
+        self._journals = []
+        # Schedules that could not be priced (past, cancelled or gone), until the next refresh
+        self._unpriced = set()
+        self._set_arrays(self._empty())
+
+    @staticmethod
+    def _empty():
+        return {
+            "schedule_id": np.empty(0, dtype=np.int64),
+            "base_cost": np.empty(0, dtype=np.float64),
+            "departure": np.empty(0, dtype=np.float64),
+            "weekday": np.empty(0, dtype=np.intp),
+            "route_demand": np.empty(0, dtype=np.float64),
+            "booked": np.empty(0, dtype=np.int64),
+            "capacity": np.empty(0, dtype=np.int64),
+        }
+
+    def _set_arrays(self, arrays):
+        # Rows are kept sorted by schedule id so lookups are a binary search
+        order = np.argsort(arrays["schedule_id"], kind="stable")
+        for name, values in arrays.items():
+            setattr(self, f"_{name}", values[order])
+        self._fare = self._price(slice(None))
+
+    def _price(self, rows):
+        days = self._departure[rows] - _epoch_days(datetime.datetime.now())
+        load = self._booked[rows] / np.maximum(self._capacity[rows], 1)
+        return compute_fares(self._base_cost[rows], days, load, self._weekday[rows], self._route_demand[rows])
+
+    def _load(self, session, schedule_ids=None):
+        """Read pricing inputs for upcoming schedules (or just the given ones) into arrays"""
+        now = datetime.datetime.now()
+
+        booked = select(
+            Booking.flight_schedule_id,
+            func.count(Booking.id).label("booked")
+        ).join(FlightSchedule).where(
+            FlightSchedule.scheduled_departure_time > now,
+            Booking.payment_status.in_(SEAT_HOLDING_STATUSES)
+        ).group_by(Booking.flight_schedule_id).subquery()
+
+        # Departures come back as Julian days; parsing 100k datetimes would dominate a refresh
+        query = session.query(
+            FlightSchedule.id,
+            Flight.base_cost,
+            func.julianday(FlightSchedule.scheduled_departure_time),
+            FlightSchedule.departure_airport,
+            FlightSchedule.arrival_airport,
+            Flight.aircraft_id,
+            func.coalesce(booked.c.booked, 0)
+        ).join(Flight).outerjoin(
+            booked, booked.c.flight_schedule_id == FlightSchedule.id
+        ).filter(
+            FlightSchedule.scheduled_departure_time > now,
+            FlightSchedule.status != FlightStatus.CANCELLED
+        )
+        if schedule_ids is not None:
+            query = query.filter(FlightSchedule.id.in_(schedule_ids))
+        rows = query.all()
+        if not rows:
+            return self._empty()
+
+        ids, base_costs, departures, origins, destinations, aircraft_ids, booked_counts = zip(*rows)
+        capacities = dict(session.query(Aircraft.id, func.coalesce(Aircraft.capacity, DEFAULT_SEAT_CAPACITY)).all())
+        demand = self._route_demand_index(session, now)
+        julian_days = np.array(departures, dtype=np.float64)
+
+        return {
+            "schedule_id": np.array(ids, dtype=np.int64),
+            "base_cost": np.array(base_costs, dtype=np.float64),
+            "departure": julian_days - UNIX_EPOCH_JULIAN_DAY,
+            # Julian day numbers start on a Monday
+            "weekday": (np.floor(julian_days + 0.5).astype(np.intp) % 7),
+            "route_demand": np.array(
+                [demand.get((origin, destination), 1.0) for origin, destination in zip(origins, destinations)],
+                dtype=np.float64
+            ),
+            "booked": np.array(booked_counts, dtype=np.int64),
+            "capacity": np.array([capacities.get(aircraft_id, 0) for aircraft_id in aircraft_ids], dtype=np.int64),
+        }
+
+    @staticmethod
+    def _route_demand_index(session, now):
+        """Recent bookings per route relative to the average route"""
+        rows = session.query(
+            FlightSchedule.departure_airport,
+            FlightSchedule.arrival_airport,
+            func.count(Booking.id)
+        ).join(Booking).filter(
+            Booking.booking_date >= now - ROUTE_DEMAND_WINDOW
+        ).group_by(FlightSchedule.departure_airport, FlightSchedule.arrival_airport).all()
+        if not rows:
+            return {}
+
+        average = sum(count for _, _, count in rows) / len(rows)
+        return {(origin, destination): count / average for origin, destination, count in rows}
+
+    def refresh(self, session=None):
+        """Reprice every upcoming schedule"""
+        journal = self._start_journal()
+        try:
+            own_session = session is None
+            session = session or self.session_factory()
+            try:
+                arrays = self._load(session)
+            finally:
+                if own_session:
+                    session.close()
+
+            with self._lock:
+                self._set_arrays(arrays)
+                self._replay(journal)
+                self._unpriced = set()
+                self.refreshed_at = time.time()
+        finally:
+            self._end_journal(journal)
+
+    def _start_journal(self):
+        journal = []
+        with self._lock:
+            self._journals.append(journal)
+        return journal
+
+    def _end_journal(self, journal):
+        with self._lock:
+            self._journals.remove(journal)
+
+    def _replay(self, journal, schedule_ids=None):
+        """
+        Apply changes recorded while a load read onto its freshly set rows,
+        only those of schedule_ids if given. A booking committed just before
+        the load read, but recorded after it started, is counted twice until
+        the next refresh; without the replay every booking made during the
+        load would be lost instead.
+        """
+        for seat_changes, discarded in journal:
+            if schedule_ids is not None:
+                seat_changes = {
+                    schedule_id: seats for schedule_id, seats in seat_changes.items() if schedule_id in schedule_ids
+                }
+                discarded = [schedule_id for schedule_id in discarded if schedule_id in schedule_ids]
+            self._apply_seat_changes(seat_changes)
+            self._remove(discarded)
+
+    def _ensure_fresh(self, session):
+        if self.refreshed_at is None:
+            # Nothing to serve yet, so the very first load happens in the request
+            self.refresh(session)
+        elif time.time() - self.refreshed_at > self.ttl:
+            # Stale fares are still close; keep serving them while the reprice runs
+            self._refresh_in_background()
+
+    def _refresh_in_background(self):
+        """Start a full reprice on its own thread unless one is already running"""
+        with self._refresh_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._background_refresh, name="price-table-refresh", daemon=True).start()
+
+    def _background_refresh(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            print(f"Error refreshing price table: {e}")
+        finally:
+            with self._refresh_lock:
+                self._refreshing = False
+
+    def _rows_for(self, schedule_ids):
+        """Positions of the given ids in the table, and a mask of which were found"""
+        ids = np.asarray(schedule_ids, dtype=np.int64)
+        rows = np.searchsorted(self._schedule_id, ids)
+        found = rows < len(self._schedule_id)
+        found[found] = self._schedule_id[rows[found]] == ids[found]
+        return rows, found
+
+    def fares_for(self, session, schedule_ids):
+        """Per-seat fares for the given schedules; schedules that cannot be priced are left out"""
+        schedule_ids = list(schedule_ids)
+        if not schedule_ids:
+            return {}
+
+        self._ensure_fresh(session)
+        with self._lock:
+            rows, found = self._rows_for(schedule_ids)
+            missing = [
+                schedule_id for schedule_id, hit in zip(schedule_ids, found)
+                if not hit and schedule_id not in self._unpriced
+            ]
+
+        # Schedules created since the last refresh are loaded, without the lock, and merged in
+        if missing:
+            self._merge_missing(session, missing)
+
+        with self._lock:
+            rows, found = self._rows_for(schedule_ids)
+            return {
+                schedule_id: float(self._fare[row])
+                for schedule_id, row, hit in zip(schedule_ids, rows, found) if hit
+            }
+
+    def _merge_missing(self, session, schedule_ids):
+        journal = self._start_journal()
+        try:
+            loaded = self._load(session, schedule_ids)
+            with self._lock:
+                # A refresh that finished meanwhile may already have them
+                _, present = self._rows_for(loaded["schedule_id"])
+                added = {name: values[~present] for name, values in loaded.items()}
+                if len(added["schedule_id"]):
+                    current = {name: getattr(self, f"_{name}") for name in added}
+                    self._set_arrays({name: np.concatenate([current[name], added[name]]) for name in added})
+                    self._replay(journal, set(added["schedule_id"].tolist()))
+                self._unpriced.update(set(schedule_ids) - set(loaded["schedule_id"].tolist()))
+        finally:
+            self._end_journal(journal)
+
+    def fare_for(self, session, flight_schedule):
+        """Per-seat fare for one schedule, falling back to the flight's base cost"""
+        return self.fares_for(session, [flight_schedule.id]).get(flight_schedule.id, flight_schedule.flight.base_cost)
+
+    def record_booking(self, schedule_id, seats=1):
+        """Adjust a schedule's booked seats (negative to release) and reprice only that schedule"""
+        self.record_bookings({schedule_id: seats})
+
+    def record_bookings(self, seat_changes):
+        """Apply several {schedule_id: seats} changes and reprice just those schedules"""
+        if not seat_changes:
+            return
+
+        with self._lock:
+            for journal in self._journals:
+                journal.append((dict(seat_changes), []))
+            self._apply_seat_changes(seat_changes)
+
+    def _apply_seat_changes(self, seat_changes):
+        if not seat_changes:
+            return
+        rows, found = self._rows_for(list(seat_changes))
+        rows = rows[found]
+        if not len(rows):
+            return
+        changes = np.array(list(seat_changes.values()), dtype=np.int64)[found]
+        np.add.at(self._booked, rows, changes)
+        self._booked[rows] = np.maximum(self._booked[rows], 0)
+        self._fare[rows] = self._price(rows)
+
+    def discard(self, schedule_ids):
+        """Drop schedules that are no longer for sale, e.g. after a cancellation"""
+        schedule_ids = list(schedule_ids)
+        with self._lock:
+            for journal in self._journals:
+                journal.append(({}, schedule_ids))
+            self._remove(schedule_ids)
+
+    def _remove(self, schedule_ids):
+        if not schedule_ids:
+            return
+        rows, found = self._rows_for(schedule_ids)
+        if not found.any():
+            return
+        keep = np.ones(len(self._schedule_id), dtype=bool)
+        keep[rows[found]] = False
+        for name in self._empty():
+            setattr(self, f"_{name}", getattr(self, f"_{name}")[keep])
+        self._fare = self._fare[keep]
+
+_price_table = None
+_price_table_lock = threading.Lock()
+
+def get_price_table():
+    """Get the shared price table"""
+    global _price_table
+    with _price_table_lock:
+        if _price_table is None:
+            _price_table = PriceTable()
+        return _price_table
@@ -0,0 +1,139 @@
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from src.models.booking import Booking
+from src.models.flight import Flight, FlightSchedule
+from src.models.rating import Rating, RatingAggregate, RatingScope
+from src.logic.outbox import queue_thank_you
+
+# Ratings read per round trip by the backfill
+BACKFILL_CHUNK_SIZE = 1000
+
+def route_key(departure_airport, arrival_airport):
+    return f"{departure_airport}-{arrival_airport}"
+
+def scope_keys(flight_id, departure_airport, arrival_airport, aircraft_id):
+    """The aggregates one rating counts towards"""
+    return [
+        (RatingScope.FLIGHT, str(flight_id)),
+        (RatingScope.ROUTE, route_key(departure_airport, arrival_airport)),
+        (RatingScope.AIRCRAFT, str(aircraft_id)),
+    ]
+
+def booking_scope_keys(session, booking_id):
+    """Aggregates a booking's rating counts towards, read in one query"""
+    row = session.query(
+        Flight.id,
+        FlightSchedule.departure_airport,
+        FlightSchedule.arrival_airport,
+        Flight.aircraft_id
+    ).select_from(Booking).join(
+        FlightSchedule, Booking.flight_schedule_id == FlightSchedule.id
+    ).join(
+        Flight, FlightSchedule.flight_id == Flight.id
+    ).filter(Booking.id == booking_id).first()
+    return scope_keys(*row) if row else []
+
+class AggregateDelta:
+    """Pending change to one aggregate row"""
+    __slots__ = ("rating_count", "stars_total", "histogram")
+
+    def __init__(self):
+        self.rating_count = 0
+        self.stars_total = 0
+        self.histogram = [0, 0, 0, 0, 0]
+
+    def add(self, stars, sign=1):
+        self.rating_count += sign
+        self.stars_total += sign * stars
+        self.histogram[stars - 1] += sign
+
+def apply_aggregate_deltas(session, deltas):
+    """Upsert {(scope, scope_key): AggregateDelta} into the aggregate table as increments"""
+    for (scope, key), delta in deltas.items():
+        values = {
+            "scope": scope,
+            "scope_key": key,
+            "rating_count": delta.rating_count,
+            "stars_total": delta.stars_total,
+        }
+        values.update({f"star_{stars}": count for stars, count in enumerate(delta.histogram, start=1)})
+
+        statement = insert(RatingAggregate).values(**values)
+        increments = {
+            column: getattr(RatingAggregate, column) + getattr(statement.excluded, column)
+            for column in values if column not in ("scope", "scope_key")
+        }
+        session.execute(statement.on_conflict_do_update(
+            index_elements=["scope", "scope_key"], set_=increments
+        ))
+
+def save_rating(session, booking_id, stars, comments):
+    """
+    Create or update a booking's rating and its aggregates in the caller's transaction.
+
+    The caller commits, so the rating, the aggregates and any thank-you
+    message in the outbox land together.
+    """
+    existing_rating = session.query(Rating).filter_by(booking_id=booking_id).first()
+    previous_stars = existing_rating.stars if existing_rating else None
+
+    if existing_rating:
+        # Update existing rating
+        existing_rating.stars = stars
+        existing_rating.comments = comments
+    else:
+        # Create new rating
+        session.add(Rating(booking_id=booking_id, stars=stars, comments=comments))
+
+        # Queue the thank-you message; the dispatcher sets thank_you_sent once it is delivered
+        booking = session.query(Booking).filter_by(id=booking_id).first()
+        if booking and not booking.thank_you_sent:
+            queue_thank_you(session, booking)
+
+    # An edit moves one rating between histogram buckets; a new rating adds one
+    deltas = {}
+    for key in booking_scope_keys(session, booking_id):
+        delta = deltas[key] = AggregateDelta()
+        if previous_stars is not None:
+            delta.add(previous_stars, sign=-1)
+        delta.add(stars)
+    apply_aggregate_deltas(session, deltas)
+
+def rating_aggregates(session, scope):
+    """All aggregates for a scope, best average first"""
+    return session.query(RatingAggregate).filter(
+        RatingAggregate.scope == scope,
+        RatingAggregate.rating_count > 0
+    ).order_by(
+        (RatingAggregate.stars_total * 1.0 / RatingAggregate.rating_count).desc()
+    ).all()
+
+def backfill_rating_aggregates(session, chunk_size=BACKFILL_CHUNK_SIZE):
+    """Rebuild the aggregate tables from existing ratings, streamed in chunks; returns ratings read"""
+    session.query(RatingAggregate).delete()
+
+    statement = select(
+        Rating.stars,
+        Flight.id,
+        FlightSchedule.departure_airport,
+        FlightSchedule.arrival_airport,
+        Flight.aircraft_id
+    ).join(
+        Booking, Rating.booking_id == Booking.id
+    ).join(
+        FlightSchedule, Booking.flight_schedule_id == FlightSchedule.id
+    ).join(
+        Flight, FlightSchedule.flight_id == Flight.id
+    ).execution_options(yield_per=chunk_size)
+
+    total = 0
+    for chunk in session.execute(statement).partitions():
+        # Fold each chunk into one increment per aggregate row
+        deltas = {}
+        for stars, *scope_columns in chunk:
+            for key in scope_keys(*scope_columns):
+                deltas.setdefault(key, AggregateDelta()).add(stars)
+        apply_aggregate_deltas(session, deltas)
+        total += len(chunk)
+
+    return total
@@ -0,0 +1,238 @@
+import datetime
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from src.utils.database import session_factory
+
+# Load environment variables
+load_dotenv()
+
+# Every report is rebuilt at least this often
+REPORT_REFRESH_INTERVAL_SECONDS = float(os.getenv("REPORT_REFRESH_INTERVAL_SECONDS", "900"))
+
+# A report whose tables changed is rebuilt, but no more often than this
+REPORT_MIN_INTERVAL_SECONDS = float(os.getenv("REPORT_MIN_INTERVAL_SECONDS", "60"))
+
+# How often the scheduler looks for reports that are due
+REPORT_SCHEDULER_TICK_SECONDS = 5
+
+# Reports built at the same time; further builds queue, so reports never take more than this from the server
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "1"))
+
+class ReportSnapshot:
+    """The last finished build of a report"""
+    __slots__ = ("data", "computed_at", "seconds")
+
+    def __init__(self, data, computed_at, seconds):
+        self.data = data
+        self.computed_at = computed_at
+        self.seconds = seconds
+
+class ReportJob:
+    """One build of a report, queued or running on the report workers"""
+
+    def __init__(self):
+        self.future = None
+        self.started_at = None
+        self.cancelled = False
+        # The connection the build is running on, only while it is; guarded so
+        # cancel() never interrupts a connection already back in the pool
+        self._connection = None
+        self._connection_lock = threading.Lock()
+
+    def running(self):
+        return not self.cancelled and not self.future.done()
+
+    def progress(self, expected_seconds):
+        """Estimated percent done from how long the last build took, or None when there is nothing to go on"""
+        if self.started_at is None:
+            return 0
+        if not expected_seconds:
+            return None
+        return min(95, int((time.monotonic() - self.started_at) * 100 / expected_seconds))
+
+    def cancel(self):
+        """Drop a queued build, or interrupt the query a running one is waiting on"""
+        self.cancelled = True
+        if self.future.cancel():
+            return
+        # sqlite3 connections can abort a running statement from another thread
+        with self._connection_lock:
+            interrupt = getattr(self._connection, "interrupt", None)
+            if interrupt is not None:
+                interrupt()
+
+class Report:
+    """A registered report: how to build it, and the tables its result depends on"""
+
+    def __init__(self, name, build, tables, interval):
+        self.name = name
+        self.build = build
+        self.tables = frozenset(tables)
+        self.interval = interval
+        self.snapshot = None
+        self.job = None
+        self.attempted_at = None
+        self.stale = False
+
+class ReportScheduler:
+    """
+    Builds reports in the background and keeps the latest result of each.
+
+    Views render straight from the last snapshot, so opening a report costs
+    no queries. A report is rebuilt every interval, and sooner (but at most
+    once per REPORT_MIN_INTERVAL_SECONDS) after a commit in this process
+    touches one of its tables. Writes from other processes are picked up by
+    the regular rebuild.
+
+    Builds, whether scheduled or asked for from a view, run on a dedicated
+    pool of REPORT_WORKERS threads and never in a request, so however many
+    reports are requested they cannot tie up the threads serving searches
+    and bookings. Each report has at most one build queued or running.
+    """
+
+    def __init__(self, session_factory=session_factory, tick=REPORT_SCHEDULER_TICK_SECONDS,
+                 min_interval=REPORT_MIN_INTERVAL_SECONDS, workers=REPORT_WORKERS):
+        self.session_factory = session_factory
+        self.tick = tick
+        self.min_interval = min_interval
+        self._reports = {}
+        self._workers = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="report-worker")
+        self._thread = None
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+    def register(self, name, build, tables=(), interval=REPORT_REFRESH_INTERVAL_SECONDS):
+        """Register build(session) as a report; it is first built when due or first asked for"""
+        self._reports[name] = Report(name, build, tables, interval)
+
+    def snapshot(self, name):
+        """The latest snapshot of a report, or None if it has not been built yet"""
+        return self._reports[name].snapshot
+
+    def job(self, name):
+        """The report's queued or running build, if any"""
+        job = self._reports[name].job
+        return job if job is not None and job.running() else None
+
+    def submit(self, name):
+        """Queue a build of a report unless one is already queued or running; returns the job"""
+        report = self._reports[name]
+        with self._lock:
+            if report.job is not None and report.job.running():
+                return report.job
+            # A cancelled build may still be unwinding; it discards its result, so start afresh
+            job = ReportJob()
+            report.job = job
+            job.future = self._workers.submit(self._build, report, job)
+            return job
+
+    def refresh(self, name):
+        """Build a report and wait for it; returns the new snapshot, or the old one if the build failed"""
+        self.submit(name).future.result()
+        return self._reports[name].snapshot
+
+    def _build(self, report, job):
+        if job.cancelled:
+            return
+        job.started_at = time.monotonic()
+        report.stale = False
+        computed_at = report.attempted_at = datetime.datetime.now()
+        session = self.session_factory()
+        try:
+            with job._connection_lock:
+                job._connection = session.connection().connection.driver_connection
+            # A cancel before the connection was set had nothing to interrupt
+            if job.cancelled:
+                return
+            data = report.build(session)
+            if not job.cancelled:
+                report.snapshot = ReportSnapshot(data, computed_at, time.monotonic() - job.started_at)
+        except Exception as e:
+            if not job.cancelled:
+                print(f"Error building report {report.name}: {e}")
+        finally:
+            with job._connection_lock:
+                job._connection = None
+            session.close()
+
+    def tables_changed(self, tables):
+        """Mark every report reading any of these tables as stale"""
+        for report in self._reports.values():
+            if report.tables & tables:
+                report.stale = True
+
+    def due(self, report, now):
+        if report.snapshot is None:
+            # Never built; after a failure, wait a while before trying again
+            return report.attempted_at is None or (now - report.attempted_at).total_seconds() >= self.min_interval
+        age = (now - report.snapshot.computed_at).total_seconds()
+        return age >= report.interval or (report.stale and age >= self.min_interval)
+
+    def start(self):
+        """Start the scheduler thread if it is not running"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="report-scheduler", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stopping.set()
+            thread.join()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            now = datetime.datetime.now()
+            for report in list(self._reports.values()):
+                if self._stopping.is_set():
+                    break
+                if self.due(report, now):
+                    self.submit(report.name)
+            self._stopping.wait(self.tick)
+
+_report_scheduler = None
+_report_scheduler_lock = threading.Lock()
+
+def get_report_scheduler():
+    """Get the shared report scheduler"""
+    global _report_scheduler
+    with _report_scheduler_lock:
+        if _report_scheduler is None:
+            _report_scheduler = ReportScheduler()
+        return _report_scheduler
+
+# Tables written by each session, collected per flush or statement and reported once the transaction commits
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_tables(session, flush_context):
+    tables = session.info.setdefault("changed_tables", set())
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        tables.update(table.name for table in type(instance).__mapper__.tables)
+
+def record_changed_tables(session, tables):
+    """Note tables written outside the session, e.g. on its connection, which the listeners do not see"""
+    session.info.setdefault("changed_tables", set()).update(tables)
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_statement_tables(orm_execute_state):
+    # Bulk INSERT, UPDATE and DELETE statements run through the session never flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        record_changed_tables(orm_execute_state.session, {orm_execute_state.statement.table.name})
+
+@event.listens_for(Session, "after_commit")
+def _report_changed_tables(session):
+    tables = session.info.pop("changed_tables", None)
+    if tables:
+        get_report_scheduler().tables_changed(tables)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_tables(session):
+    session.info.pop("changed_tables", None)
@@ -0,0 +1,201 @@
+import datetime
+from sqlalchemy import select, insert
+from src.models.flight import Flight, FlightSchedule, FlightStatus
+from src.logic.kpis import record_bulk_schedules
+from src.logic.aircraft_conflicts import get_aircraft_schedule_index
+
+# Monday first, as in datetime.date.weekday()
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+# Scheduled block time when none is given
+DEFAULT_BLOCK_MINUTES = 90
+
+# Occurrences one recurring pattern may create, to catch a mistyped date range
+MAX_RECURRING_OCCURRENCES = 20000
+
+# Rows per INSERT statement; SQLite caps the bound parameters of a single statement
+SCHEDULE_INSERT_BATCH = 500
+
+class RecurringSchedule:
+    """
+    A timetable pattern for one flight: the route, departure times of day,
+    the weekdays it operates on and the dates it runs between (inclusive).
+    """
+
+    def __init__(self, flight_id, origin, destination, departure_times, weekdays, start_date, end_date,
+                 block_minutes=DEFAULT_BLOCK_MINUTES, status=FlightStatus.SCHEDULED, gate=None):
+        self.flight_id = flight_id
+        self.origin = origin
+        self.destination = destination
+        self.departure_times = sorted(set(departure_times))
+        self.weekdays = frozenset(weekdays)
+        self.start_date = start_date
+        self.end_date = end_date
+        self.block_minutes = block_minutes
+        self.status = status
+        self.gate = gate
+
+    def occurrences(self):
+        """Every (departure, arrival) of the pattern, in order"""
+        block = datetime.timedelta(minutes=self.block_minutes)
+        day = self.start_date
+        while day <= self.end_date:
+            if day.weekday() in self.weekdays:
+                for departure_time in self.departure_times:
+                    departure = datetime.datetime.combine(day, departure_time)
+                    yield departure, departure + block
+            day += datetime.timedelta(days=1)
+
+def parse_departure_times(text):
+    """Departure times from a comma separated list such as "07:00, 13:30"; raises ValueError"""
+    times = []
+    for part in filter(None, (part.strip() for part in text.split(","))):
+        try:
+            times.append(datetime.datetime.strptime(part, "%H:%M").time())
+        except ValueError:
+            raise ValueError(f"Invalid departure time: {part}")
+    if not times:
+        raise ValueError("Please enter at least one departure time")
+    return times
+
+def validate_recurring_schedule(session, pattern, now=None):
+    """
+    Expand a pattern and check every occurrence against the rules and the
+    flight's existing schedules at once. Returns the flight and the list of
+    (departure, arrival) pairs; raises ValueError describing the first problem.
+    """
+    now = now or datetime.datetime.now()
+    if pattern.origin == pattern.destination:
+        raise ValueError("Origin and destination airports cannot be the same")
+    if not pattern.weekdays:
+        raise ValueError("Please choose at least one day of the week")
+    if pattern.end_date < pattern.start_date:
+        raise ValueError("The end date cannot be before the start date")
+    if pattern.block_minutes <= 0:
+        raise ValueError("Block time must be a positive number of minutes")
+
+    flight = session.query(Flight).filter_by(id=pattern.flight_id).first()
+    if not flight:
+        raise ValueError("Flight not found")
+
+    occurrences = []
+    for occurrence in pattern.occurrences():
+        occurrences.append(occurrence)
+        if len(occurrences) > MAX_RECURRING_OCCURRENCES:
+            raise ValueError(f"The pattern creates more than {MAX_RECURRING_OCCURRENCES} schedules; shorten the date range")
+    if not occurrences:
+        raise ValueError("The pattern has no departures between the chosen dates")
+    if occurrences[0][0] <= now:
+        raise ValueError(f"Departure {occurrences[0][0]:%Y-%m-%d %H:%M} is in the past")
+
+    # One range read of the flight's schedules instead of a lookup per occurrence
+    existing = set(session.execute(select(FlightSchedule.scheduled_departure_time).where(
+        FlightSchedule.flight_id == pattern.flight_id,
+        FlightSchedule.scheduled_departure_time >= occurrences[0][0],
+        FlightSchedule.scheduled_departure_time <= occurrences[-1][0],
+        FlightSchedule.status != FlightStatus.CANCELLED
+    )).scalars())
+    clashes = [departure for departure, _ in occurrences if departure in existing]
+    if clashes:
+        raise ValueError(
+            f"{flight.flight_number} is already scheduled at {clashes[0]:%Y-%m-%d %H:%M}"
+            + (f" and {len(clashes) - 1} more of these departures" if len(clashes) > 1 else "")
+        )
+    return flight, occurrences
+
+def _flying(schedules):
+    """The schedules, as dicts, that take up their aircraft's time"""
+    return [schedule for schedule in schedules if schedule["status"] != FlightStatus.CANCELLED]
+
+def _schedules_by_aircraft(session, schedules):
+    aircraft_ids = dict(session.query(Flight.id, Flight.aircraft_id).filter(
+        Flight.id.in_({schedule["flight_id"] for schedule in schedules})
+    ).all())
+    by_aircraft = {}
+    for schedule in schedules:
+        by_aircraft.setdefault(aircraft_ids[schedule["flight_id"]], []).append(schedule)
+    return by_aircraft
+
+def add_schedule(session, schedule):
+    """
+    Add and commit one new FlightSchedule once its aircraft is known to be
+    free; raises ScheduleConflict, leaving the session rolled back, if not.
+    """
+    index = get_aircraft_schedule_index()
+    aircraft_id = session.query(Flight.aircraft_id).filter_by(id=schedule.flight_id).scalar()
+    departure, arrival = schedule.scheduled_departure_time, schedule.scheduled_arrival_time
+    flying = schedule.status != FlightStatus.CANCELLED
+    with index.lock:
+        try:
+            if flying:
+                index.check(session, {aircraft_id: [(departure, arrival)]})
+            session.add(schedule)
+            session.flush()
+            schedule_id = schedule.id
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        if flying:
+            index.add(aircraft_id, [(departure, arrival, schedule_id)])
+    return schedule_id
+
+def insert_schedules(session, rows):
+    """
+    Insert FlightSchedule rows given as dicts with batched Core INSERTs and
+    commit them, all or nothing. Every row is first checked against the
+    aircraft schedule index; a clash raises ScheduleConflict and nothing is
+    written. This is the path for any bulk creation of schedules.
+
+    The ORM flush hooks do not run for these rows, so the KPI counter is
+    updated here; reports see the INSERTs go through the session, and the
+    board and search triggers are database triggers and fire as usual.
+    """
+    index = get_aircraft_schedule_index()
+    for row in rows:
+        row.setdefault("status", FlightStatus.SCHEDULED)
+    with index.lock:
+        try:
+            by_aircraft = _schedules_by_aircraft(session, _flying(rows))
+            index.check(session, {
+                aircraft_id: [(row["scheduled_departure_time"], row["scheduled_arrival_time"]) for row in schedules]
+                for aircraft_id, schedules in by_aircraft.items()
+            })
+            for start in range(0, len(rows), SCHEDULE_INSERT_BATCH):
+                batch = rows[start:start + SCHEDULE_INSERT_BATCH]
+                ids = session.scalars(
+                    insert(FlightSchedule).returning(FlightSchedule.id, sort_by_parameter_order=True), batch
+                ).all()
+                for row, schedule_id in zip(batch, ids):
+                    row["id"] = schedule_id
+            record_bulk_schedules(session.connection(), len(rows))
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        for aircraft_id, schedules in by_aircraft.items():
+            index.add(aircraft_id, [
+                (row["scheduled_departure_time"], row["scheduled_arrival_time"], row["id"]) for row in schedules
+            ])
+    return len(rows)
+
+def create_recurring_schedules(session, pattern, now=None):
+    """
+    Validate a recurring pattern and create all of its schedules in one
+    transaction. Returns the flight and the number of schedules created;
+    nothing is written when validation fails or the aircraft is not free.
+    """
+    flight, occurrences = validate_recurring_schedule(session, pattern, now)
+    rows = [
+        {
+            "flight_id": pattern.flight_id,
+            "departure_airport": pattern.origin,
+            "arrival_airport": pattern.destination,
+            "departure_gate": pattern.gate,
+            "scheduled_departure_time": departure,
+            "scheduled_arrival_time": arrival,
+            "status": pattern.status,
+        }
+        for departure, arrival in occurrences
+    ]
+    return flight, insert_schedules(session, rows)
@@ -0,0 +1,112 @@
+import re
+from sqlalchemy import text
+
+# Matches returned per section of the admin search
+SEARCH_RESULT_LIMIT = 10
+
+# Typed fragments shorter than this are not searched
+SEARCH_MIN_LENGTH = 2
+
+# Full-text indexes over existing tables (FTS5 "external content" tables). The
+# index stores only tokens; the rows themselves stay in the source table, and
+# triggers keep the two in step for every write, ORM or bulk. prefix='2 3'
+# adds prefix indexes so typeahead queries such as "jo*" avoid a full scan.
+SEARCH_INDEXES = {
+    "users_fts": {
+        "source": "users",
+        "columns": ("first_name", "last_name", "email", "city"),
+        # Name matches count for more than email, and email for more than city
+        "rank": "bm25(10.0, 10.0, 5.0, 1.0)",
+    },
+    "bookings_fts": {
+        "source": "bookings",
+        "columns": ("confirmation_code",),
+        "rank": "bm25()",
+    },
+}
+
+def _index_ddl(name, source, columns, rank):
+    column_list = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    return [
+        f"CREATE VIRTUAL TABLE {name} USING fts5("
+        f"{column_list}, content='{source}', content_rowid='id', prefix='2 3')",
+        f"CREATE TRIGGER {name}_ai AFTER INSERT ON {source} BEGIN "
+        f"INSERT INTO {name}(rowid, {column_list}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER {name}_ad AFTER DELETE ON {source} BEGIN "
+        f"INSERT INTO {name}({name}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER {name}_au AFTER UPDATE OF {column_list} ON {source} BEGIN "
+        f"INSERT INTO {name}({name}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {name}(rowid, {column_list}) VALUES (new.id, {new_values}); END",
+        f"INSERT INTO {name}({name}, rank) VALUES ('rank', '{rank}')",
+        # Index the rows that are already there
+        f"INSERT INTO {name}({name}) VALUES ('rebuild')",
+    ]
+
+def install_search_indexes(engine):
+    """Create any missing full-text index, with its triggers, and fill it from its table"""
+    with engine.begin() as connection:
+        existing = {row[0] for row in connection.execute(text(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE '%_fts'"
+        ))}
+        for name, index in SEARCH_INDEXES.items():
+            if name not in existing:
+                for statement in _index_ddl(name, index["source"], index["columns"], index["rank"]):
+                    connection.execute(text(statement))
+
+def match_expression(query):
+    """
+    FTS5 MATCH expression for what was typed: every word must match, and the
+    last word as a prefix, so results narrow as the user types.
+    """
+    words = re.findall(r"\w+", query.lower())
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words[:-1]]
+    terms.append(f'"{words[-1]}"*')
+    return " ".join(terms)
+
+def search_users(session, query, limit=SEARCH_RESULT_LIMIT):
+    """Best matching users by name, email and city"""
+    expression = match_expression(query)
+    if expression is None:
+        return []
+    # Ranked inside the full-text query, so the best matches are kept however
+    # many rows a short prefix matches; FTS5 keeps only the top few as it sorts
+    return session.execute(text("""
+        SELECT users.id, users.first_name, users.last_name, users.email, users.city
+        FROM (
+            SELECT rowid, rank FROM users_fts
+            WHERE users_fts MATCH :expression
+            ORDER BY rank
+            LIMIT :limit
+        ) AS matches
+        JOIN users ON users.id = matches.rowid
+        ORDER BY matches.rank
+        LIMIT :limit
+    """), {"expression": expression, "limit": limit}).all()
+
+def search_bookings(session, query, limit=SEARCH_RESULT_LIMIT):
+    """Bookings whose confirmation code starts with what was typed"""
+    expression = match_expression(query)
+    if expression is None:
+        return []
+    return session.execute(text("""
+        SELECT bookings.id, bookings.confirmation_code, bookings.cost_charged,
+               users.first_name, users.last_name,
+               flights.flight_number, flight_schedules.departure_airport,
+               flight_schedules.arrival_airport, flight_schedules.scheduled_departure_time
+        FROM (
+            SELECT rowid, rank FROM bookings_fts
+            WHERE bookings_fts MATCH :expression
+            ORDER BY rank
+            LIMIT :limit
+        ) AS matches
+        JOIN bookings ON bookings.id = matches.rowid
+        JOIN users ON users.id = bookings.passenger_id
+        JOIN flight_schedules ON flight_schedules.id = bookings.flight_schedule_id
+        JOIN flights ON flights.id = flight_schedules.flight_id
+        ORDER BY matches.rank
+        LIMIT :limit
+    """), {"expression": expression, "limit": limit}).all()
@@ -3,8 +3,11 @@ from .user import User
 from .role import Role, UserRole
 from .aircraft import Aircraft
 from .flight import Flight, FlightSchedule
-from .booking import Booking
-from .rating import Rating
+from .booking import Booking, BookingDailyStats
+from .rating import Rating, RatingAggregate
+from .outbox import OutboxMessage
+from .kpi import KpiSnapshot
+from .audit import AuditEvent, ArchivedAuditEvent
 
 __all__ = [
     'User',
@@ -14,5 +17,11 @@ __all__ = [
     'Flight',
     'FlightSchedule', 
     'Booking',
-    'Rating'
+    'BookingDailyStats',
+    'Rating',
+    'RatingAggregate',
+    'OutboxMessage',
+    'KpiSnapshot',
+    'AuditEvent',
+    'ArchivedAuditEvent'
 ] 
\ No newline at end of file
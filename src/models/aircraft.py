@@ -1,6 +1,25 @@
 from sqlalchemy import Column, Integer, String, Date, Text, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from src.utils.database import Base
+import re
+
+# Seats assumed when the AIP info does not state a capacity
+DEFAULT_SEAT_CAPACITY = 150
+
+# Figures stated in the AIP info text, e.g. "Max altitude: 41,000ft, Range: 3,850km, Capacity: 189 passengers"
+AIP_INFO_FIELDS = {
+    "capacity": re.compile(r"Capacity:\s*([\d,]+)"),
+    "range_km": re.compile(r"Range:\s*([\d,]+)\s*km"),
+    "max_altitude_ft": re.compile(r"Max altitude:\s*([\d,]+)\s*ft"),
+}
+
+def parse_aip_info(aip_info):
+    """The typed figures in an AIP info text, None for any it does not state"""
+    figures = {}
+    for field, pattern in AIP_INFO_FIELDS.items():
+        match = pattern.search(aip_info or "")
+        figures[field] = int(match.group(1).replace(",", "")) if match else None
+    return figures
 
 class Aircraft(Base):
     __tablename__ = 'aircraft'
@@ -17,8 +36,24 @@ class Aircraft(Base):
     number_of_engines = Column(Integer, nullable=False)
     aip_info = Column(Text, nullable=True)  # AIP = Aeronautical Information Publication
     
+    # Parsed from aip_info whenever it is set, so queries can use them directly
+    capacity = Column(Integer, nullable=True)
+    range_km = Column(Integer, nullable=True)
+    max_altitude_ft = Column(Integer, nullable=True)
+    
     # Relationships
     flights = relationship("Flight", back_populates="aircraft")
     
     def __repr__(self):
-        return f"<Aircraft {self.registration_number} ({self.model_number})>" 
\ No newline at end of file
+        return f"<Aircraft {self.registration_number} ({self.model_number})>"
+    
+    @validates("aip_info")
+    def _parse_aip_info(self, key, aip_info):
+        for field, value in parse_aip_info(aip_info).items():
+            setattr(self, field, value)
+        return aip_info
+    
+    @property
+    def seat_capacity(self):
+        """Passenger capacity, as stated in the AIP info"""
+        return self.capacity or DEFAULT_SEAT_CAPACITY
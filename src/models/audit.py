@@ -0,0 +1,44 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Index
+from src.utils.database import Base
+
+class AuditCategory:
+    AUTH = "auth"
+    BOOKING = "booking"
+    ADMIN = "admin"
+    SECURITY = "security"
+
+class AuditColumns:
+    """Columns shared by the live audit table and its archive"""
+    id = Column(Integer, primary_key=True)
+    occurred_at = Column(DateTime, nullable=False)
+    category = Column(String(20), nullable=False)
+    action = Column(String(50), nullable=False)  # e.g. "login", "booking_created"
+    actor_id = Column(Integer, nullable=True)  # No foreign key: events outlive the rows they mention
+    actor = Column(String(100), nullable=True)  # Email, recorded even when no user matched
+    target = Column(String(100), nullable=True)  # e.g. a confirmation or flight number
+    ip_address = Column(String(45), nullable=True)
+    details = Column(JSON, nullable=True)
+
+class AuditEvent(AuditColumns, Base):
+    """Append-only record of logins, bookings and administrative actions"""
+    __tablename__ = 'audit_events'
+    
+    # The admin view asks for a time range, optionally for one actor
+    __table_args__ = (
+        Index('ix_audit_events_occurred_at', 'occurred_at'),
+        Index('ix_audit_events_actor_occurred_at', 'actor', 'occurred_at'),
+    )
+    
+    def __repr__(self):
+        return f"<AuditEvent {self.action} by {self.actor} at {self.occurred_at}>"
+
+class ArchivedAuditEvent(AuditColumns, Base):
+    """Audit events rotated out of the live table once past the retention period"""
+    __tablename__ = 'audit_events_archive'
+    
+    __table_args__ = (
+        Index('ix_audit_events_archive_occurred_at', 'occurred_at'),
+    )
+    
+    def __repr__(self):
+        return f"<ArchivedAuditEvent {self.action} by {self.actor} at {self.occurred_at}>"
@@ -1,11 +1,12 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Boolean, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Boolean, Enum, Index
+from sqlalchemy.orm import relationship, column_property
 from src.utils.database import Base
 import enum
 import datetime
 
 class PaymentStatus(enum.Enum):
     PENDING = "Pending"
+    PROCESSING = "Processing"  # Claimed by a payment worker, charge in progress
     COMPLETED = "Completed"
     FAILED = "Failed"
     REFUNDED = "Refunded"
@@ -13,14 +14,27 @@ class PaymentStatus(enum.Enum):
 class Booking(Base):
     __tablename__ = 'bookings'
     
+    # Serves a passenger's booking history newest departure first, one page at a time
+    __table_args__ = (
+        Index('ix_bookings_passenger_departure', 'passenger_id', 'departure_time', 'id'),
+    )
+    
     id = Column(Integer, primary_key=True)
-    passenger_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    passenger_id = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)
     flight_schedule_id = Column(Integer, ForeignKey('flight_schedules.id'), nullable=False)
     booking_date = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
     confirmation_code = Column(String(10), unique=True, nullable=False)
     cost_charged = Column(Float, nullable=False)
     thank_you_sent = Column(Boolean, default=False, nullable=False)
-    payment_status = Column(Enum(PaymentStatus), default=PaymentStatus.PENDING, nullable=False)
+    # The revenue rollup needs the status a change replaces, so it is loaded before being set
+    payment_status = column_property(
+        Column(Enum(PaymentStatus), default=PaymentStatus.PENDING, nullable=False), active_history=True
+    )
+    # When a payment worker claimed the booking; a stale claim means its process stopped mid-charge
+    payment_claimed_at = Column(DateTime, nullable=True)
+    
+    # Copy of the schedule's departure, kept in step by database triggers
+    departure_time = Column(DateTime, nullable=True)
     
     # Relationships
     passenger = relationship("User", back_populates="bookings")
@@ -28,4 +42,21 @@ class Booking(Base):
     rating = relationship("Rating", back_populates="booking", uselist=False)
     
     def __repr__(self):
-        return f"<Booking {self.confirmation_code} for {self.passenger.full_name} on flight {self.flight_schedule.flight.flight_number}>" 
\ No newline at end of file
+        return f"<Booking {self.confirmation_code} for {self.passenger.full_name} on flight {self.flight_schedule.flight.flight_number}>" 
+
+class BookingDailyStats(Base):
+    """Bookings and revenue per booking day, kept current as bookings are made, refunded and fail payment"""
+    __tablename__ = 'booking_daily_stats'
+    
+    day = Column(Date, primary_key=True)
+    booking_count = Column(Integer, default=0, nullable=False)
+    revenue = Column(Float, default=0.0, nullable=False)  # Everything charged, refunds included, failed payments not
+    refund_count = Column(Integer, default=0, nullable=False)
+    refunded_amount = Column(Float, default=0.0, nullable=False)
+    
+    @property
+    def net_revenue(self):
+        return self.revenue - self.refunded_amount
+    
+    def __repr__(self):
+        return f"<BookingDailyStats {self.day}: {self.booking_count} bookings>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean, Enum
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean, Enum, Index
 from sqlalchemy.orm import relationship
 from src.utils.database import Base
 import enum
@@ -32,6 +32,11 @@ class Flight(Base):
 class FlightSchedule(Base):
     __tablename__ = 'flight_schedules'
     
+    # Covers the per-flight schedule counts of the staff flight catalog, so they never read the table
+    __table_args__ = (
+        Index('ix_flight_schedules_flight_status_departure', 'flight_id', 'status', 'scheduled_departure_time'),
+    )
+    
     id = Column(Integer, primary_key=True)
     flight_id = Column(Integer, ForeignKey('flights.id'), nullable=False)
     
@@ -42,7 +47,7 @@ class FlightSchedule(Base):
     departure_gate = Column(String(10), nullable=True)
     
     # Times
-    scheduled_departure_time = Column(DateTime, nullable=False)
+    scheduled_departure_time = Column(DateTime, nullable=False, index=True)
     actual_departure_time = Column(DateTime, nullable=True)
     scheduled_arrival_time = Column(DateTime, nullable=False)
     actual_arrival_time = Column(DateTime, nullable=True)
@@ -52,6 +57,9 @@ class FlightSchedule(Base):
     flight_plan_notes = Column(Text, nullable=True)
     meals_provided = Column(Boolean, default=False, nullable=False)
     
+    # Raised by a database trigger whenever a field shown on the flight status board changes
+    change_seq = Column(Integer, default=0, server_default="0", nullable=False, index=True)
+    
     # Self-referencing relationship for return flights
     return_schedule_id = Column(Integer, ForeignKey('flight_schedules.id'), nullable=True)
     return_schedule = relationship("FlightSchedule", remote_side=[id], backref="outbound_schedule", uselist=False)
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, Float, DateTime, JSON
+from src.utils.database import Base
+
+class KpiSnapshot(Base):
+    """Single-row table of admin dashboard counters, kept current as records are written"""
+    __tablename__ = 'kpi_snapshot'
+    
+    id = Column(Integer, primary_key=True)  # Always 1
+    
+    # Users
+    total_users = Column(Integer, default=0, nullable=False)
+    admin_users = Column(Integer, default=0, nullable=False)
+    staff_users = Column(Integer, default=0, nullable=False)
+    
+    # Bookings and revenue
+    total_bookings = Column(Integer, default=0, nullable=False)
+    total_revenue = Column(Float, default=0.0, nullable=False)
+    daily_bookings = Column(JSON, default=dict, nullable=False)  # {"YYYY-MM-DD": count} for recent days
+    
+    # Fleet and routes
+    total_flights = Column(Integer, default=0, nullable=False)
+    total_schedules = Column(Integer, default=0, nullable=False)
+    total_aircraft = Column(Integer, default=0, nullable=False)
+    
+    reconciled_at = Column(DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f"<KpiSnapshot {self.total_bookings} bookings, {self.total_users} users>"
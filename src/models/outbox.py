@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum
+from src.utils.database import Base
+import enum
+import datetime
+
+class OutboxStatus(enum.Enum):
+    PENDING = "Pending"
+    SENDING = "Sending"  # Claimed by a dispatcher
+    SENT = "Sent"
+    FAILED = "Failed"
+
+class OutboxMessage(Base):
+    """A message to send, written in the same transaction as the change that caused it"""
+    __tablename__ = 'outbox_messages'
+    
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(50), nullable=False)  # e.g. "thank_you"
+    booking_id = Column(Integer, ForeignKey('bookings.id'), nullable=True)
+    recipient = Column(String(100), nullable=False)
+    subject = Column(String(200), nullable=False)
+    body = Column(Text, nullable=False)
+    
+    # Delivery state
+    status = Column(Enum(OutboxStatus), default=OutboxStatus.PENDING, nullable=False, index=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    last_error = Column(Text, nullable=True)
+    claimed_at = Column(DateTime, nullable=True)  # When a dispatcher took it for sending
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    sent_at = Column(DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f"<OutboxMessage {self.kind} to {self.recipient} ({self.status.value})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, CheckConstraint, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, CheckConstraint, Text, UniqueConstraint
 from sqlalchemy.orm import relationship
 from src.utils.database import Base
 import datetime
@@ -21,4 +21,37 @@ class Rating(Base):
     booking = relationship("Booking", back_populates="rating")
     
     def __repr__(self):
-        return f"<Rating {self.stars}★ for booking {self.booking.confirmation_code}>" 
\ No newline at end of file
+        return f"<Rating {self.stars}★ for booking {self.booking.confirmation_code}>"
+
+class RatingScope:
+    FLIGHT = "flight"
+    ROUTE = "route"
+    AIRCRAFT = "aircraft"
+
+class RatingAggregate(Base):
+    """Running rating totals for one flight, route or aircraft"""
+    __tablename__ = 'rating_aggregates'
+    
+    id = Column(Integer, primary_key=True)
+    scope = Column(String(20), nullable=False)  # One of RatingScope
+    scope_key = Column(String(20), nullable=False)  # Flight id, "LHR-EDI" or aircraft id
+    rating_count = Column(Integer, default=0, nullable=False)
+    stars_total = Column(Integer, default=0, nullable=False)
+    
+    # Star histogram
+    star_1 = Column(Integer, default=0, nullable=False)
+    star_2 = Column(Integer, default=0, nullable=False)
+    star_3 = Column(Integer, default=0, nullable=False)
+    star_4 = Column(Integer, default=0, nullable=False)
+    star_5 = Column(Integer, default=0, nullable=False)
+    
+    __table_args__ = (
+        UniqueConstraint('scope', 'scope_key', name='uq_rating_aggregate_scope'),
+    )
+    
+    @property
+    def average(self):
+        return self.stars_total / self.rating_count if self.rating_count else None
+    
+    def __repr__(self):
+        return f"<RatingAggregate {self.scope} {self.scope_key}: {self.rating_count} ratings>"
@@ -6,12 +6,25 @@ from datetime import datetime, timedelta
 from src.utils.database import get_session
 from src.models.user import User
 from src.models.role import Role
-from src.models.booking import Booking
+from src.models.booking import Booking, PaymentStatus
 from src.models.flight import Flight, FlightSchedule
 from src.models.aircraft import Aircraft
+from src.models.rating import RatingScope
+from src.logic.ratings import rating_aggregates
+from src.logic.kpis import get_kpi_snapshot
+from src.logic.booking_stats import revenue_between, revenue_trends
+from src.logic.exports import parquet_available
+from src.logic.search import search_users, search_bookings, SEARCH_MIN_LENGTH
+from src.logic.audit import audit_events
+from src.logic.flight_board import day_bounds
+from src.logic.utilisation import aircraft_utilisation, UTILISATION_WINDOW_DAYS, MIN_TURNAROUND_MINUTES
+from src.models.audit import AuditCategory
 from src.utils.components import protected_page, create_page_header, create_stats_card
-from src.utils.auth import get_user_display_info
-from sqlalchemy import func, text
+from src.utils.auth import get_user_display_info, is_admin
+from src.utils.data_tables import TableColumn, fetch_page, NUMBER, DATETIME, ENUM
+from src.utils.live_board import load_flight_board, create_flight_board
+from src.utils.report_views import cached_report
+from sqlalchemy import func
 
 dash.register_page(__name__, path="/admin")
 
@@ -20,39 +33,31 @@ def layout():
     """Admin dashboard layout"""
     user_info = get_user_display_info()
     
-    # Get database statistics
+    # Read the dashboard counters from the KPI snapshot - one row instead of a count per card
     session = get_session()
     try:
-        # User statistics - using SQL joins to avoid relationship loading issues
-        total_users = session.query(User).count()
-        
-        # Count admin users using SQL join
-        admin_users = session.query(User).join(User.roles).filter(Role.name == "admin").count()
-        
-        # Count staff users using SQL join
-        staff_users = session.query(User).join(User.roles).filter(
-            Role.name.in_(["technical_staff", "non_technical_staff"])
-        ).count()
+        kpis = get_kpi_snapshot(session)
         
+        total_users = kpis.total_users
+        admin_users = kpis.admin_users
+        staff_users = kpis.staff_users
         passenger_users = total_users - admin_users - staff_users
         
-        # Booking statistics - FIXED: using booking_date instead of booking_time
-        total_bookings = session.query(Booking).count()
-        today_bookings = session.query(Booking).filter(
-            func.date(Booking.booking_date) == datetime.now().date()
-        ).count()
-        this_week_bookings = session.query(Booking).filter(
-            Booking.booking_date >= datetime.now() - timedelta(days=7)
-        ).count()
+        # Today and this week come from the per-day booking counts
+        today = datetime.now().date()
+        daily_bookings = kpis.daily_bookings or {}
+        today_bookings = daily_bookings.get(today.isoformat(), 0)
+        this_week_bookings = sum(
+            daily_bookings.get((today - timedelta(days=days)).isoformat(), 0) for days in range(7)
+        )
         
-        # Revenue statistics - FIXED: using cost_charged instead of total_price
-        total_revenue = session.query(func.sum(Booking.cost_charged)).scalar() or 0
-        avg_booking_value = session.query(func.avg(Booking.cost_charged)).scalar() or 0
+        total_bookings = kpis.total_bookings
+        total_revenue = kpis.total_revenue or 0
+        avg_booking_value = total_revenue / total_bookings if total_bookings else 0
         
-        # Flight statistics
-        total_flights = session.query(Flight).count()
-        total_schedules = session.query(FlightSchedule).count()
-        active_aircraft = session.query(Aircraft).count()
+        total_flights = kpis.total_flights
+        total_schedules = kpis.total_schedules
+        active_aircraft = kpis.total_aircraft
         
     except Exception as e:
         print(f"Error getting admin stats: {e}")
@@ -111,6 +116,22 @@ def layout():
             ], md=3),
         ], className="mb-4"),
         
+        # Search across users and bookings
+        dbc.Card([
+            dbc.CardBody([
+                dbc.InputGroup([
+                    dbc.InputGroupText(html.I(className="fas fa-search")),
+                    dbc.Input(
+                        id="admin-search",
+                        type="search",
+                        placeholder="Search passengers by name, email or city, or bookings by confirmation code",
+                        autocomplete="off"
+                    )
+                ]),
+                html.Div(id="admin-search-results")
+            ])
+        ], className="mb-4"),
+        
         # Management sections
         dbc.Row([
             dbc.Col([
@@ -137,6 +158,7 @@ def layout():
                         dbc.ButtonGroup([
                             dbc.Button("View All Bookings", color="success", id="btn-view-bookings"),
                             dbc.Button("Booking Reports", color="outline-success", id="btn-booking-reports"),
+                            dbc.Button("Ratings", color="outline-success", id="btn-rating-reports"),
                         ])
                     ])
                 ])
@@ -181,6 +203,59 @@ def layout():
         dcc.Store(id="admin-current-view")
     ])
 
+@callback(
+    Output("admin-search-results", "children"),
+    Input("admin-search", "value"),
+    prevent_initial_call=True
+)
+def search_admin_console(query):
+    """Typeahead search over the full-text indexes"""
+    if not query or len(query.strip()) < SEARCH_MIN_LENGTH or not is_admin():
+        return None
+    
+    session = get_session()
+    try:
+        users = search_users(session, query)
+        bookings = search_bookings(session, query)
+    except Exception as e:
+        print(f"Error searching: {e}")
+        return dbc.Alert("Search is unavailable right now.", color="danger", className="mt-3 mb-0")
+    finally:
+        session.close()
+    
+    if not users and not bookings:
+        return html.P("No matches found.", className="text-muted mt-3 mb-0")
+    
+    sections = []
+    if users:
+        sections.append(dbc.Col([
+            html.H6("Passengers", className="mt-3"),
+            dbc.ListGroup([
+                dbc.ListGroupItem([
+                    html.Strong(f"{user.first_name} {user.last_name}"),
+                    html.Small(f" {user.email} · {user.city}", className="text-muted")
+                ])
+                for user in users
+            ])
+        ], md=6))
+    if bookings:
+        sections.append(dbc.Col([
+            html.H6("Bookings", className="mt-3"),
+            dbc.ListGroup([
+                dbc.ListGroupItem([
+                    html.Strong(booking.confirmation_code),
+                    html.Small(
+                        f" {booking.first_name} {booking.last_name} · {booking.flight_number} "
+                        f"{booking.departure_airport} → {booking.arrival_airport} · "
+                        f"{str(booking.scheduled_departure_time)[:16]} · £{booking.cost_charged:.2f}",
+                        className="text-muted"
+                    )
+                ])
+                for booking in bookings
+            ])
+        ], md=6))
+    return dbc.Row(sections)
+
 # Callbacks for the different admin views
 @callback(
     [Output("admin-content", "children"),
@@ -189,6 +264,7 @@ def layout():
      Input("btn-user-reports", "n_clicks"),
      Input("btn-view-bookings", "n_clicks"),
      Input("btn-booking-reports", "n_clicks"),
+     Input("btn-rating-reports", "n_clicks"),
      Input("btn-flight-status", "n_clicks"),
      Input("btn-schedule-reports", "n_clicks"),
      Input("btn-system-config", "n_clicks"),
@@ -196,7 +272,7 @@ def layout():
     prevent_initial_call=True
 )
 def handle_admin_navigation(users_btn, user_reports_btn, bookings_btn, booking_reports_btn,
-                          flight_btn, schedule_btn, config_btn, audit_btn):
+                          rating_reports_btn, flight_btn, schedule_btn, config_btn, audit_btn):
     ctx = dash.callback_context
     if not ctx.triggered:
         return html.Div(), None
@@ -211,6 +287,8 @@ def handle_admin_navigation(users_btn, user_reports_btn, bookings_btn, booking_r
         return load_bookings_view(), "bookings"
     elif button_id == "btn-booking-reports":
         return load_booking_reports_view(), "booking_reports"
+    elif button_id == "btn-rating-reports":
+        return load_rating_reports_view(), "rating_reports"
     elif button_id == "btn-flight-status":
         return load_flight_status_view(), "flight_status"
     elif button_id == "btn-schedule-reports":
@@ -293,31 +371,21 @@ def load_users_view():
         ])
     ])
 
-def load_user_reports_view():
-    """Load user reports and analytics"""
-    session = get_session()
-    try:
-        # User registration trends (last 30 days)
-        thirty_days_ago = datetime.now() - timedelta(days=30)
-        recent_registrations = session.query(User).filter(
-            User.created_at >= thirty_days_ago
-        ).count()
-        
-        # Role distribution
-        role_stats = session.query(Role.name, func.count(User.id)).join(User.roles).group_by(Role.name).all()
-        
-        # Active users (those with bookings in last 30 days)
-        active_users = session.query(User).join(Booking).filter(
-            Booking.booking_date >= thirty_days_ago
-        ).distinct().count()
-        
-    except Exception as e:
-        print(f"Error loading user reports: {e}")
-        recent_registrations = 0
-        role_stats = []
-        active_users = 0
-    finally:
-        session.close()
+def build_user_reports(session):
+    """Registrations and activity over the last 30 days, and the role distribution"""
+    # User registration trends (last 30 days)
+    thirty_days_ago = datetime.now() - timedelta(days=30)
+    recent_registrations = session.query(User).filter(
+        User.created_at >= thirty_days_ago
+    ).count()
+    
+    # Role distribution
+    role_stats = session.query(Role.name, func.count(User.id)).join(User.roles).group_by(Role.name).all()
+    
+    # Active users (those with bookings in last 30 days)
+    active_users = session.query(User).join(Booking).filter(
+        Booking.booking_date >= thirty_days_ago
+    ).distinct().count()
     
     # Create role distribution chart data
     role_chart_data = []
@@ -327,7 +395,18 @@ def load_user_reports_view():
             "Count": count
         })
     
-    role_df = pd.DataFrame(role_chart_data)
+    return {
+        "recent_registrations": recent_registrations,
+        "active_users": active_users,
+        "roles": pd.DataFrame(role_chart_data)
+    }
+
+@cached_report("user-reports", build_user_reports, tables=("users", "user_roles", "bookings"), role="admin")
+def load_user_reports_view(report):
+    """Load user reports and analytics"""
+    recent_registrations = report["recent_registrations"]
+    active_users = report["active_users"]
+    role_df = report["roles"]
     
     return html.Div([
         dbc.Card([
@@ -377,35 +456,47 @@ def load_user_reports_view():
         ])
     ])
 
+# All Bookings table columns, each read straight from SQL so sorting and filtering happen in the query
+BOOKING_TABLE_COLUMNS = [
+    TableColumn("Booking ID", Booking.confirmation_code),
+    TableColumn("Passenger", User.first_name + " " + User.last_name),
+    TableColumn("Flight", Flight.flight_number),
+    TableColumn("Route", FlightSchedule.departure_airport + " → " + FlightSchedule.arrival_airport),
+    TableColumn("Date", FlightSchedule.scheduled_departure_time, DATETIME, format=lambda value: value.strftime("%Y-%m-%d")),
+    TableColumn("Price", Booking.cost_charged, NUMBER, format=lambda value: f"£{value:.2f}"),
+    TableColumn("Status", Booking.payment_status, ENUM, enum=PaymentStatus),
+    TableColumn("Booked", Booking.booking_date, DATETIME, format=lambda value: value.strftime("%Y-%m-%d %H:%M")),
+]
+BOOKING_TABLE_KEY = TableColumn("id", Booking.id, NUMBER)
+BOOKING_TABLE_PAGE_SIZE = 20
+
+def bookings_table_query(session):
+    """Bookings joined to everything the All Bookings table shows"""
+    return session.query(Booking).join(
+        FlightSchedule, Booking.flight_schedule_id == FlightSchedule.id
+    ).join(
+        Flight, FlightSchedule.flight_id == Flight.id
+    ).join(
+        User, Booking.passenger_id == User.id
+    )
+
 def load_bookings_view():
     """Load bookings management view"""
     session = get_session()
     try:
-        # Get recent bookings with flight details - FIXED: eager load passenger relationship
-        bookings = session.query(Booking).join(FlightSchedule).join(Flight).join(User, Booking.passenger_id == User.id).all()
-        
-        booking_data = []
-        for booking in bookings:
-            booking_data.append({
-                "Booking ID": booking.confirmation_code,
-                "Passenger": f"{booking.passenger.first_name} {booking.passenger.last_name}",
-                "Flight": f"{booking.flight_schedule.flight.flight_number}",
-                "Route": f"{booking.flight_schedule.departure_airport} → {booking.flight_schedule.arrival_airport}",
-                "Date": booking.flight_schedule.scheduled_departure_time.strftime("%Y-%m-%d"),
-                "Price": f"£{booking.cost_charged:.2f}",
-                "Status": "Confirmed",
-                "Booked": booking.booking_date.strftime("%Y-%m-%d %H:%M")
-            })
-        
-        df = pd.DataFrame(booking_data)
+        # Only the first page is read here; the table asks for the rest as it is paged, sorted and filtered
+        records, page_count, table_state = fetch_page(
+            bookings_table_query(session), BOOKING_TABLE_COLUMNS, BOOKING_TABLE_KEY,
+            0, BOOKING_TABLE_PAGE_SIZE, [], ""
+        )
         
     except Exception as e:
         print(f"Error loading bookings: {e}")
-        df = pd.DataFrame()
+        records = []
     finally:
         session.close()
     
-    if df.empty:
+    if not records:
         return html.Div([
             dbc.Alert("No bookings found or error loading data.", color="warning")
         ])
@@ -413,92 +504,95 @@ def load_bookings_view():
     return html.Div([
         dbc.Card([
             dbc.CardHeader([
-                html.H5("🎫 All Bookings", className="mb-0")
+                html.Div([
+                    html.H5("🎫 All Bookings", className="mb-0"),
+                    dbc.ButtonGroup([
+                        # Plain links so the browser downloads the streamed file
+                        dbc.Button("Export CSV", href="/admin/export/bookings.csv", external_link=True,
+                                   color="outline-success", size="sm"),
+                        dbc.Button("Export Parquet", href="/admin/export/bookings.parquet", external_link=True,
+                                   color="outline-success", size="sm", disabled=not parquet_available()),
+                    ])
+                ], className="d-flex justify-content-between align-items-center")
             ]),
             dbc.CardBody([
                 dash_table.DataTable(
                     id="bookings-table",
-                    data=df.to_dict("records"),
-                    columns=[{"name": col, "id": col} for col in df.columns],
-                    sort_action="native",
-                    filter_action="native",
-                    page_action="native",
-                    page_size=20,
+                    data=records,
+                    columns=[column.datatable_column() for column in BOOKING_TABLE_COLUMNS],
+                    sort_action="custom",
+                    sort_mode="multi",
+                    sort_by=[],
+                    filter_action="custom",
+                    filter_query="",
+                    page_action="custom",
+                    page_current=0,
+                    page_size=BOOKING_TABLE_PAGE_SIZE,
+                    page_count=page_count,
                     style_cell={"textAlign": "left"},
                     style_header={"backgroundColor": "rgb(230, 230, 230)", "fontWeight": "bold"}
-                )
+                ),
+                dcc.Store(id="bookings-table-state", data=table_state)
             ])
         ])
     ])
 
-def load_booking_reports_view():
-    """Load booking reports and analytics"""
+@callback(
+    [Output("bookings-table", "data"),
+     Output("bookings-table", "page_count"),
+     Output("bookings-table-state", "data")],
+    [Input("bookings-table", "page_current"),
+     Input("bookings-table", "page_size"),
+     Input("bookings-table", "sort_by"),
+     Input("bookings-table", "filter_query")],
+    State("bookings-table-state", "data"),
+    prevent_initial_call=True
+)
+def page_bookings_table(page_current, page_size, sort_by, filter_query, table_state):
+    """Read just the requested page of bookings"""
+    if not is_admin():
+        return dash.no_update, dash.no_update, dash.no_update
+    
     session = get_session()
     try:
-        # Revenue by time period
-        today = datetime.now().date()
-        yesterday = today - timedelta(days=1)
-        week_ago = today - timedelta(days=7)
-        month_ago = today - timedelta(days=30)
-        
-        today_revenue = session.query(func.sum(Booking.cost_charged)).filter(
-            func.date(Booking.booking_date) == today
-        ).scalar() or 0
-        
-        yesterday_revenue = session.query(func.sum(Booking.cost_charged)).filter(
-            func.date(Booking.booking_date) == yesterday
-        ).scalar() or 0
-        
-        week_revenue = session.query(func.sum(Booking.cost_charged)).filter(
-            Booking.booking_date >= week_ago
-        ).scalar() or 0
-        
-        month_revenue = session.query(func.sum(Booking.cost_charged)).filter(
-            Booking.booking_date >= month_ago
-        ).scalar() or 0
-        
-        # COMPLEX QUERY 1: Revenue trends by day with rolling averages
-        # This uses window functions, date operations, and subqueries
-        revenue_trends = session.execute(text("""
-            SELECT 
-                DATE(booking_date) as booking_date,
-                COUNT(*) as daily_bookings,
-                SUM(cost_charged) as daily_revenue,
-                AVG(cost_charged) as avg_booking_value,
-                AVG(SUM(cost_charged)) OVER (
-                    ORDER BY DATE(booking_date) 
-                    ROWS BETWEEN 6 PRECEDING AND CURRENT ROW
-                ) as seven_day_avg_revenue
-            FROM bookings 
-            WHERE booking_date >= DATE('now', '-30 days')
-            GROUP BY DATE(booking_date)
-            ORDER BY booking_date DESC
-            LIMIT 30
-        """)).fetchall()
-        
-        # Popular routes
-        popular_routes = session.query(
-            FlightSchedule.departure_airport,
-            FlightSchedule.arrival_airport,
-            func.count(Booking.id).label('booking_count'),
-            func.sum(Booking.cost_charged).label('total_revenue')
-        ).join(Booking).group_by(
-            FlightSchedule.departure_airport, FlightSchedule.arrival_airport
-        ).order_by(func.count(Booking.id).desc()).limit(10).all()
-        
-        # Average booking value by period
-        avg_booking_today = session.query(func.avg(Booking.cost_charged)).filter(
-            func.date(Booking.booking_date) == today
-        ).scalar() or 0
-        
+        return fetch_page(
+            bookings_table_query(session), BOOKING_TABLE_COLUMNS, BOOKING_TABLE_KEY,
+            page_current, page_size, sort_by, filter_query, table_state
+        )
     except Exception as e:
-        print(f"Error loading booking reports: {e}")
-        today_revenue = yesterday_revenue = week_revenue = month_revenue = 0
-        popular_routes = []
-        avg_booking_today = 0
-        revenue_trends = []
+        print(f"Error paging bookings: {e}")
+        return dash.no_update, dash.no_update, dash.no_update
     finally:
         session.close()
+
+def build_booking_reports(session):
+    """Revenue by period and by day from the daily rollup, and the most booked routes"""
+    # Revenue by time period, read from the daily rollup
+    today = datetime.now().date()
+    yesterday = today - timedelta(days=1)
+    week_ago = today - timedelta(days=7)
+    month_ago = today - timedelta(days=30)
+    
+    today_bookings, today_gross, today_revenue = revenue_between(session, today, today)
+    _, _, yesterday_revenue = revenue_between(session, yesterday, yesterday)
+    _, _, week_revenue = revenue_between(session, week_ago, today)
+    _, _, month_revenue = revenue_between(session, month_ago, today)
+    
+    # Daily revenue with a rolling 7-day average, one rollup row per day
+    revenue_trend_rows = revenue_trends(session, today)
+    
+    # Popular routes
+    popular_routes = session.query(
+        FlightSchedule.departure_airport,
+        FlightSchedule.arrival_airport,
+        func.count(Booking.id).label('booking_count'),
+        func.sum(Booking.cost_charged).label('total_revenue')
+    ).join(Booking).group_by(
+        FlightSchedule.departure_airport, FlightSchedule.arrival_airport
+    ).order_by(func.count(Booking.id).desc()).limit(10).all()
+    
+    # Average booking value today
+    avg_booking_today = today_gross / today_bookings if today_bookings else 0
     
     # Create popular routes data
     routes_data = []
@@ -514,17 +608,39 @@ def load_booking_reports_view():
     
     # Create revenue trends data
     trends_data = []
-    for trend in revenue_trends:
+    for trend in revenue_trend_rows:
         trends_data.append({
-            "Date": trend.booking_date,
-            "Daily Bookings": trend.daily_bookings,
-            "Daily Revenue": f"£{trend.daily_revenue:,.2f}",
-            "Avg Booking": f"£{trend.avg_booking_value:.2f}",
-            "7-Day Avg Revenue": f"£{trend.seven_day_avg_revenue:,.2f}"
+            "Date": trend.day.isoformat(),
+            "Daily Bookings": trend.booking_count,
+            "Refunds": trend.refund_count,
+            "Daily Revenue": f"£{trend.net_revenue:,.2f}",
+            "Avg Booking": f"£{trend.revenue / trend.booking_count if trend.booking_count else 0:.2f}",
+            "7-Day Avg Revenue": f"£{trend.rolling_net_revenue:,.2f}"
         })
     
     trends_df = pd.DataFrame(trends_data)
     
+    return {
+        "today_revenue": today_revenue,
+        "yesterday_revenue": yesterday_revenue,
+        "week_revenue": week_revenue,
+        "month_revenue": month_revenue,
+        "avg_booking_today": avg_booking_today,
+        "routes": routes_df,
+        "trends": trends_df
+    }
+
+@cached_report("booking-reports", build_booking_reports, tables=("bookings", "flight_schedules"), role="admin")
+def load_booking_reports_view(report):
+    """Load booking reports and analytics"""
+    today_revenue = report["today_revenue"]
+    yesterday_revenue = report["yesterday_revenue"]
+    week_revenue = report["week_revenue"]
+    month_revenue = report["month_revenue"]
+    avg_booking_today = report["avg_booking_today"]
+    routes_df = report["routes"]
+    trends_df = report["trends"]
+    
     return html.Div([
         dbc.Card([
             dbc.CardHeader([
@@ -614,47 +730,92 @@ def load_booking_reports_view():
         ])
     ])
 
+def load_rating_reports_view():
+    """Load passenger satisfaction by flight, route and aircraft"""
+    session = get_session()
+    try:
+        # Averages come straight from the running aggregates, without scanning ratings
+        aggregates = {
+            scope: rating_aggregates(session, scope)
+            for scope in (RatingScope.FLIGHT, RatingScope.ROUTE, RatingScope.AIRCRAFT)
+        }
+        flight_numbers = dict(session.query(Flight.id, Flight.flight_number).all())
+        registrations = dict(session.query(Aircraft.id, Aircraft.registration_number).all())
+        
+    except Exception as e:
+        print(f"Error loading rating reports: {e}")
+        aggregates = {}
+        flight_numbers = {}
+        registrations = {}
+    finally:
+        session.close()
+    
+    # Readable labels for each scope's keys
+    labels = {
+        RatingScope.FLIGHT: lambda key: flight_numbers.get(int(key), key),
+        RatingScope.ROUTE: lambda key: key.replace("-", " → "),
+        RatingScope.AIRCRAFT: lambda key: registrations.get(int(key), key),
+    }
+    
+    def rating_table(scope, title):
+        rows = [{
+            title: labels[scope](aggregate.scope_key),
+            "Ratings": aggregate.rating_count,
+            "Average": f"{aggregate.average:.2f} ★",
+            **{f"{stars}★": getattr(aggregate, f"star_{stars}") for stars in range(5, 0, -1)}
+        } for aggregate in aggregates.get(scope, [])]
+        
+        if not rows:
+            return dbc.Alert("No ratings yet", color="info")
+        
+        return dash_table.DataTable(
+            data=rows,
+            columns=[{"name": col, "id": col} for col in rows[0]],
+            style_cell={"textAlign": "left"},
+            style_header={"backgroundColor": "rgb(230, 230, 230)", "fontWeight": "bold"},
+            page_size=10
+        )
+    
+    return html.Div([
+        dbc.Card([
+            dbc.CardHeader([
+                html.H5("⭐ Passenger Satisfaction", className="mb-0")
+            ]),
+            dbc.CardBody([
+                html.H6("By Route", className="mb-3"),
+                rating_table(RatingScope.ROUTE, "Route"),
+                html.H6("By Flight", className="mb-3 mt-4"),
+                rating_table(RatingScope.FLIGHT, "Flight"),
+                html.H6("By Aircraft", className="mb-3 mt-4"),
+                rating_table(RatingScope.AIRCRAFT, "Aircraft")
+            ])
+        ])
+    ])
+
 def load_flight_status_view():
     """Load flight status overview"""
     session = get_session()
     try:
-        # Get flight schedules for today and tomorrow
+        # Today's board, and a count of tomorrow's departures from the same index
         today = datetime.now().date()
-        tomorrow = today + timedelta(days=1)
+        board, board_state = load_flight_board(session, today)
         
-        today_flights = session.query(FlightSchedule).filter(
-            func.date(FlightSchedule.scheduled_departure_time) == today
-        ).join(Flight).all()
-        
-        tomorrow_flights = session.query(FlightSchedule).filter(
-            func.date(FlightSchedule.scheduled_departure_time) == tomorrow
-        ).join(Flight).all()
+        tomorrow_start, tomorrow_end = day_bounds(today + timedelta(days=1))
+        total_tomorrow = session.query(func.count(FlightSchedule.id)).filter(
+            FlightSchedule.scheduled_departure_time >= tomorrow_start,
+            FlightSchedule.scheduled_departure_time < tomorrow_end
+        ).scalar()
         
         # Flight status summary
-        total_today = len(today_flights)
-        total_tomorrow = len(tomorrow_flights)
-        
-        # Create flight data
-        flight_data = []
-        for schedule in today_flights[:20]:  # Limit to 20 for display
-            flight_data.append({
-                "Flight": schedule.flight.flight_number,
-                "Route": f"{schedule.departure_airport} → {schedule.arrival_airport}",
-                "Departure": schedule.scheduled_departure_time.strftime("%H:%M"),
-                "Arrival": schedule.scheduled_arrival_time.strftime("%H:%M"),
-                "Aircraft": schedule.flight.aircraft.registration_number,
-                "Status": schedule.status.value if schedule.status else "Scheduled"
-            })
+        total_today = len(board)
         
     except Exception as e:
         print(f"Error loading flight status: {e}")
-        flight_data = []
+        board, board_state = [], None
         total_today = total_tomorrow = 0
     finally:
         session.close()
     
-    flights_df = pd.DataFrame(flight_data)
-    
     return html.Div([
         dbc.Card([
             dbc.CardHeader([
@@ -683,56 +844,42 @@ def load_flight_status_view():
                 ], className="mb-4"),
                 
                 html.H6("Today's Flight Schedule", className="mb-3"),
-                dash_table.DataTable(
-                    data=flights_df.to_dict("records") if not flights_df.empty else [],
-                    columns=[{"name": col, "id": col} for col in flights_df.columns] if not flights_df.empty else [],
-                    style_cell={"textAlign": "left"},
-                    style_header={"backgroundColor": "rgb(230, 230, 230)", "fontWeight": "bold"},
-                    page_size=15
-                ) if not flights_df.empty else dbc.Alert("No flights scheduled for today", color="info")
+                create_flight_board("admin-flight-status", board, board_state)
+                if board else dbc.Alert("No flights scheduled for today", color="info")
             ])
         ])
     ])
 
-def load_schedule_reports_view():
-    """Load schedule reports"""
-    session = get_session()
-    try:
-        # Aircraft utilisation - FIXED: explicit join path
-        aircraft_usage = session.query(
-            Aircraft.registration_number,
-            Aircraft.model_number,
-            func.count(FlightSchedule.id).label('flight_count')
-        ).select_from(Aircraft).join(Flight, Aircraft.id == Flight.aircraft_id).join(
-            FlightSchedule, Flight.id == FlightSchedule.flight_id
-        ).group_by(Aircraft.id, Aircraft.registration_number, Aircraft.model_number).order_by(
-            func.count(FlightSchedule.id).desc()
-        ).all()
-        
-        # Route frequency - FIXED: use FlightSchedule fields
-        route_frequency = session.query(
-            FlightSchedule.departure_airport,
-            FlightSchedule.arrival_airport,
-            func.count(FlightSchedule.id).label('schedule_count')
-        ).group_by(
-            FlightSchedule.departure_airport, FlightSchedule.arrival_airport
-        ).order_by(func.count(FlightSchedule.id).desc()).limit(10).all()
-        
-    except Exception as e:
-        print(f"Error loading schedule reports: {e}")
-        aircraft_usage = []
-        route_frequency = []
-    finally:
-        session.close()
+def build_schedule_reports(session):
+    """Block-hour utilisation per aircraft and the busiest routes"""
+    # Block-hour utilisation per aircraft over the coming weeks
+    today = datetime.now().date()
+    utilisation = aircraft_utilisation(session, today)
     
-    # Create aircraft usage data
+    # Route frequency - FIXED: use FlightSchedule fields
+    route_frequency = session.query(
+        FlightSchedule.departure_airport,
+        FlightSchedule.arrival_airport,
+        func.count(FlightSchedule.id).label('schedule_count')
+    ).group_by(
+        FlightSchedule.departure_airport, FlightSchedule.arrival_airport
+    ).order_by(func.count(FlightSchedule.id).desc()).limit(10).all()
+    
+    # Create aircraft utilisation data
     aircraft_data = []
-    for usage in aircraft_usage:
+    for usage in utilisation.itertuples():
         aircraft_data.append({
             "Aircraft": usage.registration_number,
             "Model": usage.model_number,
-            "Scheduled Flights": usage.flight_count,
-            "Utilisation": f"{usage.flight_count * 100 / max(len(aircraft_usage) * 10, 1):.1f}%"
+            "Flights": usage.flights,
+            "Block Hours": round(usage.block_hours, 1),
+            "Block Hours/Day": round(usage.block_hours_per_day, 1),
+            "Busiest Day (h)": round(usage.peak_day_hours, 1),
+            "Idle Hours": round(usage.idle_hours, 1),
+            "Avg Turnaround (min)": round(usage.mean_turnaround_minutes) if pd.notna(usage.mean_turnaround_minutes) else None,
+            "Tight Turns": usage.tight_turns,
+            "Conflicts": usage.conflicts,
+            "Utilisation (%)": round(usage.utilisation * 100, 1)
         })
     
     aircraft_df = pd.DataFrame(aircraft_data)
@@ -747,6 +894,17 @@ def load_schedule_reports_view():
     
     routes_df = pd.DataFrame(route_data)
     
+    return {
+        "aircraft": aircraft_df,
+        "routes": routes_df
+    }
+
+@cached_report("schedule-reports", build_schedule_reports, tables=("aircraft", "flights", "flight_schedules"), role="admin")
+def load_schedule_reports_view(report):
+    """Load schedule reports"""
+    aircraft_df = report["aircraft"]
+    routes_df = report["routes"]
+    
     return html.Div([
         dbc.Card([
             dbc.CardHeader([
@@ -755,15 +913,26 @@ def load_schedule_reports_view():
             dbc.CardBody([
                 dbc.Row([
                     dbc.Col([
-                        html.H6("Aircraft Utilisation", className="mb-3"),
+                        html.H6(f"Aircraft Utilisation - next {UTILISATION_WINDOW_DAYS} days", className="mb-1"),
+                        html.P(
+                            f"Scheduled block hours per aircraft. Turns shorter than {MIN_TURNAROUND_MINUTES} minutes "
+                            "are tight; conflicts are flights that overlap on the same aircraft.",
+                            className="text-muted small mb-3"
+                        ),
                         dash_table.DataTable(
                             data=aircraft_df.to_dict("records") if not aircraft_df.empty else [],
                             columns=[{"name": col, "id": col} for col in aircraft_df.columns] if not aircraft_df.empty else [],
+                            sort_action="native",
                             style_cell={"textAlign": "left"},
                             style_header={"backgroundColor": "rgb(230, 230, 230)", "fontWeight": "bold"},
+                            style_data_conditional=[
+                                {"if": {"filter_query": "{Conflicts} > 0"}, "backgroundColor": "#f8d7da"}
+                            ],
                             page_size=10
                         ) if not aircraft_df.empty else dbc.Alert("No aircraft usage data", color="info")
-                    ], md=6),
+                    ], md=12),
+                ], className="mb-4"),
+                dbc.Row([
                     dbc.Col([
                         html.H6("Route Frequency", className="mb-3"),
                         dash_table.DataTable(
@@ -826,24 +995,94 @@ def load_system_config_view():
 
 def load_audit_logs_view():
     """Load audit logs"""
+    today = datetime.utcnow().date()
     return html.Div([
         dbc.Card([
             dbc.CardHeader([
                 html.H5("📋 System Audit Logs", className="mb-0")
             ]),
             dbc.CardBody([
-                dbc.Alert([
-                    html.H6("Audit Logging System", className="mb-3"),
-                    html.P("A comprehensive audit logging system will track:"),
-                    html.Ul([
-                        html.Li("User login/logout events"),
-                        html.Li("Flight booking and cancellation activities"),
-                        html.Li("Administrative actions and configuration changes"),
-                        html.Li("Data modification attempts"),
-                        html.Li("Security-related events"),
-                    ]),
-                    html.P("This feature will be implemented to provide complete system traceability.", className="mb-0")
-                ], color="info")
+                dbc.Row([
+                    dbc.Col([
+                        dbc.Label("Date range (UTC)"),
+                        html.Div(dcc.DatePickerRange(
+                            id="audit-date-range",
+                            start_date=today - timedelta(days=7),
+                            end_date=today,
+                            display_format="YYYY-MM-DD"
+                        ))
+                    ], md=5),
+                    dbc.Col([
+                        dbc.Label("Actor email"),
+                        dbc.Input(id="audit-actor", type="email", placeholder="Any user")
+                    ], md=3),
+                    dbc.Col([
+                        dbc.Label("Category"),
+                        dcc.Dropdown(
+                            id="audit-category",
+                            options=[
+                                {"label": "Authentication", "value": AuditCategory.AUTH},
+                                {"label": "Bookings", "value": AuditCategory.BOOKING},
+                                {"label": "Administration", "value": AuditCategory.ADMIN},
+                                {"label": "Security", "value": AuditCategory.SECURITY},
+                            ],
+                            placeholder="All categories"
+                        )
+                    ], md=2),
+                    dbc.Col([
+                        dbc.Button("Search", id="audit-search", color="primary", className="w-100")
+                    ], md=2, className="d-flex align-items-end"),
+                ], className="mb-3"),
+                html.Div(id="audit-results")
             ])
         ])
-    ]) 
\ No newline at end of file
+    ])
+
+@callback(
+    Output("audit-results", "children"),
+    Input("audit-search", "n_clicks"),
+    [State("audit-date-range", "start_date"),
+     State("audit-date-range", "end_date"),
+     State("audit-actor", "value"),
+     State("audit-category", "value")]
+)
+def search_audit_logs(n_clicks, start_date, end_date, actor, category):
+    """Latest audit events for a time range and, optionally, one actor"""
+    if not is_admin():
+        return dash.no_update
+    
+    # The end date is inclusive, so search up to the start of the following day
+    start = datetime.fromisoformat(start_date) if start_date else None
+    end = datetime.fromisoformat(end_date) + timedelta(days=1) if end_date else None
+    
+    session = get_session()
+    try:
+        events = audit_events(session, start=start, end=end, actor=(actor or "").strip() or None, category=category)
+        rows = [{
+            "Time": event.occurred_at.strftime("%Y-%m-%d %H:%M:%S"),
+            "Category": event.category,
+            "Action": event.action,
+            "Actor": event.actor or "",
+            "Target": event.target or "",
+            "IP Address": event.ip_address or "",
+            "Details": ", ".join(f"{key}: {value}" for key, value in (event.details or {}).items())
+        } for event in events]
+    except Exception as e:
+        print(f"Error loading audit events: {e}")
+        return dbc.Alert("Error loading audit events.", color="danger")
+    finally:
+        session.close()
+    
+    if not rows:
+        return dbc.Alert("No audit events match these filters.", color="info")
+    
+    return html.Div([
+        html.P(f"Showing the latest {len(rows)} events", className="text-muted small"),
+        dash_table.DataTable(
+            data=rows,
+            columns=[{"name": column, "id": column} for column in rows[0]],
+            page_size=25,
+            style_cell={"textAlign": "left", "whiteSpace": "normal", "height": "auto"},
+            style_header={"backgroundColor": "rgb(230, 230, 230)", "fontWeight": "bold"}
+        )
+    ])
\ No newline at end of file
@@ -3,9 +3,14 @@ from dash import html, dcc, callback, Input, Output, State
 import dash_bootstrap_components as dbc
 from src.utils.database import get_session
 from src.models.flight import FlightSchedule
-from src.models.booking import Booking, PaymentStatus
-from src.utils.seed_db import generate_confirmation_code
+from src.logic.bookings import place_booking
+from src.logic.booking_queue import get_booking_queue, GROUP_COMMIT_TIMEOUT_SECONDS
+from src.logic.payments import get_payment_processor
+from src.logic.pricing import get_price_table
+from src.logic.audit import audit
+from src.models.audit import AuditCategory
 from urllib.parse import parse_qs
+from concurrent.futures import TimeoutError as BookingTimeout
 from flask import request
 import flask
 from datetime import datetime
@@ -141,7 +146,7 @@ def load_flight_details(flight_id, passengers):
         
         # Calculate cost
         passengers = int(passengers) if passengers else 1
-        total_cost = flight_schedule.flight.base_cost * passengers
+        total_cost = get_price_table().fare_for(session, flight_schedule) * passengers
         
         # Create flight details card
         return dbc.Card([
@@ -223,6 +228,17 @@ def enable_complete_booking(passenger_name, contact_phone, terms_accepted):
     # Enable button only if all fields are filled and terms accepted
     return not all([passenger_name, contact_phone, terms_accepted])
 
+def _pay_when_booked(future):
+    """Take payment for a booking the writer committed after its request stopped waiting"""
+    if future.cancelled() or future.exception() is not None:
+        return
+    result = future.result()
+    try:
+        get_payment_processor().submit(result.booking_id, result.cost_charged)
+    except Exception as e:
+        # Still pending, so the next resume takes the payment
+        print(f"Error submitting payment for booking {result.booking_id}: {e}")
+
 @callback(
     Output("booking-result", "children"),
     Input("complete-booking-btn", "n_clicks"),
@@ -240,31 +256,38 @@ def complete_booking(n_clicks, flight_id, passengers):
         return dbc.Alert("You need to be logged in to complete a booking", color="danger")
     
     try:
-        session = get_session()
-        
-        # Get the flight schedule
-        flight_schedule = session.query(FlightSchedule).filter_by(id=flight_id).first()
-        if not flight_schedule:
-            return dbc.Alert("Flight not found", color="danger")
-        
-        # Generate a unique confirmation code
-        confirmation_code = generate_confirmation_code()
-        
-        # Calculate cost
-        passengers = int(passengers) if passengers else 1
-        total_cost = flight_schedule.flight.base_cost * passengers
-        
-        # Create the booking
-        booking = Booking(
-            passenger_id=user_id,
-            flight_schedule_id=flight_id,
-            confirmation_code=confirmation_code,
-            cost_charged=total_cost,
-            payment_status=PaymentStatus.COMPLETED
-        )
+        booking_queue = get_booking_queue()
+        if booking_queue is not None:
+            # Group commit: hand the booking to the writer thread and wait for its commit
+            booked = booking_queue.submit(user_id, flight_id, passengers)
+            try:
+                result = booked.result(timeout=GROUP_COMMIT_TIMEOUT_SECONDS)
+            except BookingTimeout:
+                # The writer may still commit it; payment then follows from there
+                booked.add_done_callback(_pay_when_booked)
+                audit(AuditCategory.BOOKING, "booking_delayed", details={
+                    "flight_schedule_id": flight_id, "passengers": passengers
+                })
+                return dbc.Alert([
+                    html.H4("Booking Is Being Processed", className="alert-heading"),
+                    html.P(
+                        "We are busy right now and your booking is still being processed. "
+                        "It will appear under My Bookings once it is confirmed; please check there "
+                        "before trying again.",
+                        className="mb-0"
+                    )
+                ], color="info")
+        else:
+            # Create the booking and commit it straight away
+            result = place_booking(get_session(), user_id, flight_id, passengers)
+        confirmation_code = result.confirmation_code
+        audit(AuditCategory.BOOKING, "booking_created", target=confirmation_code, details={
+            "booking_id": result.booking_id, "flight_schedule_id": flight_id,
+            "passengers": passengers, "cost_charged": result.cost_charged
+        })
         
-        session.add(booking)
-        session.commit()
+        # Take payment in the background instead of holding this request
+        get_payment_processor().submit(result.booking_id, result.cost_charged)
         
         # Return success message with booking details
         return html.Div([
@@ -276,12 +299,15 @@ def complete_booking(n_clicks, flight_id, passengers):
                 ]),
                 html.Hr(),
                 html.P(
-                    "You will receive a confirmation email shortly with your booking details.",
+                    "Your payment is being processed. You will receive a confirmation email shortly with your booking details.",
                     className="mb-0"
                 )
             ], color="success"),
             dcc.Location(pathname="/bookings", id="redirect-to-bookings")
         ])
         
+    except ValueError as e:
+        audit(AuditCategory.BOOKING, "booking_rejected", details={"flight_schedule_id": flight_id, "reason": str(e)})
+        return dbc.Alert(str(e), color="danger")
     except Exception as e:
         return dbc.Alert(f"Error completing booking: {str(e)}", color="danger") 
\ No newline at end of file
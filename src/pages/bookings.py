@@ -2,15 +2,29 @@ import dash
 from dash import html, dcc, callback, Input, Output, State, dash_table
 import dash_bootstrap_components as dbc
 from src.utils.database import get_session
-from src.models.booking import Booking
-from src.models.flight import FlightSchedule
-from src.models.rating import Rating
+from src.models.booking import Booking, PaymentStatus
+from src.logic.itineraries import past_itineraries_page
+from src.logic.itinerary_cache import get_itinerary_cache
+from src.logic.ratings import save_rating
+from src.logic.outbox import get_outbox_dispatcher
+from src.logic.audit import audit
+from src.models.audit import AuditCategory
+from src.utils.components import create_stats_card
 import flask
 import pandas as pd
 from datetime import datetime
 
 dash.register_page(__name__, path='/bookings')
 
+# Badge colours for each payment state
+PAYMENT_BADGE_COLORS = {
+    PaymentStatus.PENDING: "secondary",
+    PaymentStatus.PROCESSING: "secondary",
+    PaymentStatus.COMPLETED: "success",
+    PaymentStatus.FAILED: "danger",
+    PaymentStatus.REFUNDED: "info",
+}
+
 def layout():
     # Check if user is logged in
     user_id = flask.session.get("user_id")
@@ -96,6 +110,143 @@ def layout():
         ])
     ])
 
+def create_upcoming_booking_card(itinerary):
+    """Card for an upcoming flight"""
+    # Format date and times
+    flight_date = itinerary.scheduled_departure_time.strftime("%a, %d %b %Y")
+    departure_time = itinerary.scheduled_departure_time.strftime("%H:%M")
+    arrival_time = itinerary.scheduled_arrival_time.strftime("%H:%M")
+    
+    return dbc.Card([
+        dbc.CardHeader([
+            dbc.Row([
+                dbc.Col(html.H5(f"Flight {itinerary.flight_number}"), width="auto"),
+                dbc.Col(html.H6(f"Confirmation: {itinerary.confirmation_code}"), width="auto", className="ms-auto")
+            ])
+        ]),
+        dbc.CardBody([
+            dbc.Row([
+                dbc.Col([
+                    html.H5(flight_date, className="card-title"),
+                    html.Div([
+                        html.Span(itinerary.departure_airport, className="h4"),
+                        html.Span(" → ", className="mx-2"),
+                        html.Span(itinerary.arrival_airport, className="h4")
+                    ])
+                ], width=6),
+                dbc.Col([
+                    html.Div([
+                        html.P([
+                            html.Strong("Departure: "),
+                            f"{departure_time} from Terminal {itinerary.departure_terminal or 'TBA'}"
+                        ]),
+                        html.P([
+                            html.Strong("Arrival: "),
+                            f"{arrival_time}"
+                        ]),
+                        html.P([
+                            html.Strong("Status: "),
+                            html.Span(
+                                itinerary.status.value,
+                                className=f"badge bg-{'success' if itinerary.status.value == 'Scheduled' else 'warning'}"
+                            )
+                        ])
+                    ])
+                ], width=6)
+            ]),
+            html.Hr(),
+            dbc.Row([
+                dbc.Col([
+                    html.P([
+                        html.Strong("Cost: "),
+                        f"£{itinerary.cost_charged:.2f}",
+                        html.Span(
+                            f"Payment {itinerary.payment_status.value}",
+                            className=f"badge bg-{PAYMENT_BADGE_COLORS.get(itinerary.payment_status, 'secondary')} ms-2"
+                        )
+                    ])
+                ], width=6),
+                dbc.Col([
+                    dbc.Button(
+                        "View Boarding Pass",
+                        color="primary",
+                        className="w-100"
+                    )
+                ], width=6)
+            ])
+        ])
+    ], className="mb-3")
+
+def create_past_booking_card(itinerary):
+    """Card for a past flight, with its rating or a button to leave one"""
+    # Format date and times
+    flight_date = itinerary.scheduled_departure_time.strftime("%a, %d %b %Y")
+    departure_time = itinerary.scheduled_departure_time.strftime("%H:%M")
+    arrival_time = itinerary.scheduled_arrival_time.strftime("%H:%M")
+    
+    return dbc.Card([
+        dbc.CardHeader([
+            dbc.Row([
+                dbc.Col(html.H5(f"Flight {itinerary.flight_number}"), width="auto"),
+                dbc.Col(html.H6(f"Confirmation: {itinerary.confirmation_code}"), width="auto", className="ms-auto")
+            ])
+        ]),
+        dbc.CardBody([
+            dbc.Row([
+                dbc.Col([
+                    html.H5(flight_date, className="card-title"),
+                    html.Div([
+                        html.Span(itinerary.departure_airport, className="h4"),
+                        html.Span(" → ", className="mx-2"),
+                        html.Span(itinerary.arrival_airport, className="h4")
+                    ])
+                ], width=6),
+                dbc.Col([
+                    html.Div([
+                        html.P([
+                            html.Strong("Departure: "),
+                            f"{departure_time} from Terminal {itinerary.departure_terminal or 'TBA'}"
+                        ]),
+                        html.P([
+                            html.Strong("Arrival: "),
+                            f"{arrival_time}"
+                        ]),
+                        html.P([
+                            html.Strong("Status: "),
+                            html.Span(
+                                itinerary.status.value,
+                                className=f"badge bg-{'success' if itinerary.status.value == 'Landed' else 'warning'}"
+                            )
+                        ])
+                    ])
+                ], width=6)
+            ]),
+            html.Hr(),
+            dbc.Row([
+                dbc.Col([
+                    html.P([
+                        html.Strong("Cost: "),
+                        f"£{itinerary.cost_charged:.2f}"
+                    ])
+                ], width=6),
+                dbc.Col([
+                    # If already rated, show the rating, otherwise show "Rate your flight" button
+                    html.Div([
+                        html.P([
+                            html.Strong("Your Rating: "),
+                            "★" * itinerary.rating_stars + "☆" * (5 - itinerary.rating_stars)
+                        ]) if itinerary.has_rating else dbc.Button(
+                            "Rate Your Flight",
+                            id={"type": "rate-flight-btn", "index": itinerary.booking_id},
+                            color="success",
+                            className="w-100"
+                        )
+                    ])
+                ], width=6)
+            ])
+        ])
+    ], className="mb-3")
+
 @callback(
     Output("active-bookings-content", "children"),
     Input("bookings-tabs", "active_tab")
@@ -109,23 +260,10 @@ def load_active_bookings(active_tab):
         return dbc.Alert("Please log in to view your bookings", color="warning")
     
     try:
-        session = get_session()
+        # Future bookings with everything the cards need, cached per user
+        itineraries = get_itinerary_cache().get(user_id).upcoming
         
-        # Query future bookings (where scheduled departure is in the future)
-        query = session.query(Booking).join(
-            Booking.flight_schedule
-        ).filter(
-            Booking.passenger_id == user_id,
-            Booking.flight_schedule.has(
-                FlightSchedule.scheduled_departure_time > datetime.now()
-            )
-        ).order_by(
-            FlightSchedule.scheduled_departure_time.asc()
-        )
-        
-        bookings = query.all()
-        
-        if not bookings:
+        if not itineraries:
             return dbc.Alert(
                 [
                     "You don't have any upcoming flights. ",
@@ -141,79 +279,22 @@ def load_active_bookings(active_tab):
             )
         
         # Create a list of booking cards
-        booking_cards = []
-        for booking in bookings:
-            flight_schedule = booking.flight_schedule
-            flight = flight_schedule.flight
-            
-            # Format date and times
-            flight_date = flight_schedule.scheduled_departure_time.strftime("%a, %d %b %Y")
-            departure_time = flight_schedule.scheduled_departure_time.strftime("%H:%M")
-            arrival_time = flight_schedule.scheduled_arrival_time.strftime("%H:%M")
-            
-            booking_cards.append(
-                dbc.Card([
-                    dbc.CardHeader([
-                        dbc.Row([
-                            dbc.Col(html.H5(f"Flight {flight.flight_number}"), width="auto"),
-                            dbc.Col(html.H6(f"Confirmation: {booking.confirmation_code}"), width="auto", className="ms-auto")
-                        ])
-                    ]),
-                    dbc.CardBody([
-                        dbc.Row([
-                            dbc.Col([
-                                html.H5(flight_date, className="card-title"),
-                                html.Div([
-                                    html.Span(flight_schedule.departure_airport, className="h4"),
-                                    html.Span(" → ", className="mx-2"),
-                                    html.Span(flight_schedule.arrival_airport, className="h4")
-                                ])
-                            ], width=6),
-                            dbc.Col([
-                                html.Div([
-                                    html.P([
-                                        html.Strong("Departure: "),
-                                        f"{departure_time} from Terminal {flight_schedule.departure_terminal or 'TBA'}"
-                                    ]),
-                                    html.P([
-                                        html.Strong("Arrival: "),
-                                        f"{arrival_time}"
-                                    ]),
-                                    html.P([
-                                        html.Strong("Status: "),
-                                        html.Span(
-                                            flight_schedule.status.value,
-                                            className=f"badge bg-{'success' if flight_schedule.status.value == 'Scheduled' else 'warning'}"
-                                        )
-                                    ])
-                                ])
-                            ], width=6)
-                        ]),
-                        html.Hr(),
-                        dbc.Row([
-                            dbc.Col([
-                                html.P([
-                                    html.Strong("Cost: "),
-                                    f"£{booking.cost_charged:.2f}"
-                                ])
-                            ], width=6),
-                            dbc.Col([
-                                dbc.Button(
-                                    "View Boarding Pass",
-                                    color="primary",
-                                    className="w-100"
-                                )
-                            ], width=6)
-                        ])
-                    ])
-                ], className="mb-3")
-            )
-        
-        return html.Div(booking_cards)
+        return html.Div([create_upcoming_booking_card(itinerary) for itinerary in itineraries])
         
     except Exception as e:
         return dbc.Alert(f"Error loading bookings: {str(e)}", color="danger")
 
+def encode_cursor(cursor):
+    """Keyset cursor as JSON for a dcc.Store"""
+    if cursor is None:
+        return None
+    departure, booking_id = cursor
+    return {"departure": departure.isoformat(), "booking_id": booking_id}
+
+def decode_cursor(data):
+    """Keyset cursor back from a dcc.Store"""
+    return datetime.fromisoformat(data["departure"]), data["booking_id"]
+
 @callback(
     Output("past-bookings-content", "children"),
     Input("bookings-tabs", "active_tab")
@@ -227,109 +308,69 @@ def load_past_bookings(active_tab):
         return dbc.Alert("Please log in to view your bookings", color="warning")
     
     try:
-        session = get_session()
-        
-        # Query past bookings (where scheduled departure is in the past)
-        query = session.query(Booking).join(
-            Booking.flight_schedule
-        ).filter(
-            Booking.passenger_id == user_id,
-            Booking.flight_schedule.has(
-                FlightSchedule.scheduled_departure_time <= datetime.now()
-            )
-        ).order_by(
-            FlightSchedule.scheduled_departure_time.desc()
-        )
-        
-        bookings = query.all()
+        # First page of history and lifetime totals, cached per user
+        itineraries = get_itinerary_cache().get(user_id)
         
-        if not bookings:
+        if not itineraries.past:
             return dbc.Alert("You don't have any past flights.", color="info")
         
-        # Create a list of booking cards
-        booking_cards = []
-        for booking in bookings:
-            flight_schedule = booking.flight_schedule
-            flight = flight_schedule.flight
-            
-            # Format date and times
-            flight_date = flight_schedule.scheduled_departure_time.strftime("%a, %d %b %Y")
-            departure_time = flight_schedule.scheduled_departure_time.strftime("%H:%M")
-            arrival_time = flight_schedule.scheduled_arrival_time.strftime("%H:%M")
-            
-            # Check if the booking has a rating
-            has_rating = booking.rating is not None
+        booking_cards = [create_past_booking_card(itinerary) for itinerary in itineraries.past]
+        next_cursor = encode_cursor(itineraries.past_cursor)
+        trips, total_spend = itineraries.trips, itineraries.total_spend
+        
+        return html.Div([
+            dbc.Row([
+                dbc.Col([
+                    create_stats_card("Trips Taken", trips, "Completed flights", "primary", "fas fa-plane")
+                ], md=6),
+                dbc.Col([
+                    create_stats_card("Total Spend", f"£{total_spend:.2f}", "All paid bookings", "success", "fas fa-pound-sign")
+                ], md=6)
+            ], className="mb-4"),
             
-            booking_cards.append(
-                dbc.Card([
-                    dbc.CardHeader([
-                        dbc.Row([
-                            dbc.Col(html.H5(f"Flight {flight.flight_number}"), width="auto"),
-                            dbc.Col(html.H6(f"Confirmation: {booking.confirmation_code}"), width="auto", className="ms-auto")
-                        ])
-                    ]),
-                    dbc.CardBody([
-                        dbc.Row([
-                            dbc.Col([
-                                html.H5(flight_date, className="card-title"),
-                                html.Div([
-                                    html.Span(flight_schedule.departure_airport, className="h4"),
-                                    html.Span(" → ", className="mx-2"),
-                                    html.Span(flight_schedule.arrival_airport, className="h4")
-                                ])
-                            ], width=6),
-                            dbc.Col([
-                                html.Div([
-                                    html.P([
-                                        html.Strong("Departure: "),
-                                        f"{departure_time} from Terminal {flight_schedule.departure_terminal or 'TBA'}"
-                                    ]),
-                                    html.P([
-                                        html.Strong("Arrival: "),
-                                        f"{arrival_time}"
-                                    ]),
-                                    html.P([
-                                        html.Strong("Status: "),
-                                        html.Span(
-                                            flight_schedule.status.value,
-                                            className=f"badge bg-{'success' if flight_schedule.status.value == 'Landed' else 'warning'}"
-                                        )
-                                    ])
-                                ])
-                            ], width=6)
-                        ]),
-                        html.Hr(),
-                        dbc.Row([
-                            dbc.Col([
-                                html.P([
-                                    html.Strong("Cost: "),
-                                    f"£{booking.cost_charged:.2f}"
-                                ])
-                            ], width=6),
-                            dbc.Col([
-                                # If already rated, show the rating, otherwise show "Rate your flight" button
-                                html.Div([
-                                    html.P([
-                                        html.Strong("Your Rating: "),
-                                        "★" * booking.rating.stars + "☆" * (5 - booking.rating.stars)
-                                    ]) if has_rating else dbc.Button(
-                                        "Rate Your Flight",
-                                        id={"type": "rate-flight-btn", "index": booking.id},
-                                        color="success",
-                                        className="w-100"
-                                    )
-                                ])
-                            ], width=6)
-                        ])
-                    ])
-                ], className="mb-3")
+            html.Div(booking_cards, id="past-bookings-list"),
+            dcc.Store(id="past-bookings-cursor", data=next_cursor),
+            dbc.Button(
+                "Load more",
+                id="past-bookings-load-more",
+                color="outline-primary",
+                className="w-100 mb-3",
+                style={"display": "block" if next_cursor else "none"}
             )
-        
-        return html.Div(booking_cards)
+        ])
         
     except Exception as e:
         return dbc.Alert(f"Error loading bookings: {str(e)}", color="danger")
 
+@callback(
+    [Output("past-bookings-list", "children"),
+     Output("past-bookings-cursor", "data"),
+     Output("past-bookings-load-more", "style")],
+    Input("past-bookings-load-more", "n_clicks"),
+    State("past-bookings-cursor", "data"),
+    prevent_initial_call=True
+)
+def load_more_past_bookings(n_clicks, cursor):
+    user_id = flask.session.get("user_id")
+    if not n_clicks or not cursor or not user_id:
+        return dash.no_update, dash.no_update, dash.no_update
+    
+    try:
+        session = get_session()
+        page, next_cursor = past_itineraries_page(session, user_id, before=decode_cursor(cursor))
+        booking_cards = [create_past_booking_card(itinerary) for itinerary in page]
+        next_cursor = encode_cursor(next_cursor)
+        
+        # Append to the cards already on the page instead of resending them
+        cards = dash.Patch()
+        cards.extend(booking_cards)
+        
+        return cards, next_cursor, {"display": "block" if next_cursor else "none"}
+        
+    except Exception as e:
+        print(f"Error loading more bookings: {e}")
+        return dash.no_update, dash.no_update, dash.no_update
+
 @callback(
     [Output("rating-modal", "is_open"),
      Output("rating-modal-content", "children"),
@@ -411,33 +452,22 @@ def submit_rating(n_clicks, booking_id, stars, comments, active_tab):
     session = get_session()
     
     try:
-        # Check if rating already exists
-        existing_rating = session.query(Rating).filter_by(booking_id=booking_id).first()
+        # Rating and the flight, route and aircraft aggregates are committed together
+        save_rating(session, booking_id, stars, comments)
+        session.commit()
+        audit(AuditCategory.BOOKING, "rating_submitted", target=booking_id, details={"stars": stars})
         
-        if existing_rating:
-            # Update existing rating
-            existing_rating.stars = stars
-            existing_rating.comments = comments
-        else:
-            # Create new rating
-            new_rating = Rating(
-                booking_id=booking_id,
-                stars=stars,
-                comments=comments
-            )
-            session.add(new_rating)
-            
-            # Update the booking to mark thank you as sent
-            booking = session.query(Booking).filter_by(id=booking_id).first()
-            if booking:
-                booking.thank_you_sent = True
+        # The rating shows on the user's history, so drop their cached itineraries
+        get_itinerary_cache().invalidate(flask.session.get("user_id"))
         
-        session.commit()
+        # Wake the outbox dispatcher; the thank-you message is sent in the background
+        get_outbox_dispatcher().notify()
         
         # Close rating modal, show thank you modal, and refresh past bookings
         return False, True, load_past_bookings(active_tab)
         
     except Exception as e:
+        session.rollback()
         return False, False, dbc.Alert(f"Error submitting rating: {str(e)}", color="danger")
 
 # Callback to close the rating modal without submitting
@@ -3,6 +3,7 @@ from dash import html, dcc, callback, Input, Output, State, dash_table
 import dash_bootstrap_components as dbc
 from src.utils.database import get_session
 from src.models.flight import Flight, FlightSchedule, FlightStatus
+from src.logic.pricing import get_price_table
 import pandas as pd
 from datetime import datetime, timedelta
 import flask
@@ -144,6 +145,9 @@ def search_flights(n_clicks, from_airport, to_airport, departure_date, num_passe
                 color="info"
             )
         
+        # Look up current fares for every result at once
+        fares = get_price_table().fares_for(session, [fs.id for fs in flight_schedules])
+        
         # Prepare data for table
         data = []
         for fs in flight_schedules:
@@ -153,7 +157,7 @@ def search_flights(n_clicks, from_airport, to_airport, departure_date, num_passe
             duration_str = f"{int(duration // 60)}h {int(duration % 60)}m"
             
             flight = fs.flight
-            cost = flight.base_cost * num_passengers
+            cost = fares.get(fs.id, flight.base_cost) * num_passengers
             
             data.append({
                 "flight_id": fs.id,
@@ -1,11 +1,8 @@
 import dash
 from dash import html, dcc, callback, Input, Output
 import dash_bootstrap_components as dbc
-from src.utils.database import get_session
-from src.models.booking import Booking
-from src.models.flight import FlightSchedule
+from src.logic.itinerary_cache import get_itinerary_cache
 import flask
-from datetime import datetime
 
 dash.register_page(__name__, path='/')
 
@@ -34,31 +31,20 @@ def update_home_content(login_status):
 def get_logged_in_content(user_id, user_name):
     """Content for logged-in users"""
     
-    # Get user's upcoming bookings
+    # Get user's upcoming and recent bookings in one query (cached per user)
     try:
-        session = get_session()
-        upcoming_bookings = session.query(Booking).join(
-            Booking.flight_schedule
-        ).filter(
-            Booking.passenger_id == user_id,
-            Booking.flight_schedule.has(
-                FlightSchedule.scheduled_departure_time > datetime.now()
-            )
-        ).order_by(
-            FlightSchedule.scheduled_departure_time.asc()
-        ).limit(3).all()
-        
-        recent_bookings = session.query(Booking).join(
-            Booking.flight_schedule
-        ).filter(
-            Booking.passenger_id == user_id
-        ).order_by(
-            Booking.booking_date.desc()
-        ).limit(3).all()
+        dashboard = get_itinerary_cache().home(user_id)
+        upcoming_bookings = dashboard.upcoming
+        recent_bookings = dashboard.recent
+        total_bookings = dashboard.total_bookings
+        upcoming_count = dashboard.upcoming_bookings
         
     except Exception as e:
+        print(f"Error loading home dashboard: {e}")
         upcoming_bookings = []
         recent_bookings = []
+        total_bookings = 0
+        upcoming_count = 0
     
     first_name = user_name.split()[0]
     
@@ -114,13 +100,20 @@ def get_logged_in_content(user_id, user_name):
                 dbc.CardBody([
                     html.P([
                         html.Strong("Total Bookings: "),
-                        str(len(recent_bookings))
+                        str(total_bookings)
                     ]),
                     html.P([
                         html.Strong("Upcoming Trips: "),
-                        str(len(upcoming_bookings))
+                        str(upcoming_count)
                     ]),
                     html.Hr(),
+                    html.H6("Recently Booked", className="mb-2"),
+                    html.Ul([
+                        html.Li([
+                            f"Flight {itinerary.flight_number} ",
+                            html.Small(f"({itinerary.confirmation_code})", className="text-muted")
+                        ]) for itinerary in recent_bookings
+                    ], className="small mb-3") if recent_bookings else html.P("No bookings yet", className="small text-muted"),
                     dbc.Button("Account Settings", color="outline-secondary", size="sm", href="/profile", className="w-100")
                 ])
             ], className="mb-4"),
@@ -138,37 +131,34 @@ def get_logged_in_content(user_id, user_name):
         ], width=4)
     ])
 
-def get_upcoming_flights_content(bookings):
+def get_upcoming_flights_content(itineraries):
     """Generate content for upcoming flights section"""
-    if not bookings:
+    if not itineraries:
         return dbc.Alert([
             "No upcoming flights. ",
             dbc.Button("Book a flight", color="primary", size="sm", href="/flights", className="ms-2")
         ], color="info")
     
     flight_cards = []
-    for booking in bookings:
-        flight_schedule = booking.flight_schedule
-        flight = flight_schedule.flight
-        
+    for itinerary in itineraries:
         # Format date and times
-        flight_date = flight_schedule.scheduled_departure_time.strftime("%a, %d %b")
-        departure_time = flight_schedule.scheduled_departure_time.strftime("%H:%M")
+        flight_date = itinerary.scheduled_departure_time.strftime("%a, %d %b")
+        departure_time = itinerary.scheduled_departure_time.strftime("%H:%M")
         
         flight_cards.append(
             dbc.Card([
                 dbc.CardBody([
                     dbc.Row([
                         dbc.Col([
-                            html.H6(f"Flight {flight.flight_number}", className="mb-1"),
-                            html.P(f"{flight_schedule.departure_airport} → {flight_schedule.arrival_airport}", 
+                            html.H6(f"Flight {itinerary.flight_number}", className="mb-1"),
+                            html.P(f"{itinerary.departure_airport} → {itinerary.arrival_airport}", 
                                    className="mb-1"),
                             html.Small(f"{flight_date} at {departure_time}", className="text-muted")
                         ], width=8),
                         dbc.Col([
                             html.Span(
-                                flight_schedule.status.value,
-                                className=f"badge bg-{'success' if flight_schedule.status.value == 'Scheduled' else 'warning'}"
+                                itinerary.status.value,
+                                className=f"badge bg-{'success' if itinerary.status.value == 'Scheduled' else 'warning'}"
                             )
                         ], width=4, className="text-end")
                     ])
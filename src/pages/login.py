@@ -4,6 +4,8 @@ import dash_bootstrap_components as dbc
 from werkzeug.security import check_password_hash
 from src.utils.database import get_session
 from src.models.user import User
+from src.logic.audit import audit
+from src.models.audit import AuditCategory
 import flask
 
 dash.register_page(__name__, path='/login')
@@ -96,6 +98,7 @@ def process_login(n_clicks, email, password):
         flask.session["user_id"] = user.id
         flask.session["user_email"] = user.email
         flask.session["user_name"] = user.full_name
+        audit(AuditCategory.AUTH, "login")
         
         # Create success message with redirect
         success_msg = html.Div([
@@ -105,4 +108,5 @@ def process_login(n_clicks, email, password):
         
         return success_msg, True
     else:
+        audit(AuditCategory.SECURITY, "login_failed", actor_id=user.id if user else None, actor=email)
         return dbc.Alert("Invalid email or password", color="danger"), False 
\ No newline at end of file
@@ -8,8 +8,18 @@ from src.models.user import User
 from src.models.flight import Flight, FlightSchedule, FlightStatus
 from src.models.aircraft import Aircraft
 from src.utils.components import protected_page, create_page_header, create_stats_card
-from src.utils.auth import get_user_display_info
-from sqlalchemy import func, text, case
+from src.utils.auth import get_user_display_info, is_technical_staff
+from src.logic.disruption import handle_schedule_cancellation
+from src.logic.pricing import get_price_table
+from src.logic.itinerary_cache import get_itinerary_cache, schedule_passenger_ids
+from src.logic.audit import audit
+from src.logic.schedules import RecurringSchedule, WEEKDAYS, DEFAULT_BLOCK_MINUTES, parse_departure_times, create_recurring_schedules, add_schedule
+from src.logic.aircraft_conflicts import ScheduleConflict, get_aircraft_schedule_index
+from src.utils.live_board import load_flight_board, create_flight_board
+from src.utils.report_views import cached_report
+from src.utils.data_tables import TableColumn, fetch_page, NUMBER
+from src.models.audit import AuditCategory
+from sqlalchemy import select, func, text, case, and_, bindparam, DateTime
 import string
 import random
 import flask
@@ -299,36 +309,55 @@ def load_create_flight_view():
         ])
     ])
 
+# Schedule counts per flight, aggregated in one GROUP BY; :now splits off the upcoming ones
+FLIGHT_SCHEDULE_COUNTS = select(
+    FlightSchedule.flight_id,
+    func.count(FlightSchedule.id).label("total"),
+    func.sum(case((and_(
+        FlightSchedule.scheduled_departure_time >= bindparam("now", type_=DateTime),
+        FlightSchedule.status != FlightStatus.CANCELLED
+    ), 1), else_=0)).label("upcoming"),
+    func.sum(case((FlightSchedule.status == FlightStatus.CANCELLED, 1), else_=0)).label("cancelled")
+).group_by(FlightSchedule.flight_id).subquery("schedule_counts")
+
+# View All Flights table columns, read straight from SQL so sorting, filtering and paging happen in the query
+FLIGHT_TABLE_KEY = TableColumn("ID", Flight.id, NUMBER)
+FLIGHT_TABLE_COLUMNS = [
+    FLIGHT_TABLE_KEY,
+    TableColumn("Flight Number", Flight.flight_number),
+    TableColumn("Aircraft", Aircraft.registration_number + " (" + Aircraft.model_number + ")"),
+    TableColumn("Base Cost", Flight.base_cost, NUMBER, format=lambda value: f"£{value:.2f}"),
+    TableColumn("Schedules", func.coalesce(FLIGHT_SCHEDULE_COUNTS.c.total, 0), NUMBER),
+    TableColumn("Upcoming", func.coalesce(FLIGHT_SCHEDULE_COUNTS.c.upcoming, 0), NUMBER),
+    TableColumn("Cancelled", func.coalesce(FLIGHT_SCHEDULE_COUNTS.c.cancelled, 0), NUMBER),
+]
+FLIGHT_TABLE_PAGE_SIZE = 20
+
+def flight_catalog_query(session):
+    """Flights with their aircraft and schedule counts, as one statement"""
+    return session.query(Flight).join(
+        Aircraft, Flight.aircraft_id == Aircraft.id
+    ).outerjoin(
+        FLIGHT_SCHEDULE_COUNTS, FLIGHT_SCHEDULE_COUNTS.c.flight_id == Flight.id
+    ).params(now=datetime.now())
+
 def load_view_flights_view():
     """Load the view flights table"""
     session = get_session()
     try:
-        # Get all flights with aircraft information
-        flights = session.query(Flight).join(Aircraft).all()
-        
-        flight_data = []
-        for flight in flights:
-            # Get schedule count for this flight
-            schedule_count = session.query(FlightSchedule).filter_by(flight_id=flight.id).count()
-            
-            flight_data.append({
-                "ID": flight.id,
-                "Flight Number": flight.flight_number,
-                "Aircraft": f"{flight.aircraft.registration_number} ({flight.aircraft.model_number})",
-                "Base Cost": f"£{flight.base_cost:.2f}",
-                "Schedules": schedule_count,
-                "Created": flight.created_at.strftime("%Y-%m-%d") if flight.created_at else "N/A"
-            })
-        
-        df = pd.DataFrame(flight_data)
+        # Only the first page is read here; the table asks for the rest as it is paged, sorted and filtered
+        records, page_count, table_state = fetch_page(
+            flight_catalog_query(session), FLIGHT_TABLE_COLUMNS, FLIGHT_TABLE_KEY,
+            0, FLIGHT_TABLE_PAGE_SIZE, [], ""
+        )
         
     except Exception as e:
         print(f"Error loading flights: {e}")
-        df = pd.DataFrame()
+        records = []
     finally:
         session.close()
     
-    if df.empty:
+    if not records:
         return html.Div([
             dbc.Alert("No flights found. Create your first flight!", color="info")
         ])
@@ -345,20 +374,54 @@ def load_view_flights_view():
                 ], color="info", className="mb-3"),
                 
                 dash_table.DataTable(
-                    id="flights-table",
-                    data=df.to_dict("records"),
-                    columns=[{"name": col, "id": col} for col in df.columns],
-                    sort_action="native",
-                    filter_action="native",
-                    page_action="native",
-                    page_size=20,
+                    id="staff-flights-table",
+                    data=records,
+                    columns=[column.datatable_column() for column in FLIGHT_TABLE_COLUMNS],
+                    sort_action="custom",
+                    sort_mode="multi",
+                    sort_by=[],
+                    filter_action="custom",
+                    filter_query="",
+                    page_action="custom",
+                    page_current=0,
+                    page_size=FLIGHT_TABLE_PAGE_SIZE,
+                    page_count=page_count,
                     style_cell={"textAlign": "left"},
                     style_header={"backgroundColor": "rgb(230, 230, 230)", "fontWeight": "bold"}
-                )
+                ),
+                dcc.Store(id="staff-flights-table-state", data=table_state)
             ])
         ])
     ])
 
+@callback(
+    [Output("staff-flights-table", "data"),
+     Output("staff-flights-table", "page_count"),
+     Output("staff-flights-table-state", "data")],
+    [Input("staff-flights-table", "page_current"),
+     Input("staff-flights-table", "page_size"),
+     Input("staff-flights-table", "sort_by"),
+     Input("staff-flights-table", "filter_query")],
+    State("staff-flights-table-state", "data"),
+    prevent_initial_call=True
+)
+def page_flights_table(page_current, page_size, sort_by, filter_query, table_state):
+    """Read just the requested page of flights"""
+    if not is_technical_staff():
+        return dash.no_update, dash.no_update, dash.no_update
+    
+    session = get_session()
+    try:
+        return fetch_page(
+            flight_catalog_query(session), FLIGHT_TABLE_COLUMNS, FLIGHT_TABLE_KEY,
+            page_current, page_size, sort_by, filter_query, table_state
+        )
+    except Exception as e:
+        print(f"Error paging flights: {e}")
+        return dash.no_update, dash.no_update, dash.no_update
+    finally:
+        session.close()
+
 def load_create_schedule_view():
     """Load the create schedule form"""
     session = get_session()
@@ -498,7 +561,125 @@ def load_create_schedule_view():
                 
                 html.Div(id="create-schedule-output", className="mt-3")
             ])
-        ])
+        ]),
+        
+        dbc.Card([
+            dbc.CardHeader([
+                html.H5("🔁 Create Recurring Schedule", className="mb-0")
+            ]),
+            dbc.CardBody([
+                dbc.Alert(
+                    "Creates a departure at each time on every selected weekday between the two dates, "
+                    "for example a whole season's timetable in one go. All departures are checked first and "
+                    "nothing is created if any of them is invalid.",
+                    color="light"
+                ),
+                dbc.Form([
+                    dbc.Row([
+                        dbc.Col([
+                            dbc.Label("Select Flight"),
+                            dcc.Dropdown(
+                                id="recurring-schedule-flight",
+                                options=flight_options,
+                                placeholder="Select flight",
+                                clearable=False
+                            )
+                        ], md=12)
+                    ], className="mb-3"),
+                    
+                    dbc.Row([
+                        dbc.Col([
+                            dbc.Label("Origin Airport"),
+                            dcc.Dropdown(
+                                id="recurring-schedule-origin",
+                                options=uk_airports,
+                                placeholder="Select origin",
+                                clearable=False
+                            )
+                        ], md=6),
+                        dbc.Col([
+                            dbc.Label("Destination Airport"),
+                            dcc.Dropdown(
+                                id="recurring-schedule-destination",
+                                options=uk_airports,
+                                placeholder="Select destination",
+                                clearable=False
+                            )
+                        ], md=6)
+                    ], className="mb-3"),
+                    
+                    dbc.Row([
+                        dbc.Col([
+                            dbc.Label("First Date"),
+                            dbc.Input(
+                                type="date",
+                                id="recurring-schedule-start",
+                                min=datetime.now().strftime("%Y-%m-%d"),
+                                required=True
+                            )
+                        ], md=6),
+                        dbc.Col([
+                            dbc.Label("Last Date"),
+                            dbc.Input(
+                                type="date",
+                                id="recurring-schedule-end",
+                                min=datetime.now().strftime("%Y-%m-%d"),
+                                required=True
+                            )
+                        ], md=6)
+                    ], className="mb-3"),
+                    
+                    dbc.Row([
+                        dbc.Col([
+                            dbc.Label("Days of Week"),
+                            dbc.Checklist(
+                                id="recurring-schedule-weekdays",
+                                options=[{"label": name, "value": day} for day, name in enumerate(WEEKDAYS)],
+                                value=list(range(len(WEEKDAYS))),
+                                inline=True
+                            )
+                        ], md=12)
+                    ], className="mb-3"),
+                    
+                    dbc.Row([
+                        dbc.Col([
+                            dbc.Label("Departure Times"),
+                            dbc.Input(
+                                type="text",
+                                id="recurring-schedule-times",
+                                placeholder="e.g., 07:00, 13:30"
+                            )
+                        ], md=4),
+                        dbc.Col([
+                            dbc.Label("Block Time (minutes)"),
+                            dbc.Input(
+                                type="number",
+                                id="recurring-schedule-block",
+                                value=DEFAULT_BLOCK_MINUTES,
+                                min=1
+                            )
+                        ], md=4),
+                        dbc.Col([
+                            dbc.Label("Gate (Optional)"),
+                            dbc.Input(
+                                type="text",
+                                id="recurring-schedule-gate",
+                                placeholder="e.g., A12"
+                            )
+                        ], md=4)
+                    ], className="mb-4"),
+                    
+                    dbc.Button(
+                        "Create Recurring Schedule",
+                        id="submit-recurring-schedule",
+                        color="success",
+                        size="lg"
+                    )
+                ]),
+                
+                html.Div(id="recurring-schedule-output", className="mt-3")
+            ])
+        ], className="mt-4")
     ])
 
 def load_view_schedules_view():
@@ -551,6 +732,8 @@ def load_view_schedules_view():
                     filter_action="native",
                     page_action="native",
                     page_size=20,
+                    row_selectable="single",
+                    selected_rows=[],
                     style_cell={"textAlign": "left"},
                     style_header={"backgroundColor": "rgb(230, 230, 230)", "fontWeight": "bold"},
                     style_data_conditional=[
@@ -565,35 +748,92 @@ def load_view_schedules_view():
                             "color": "black",
                         }
                     ]
-                )
+                ),
+                
+                # Status update for the selected schedule
+                html.Hr(),
+                html.H6("Update Selected Schedule", className="mb-3"),
+                dbc.Row([
+                    dbc.Col([
+                        dbc.Label("New Status"),
+                        dcc.Dropdown(
+                            id="update-schedule-status",
+                            options=[{"label": status.value, "value": status.name} for status in FlightStatus],
+                            placeholder="Select status",
+                            clearable=False
+                        )
+                    ], md=4),
+                    dbc.Col([
+                        dbc.Label("Gate (Optional)"),
+                        dbc.Input(
+                            type="text",
+                            id="update-schedule-gate",
+                            placeholder="e.g., A12"
+                        )
+                    ], md=4),
+                    dbc.Col([
+                        dbc.Checkbox(
+                            id="update-schedule-rebook",
+                            label="Rebook passengers if cancelled",
+                            value=True,
+                            className="mt-4"
+                        )
+                    ], md=4)
+                ], className="mb-3"),
+                dbc.Button("Update Schedule", id="submit-update-schedule", color="warning"),
+                html.Div(id="update-schedule-output", className="mt-3")
             ])
         ])
     ])
 
+# Upcoming, not cancelled schedules per aircraft, counted in one pass over the schedules
+AIRCRAFT_UPCOMING_SCHEDULES = select(
+    Flight.aircraft_id,
+    func.count(FlightSchedule.id).label("upcoming"),
+    func.min(FlightSchedule.scheduled_departure_time).label("next_departure")
+).join(
+    FlightSchedule, FlightSchedule.flight_id == Flight.id
+).where(
+    FlightSchedule.scheduled_departure_time >= bindparam("now", type_=DateTime),
+    FlightSchedule.status != FlightStatus.CANCELLED
+).group_by(Flight.aircraft_id).subquery("aircraft_upcoming")
+
+def fleet_status_query(session):
+    """Every aircraft with its typed specifications and upcoming schedules, as one statement"""
+    return session.query(
+        Aircraft.registration_number,
+        Aircraft.model_number,
+        Aircraft.manufacturer,
+        Aircraft.aircraft_class,
+        Aircraft.capacity,
+        Aircraft.range_km,
+        Aircraft.max_altitude_ft,
+        func.coalesce(AIRCRAFT_UPCOMING_SCHEDULES.c.upcoming, 0).label("upcoming"),
+        AIRCRAFT_UPCOMING_SCHEDULES.c.next_departure
+    ).outerjoin(
+        AIRCRAFT_UPCOMING_SCHEDULES, AIRCRAFT_UPCOMING_SCHEDULES.c.aircraft_id == Aircraft.id
+    ).order_by(Aircraft.registration_number).params(now=datetime.now())
+
 def load_aircraft_status_view():
     """Load aircraft status overview"""
     session = get_session()
     try:
-        # Get all aircraft with their current status
-        aircraft = session.query(Aircraft).all()
-        
-        aircraft_data = []
-        for ac in aircraft:
-            # Count scheduled flights for this aircraft
-            scheduled_flights = session.query(FlightSchedule).join(Flight).filter(
-                Flight.aircraft_id == ac.id,
-                FlightSchedule.scheduled_departure_time >= datetime.now()
-            ).count()
-            
-            aircraft_data.append({
-                "Registration": ac.registration_number,
-                "Model": ac.model_number,
-                "Manufacturer": ac.manufacturer,
-                "Class": ac.aircraft_class,
-                "Capacity": ac.aip_info.split("Capacity: ")[-1].split(" passengers")[0] if "Capacity:" in ac.aip_info else "N/A",
-                "Upcoming Flights": scheduled_flights,
-                "Status": "Active" if scheduled_flights > 0 else "Available"
-            })
+        # One grouped query for the whole fleet, however many aircraft there are
+        aircraft_data = [
+            {
+                "Registration": row.registration_number,
+                "Model": row.model_number,
+                "Manufacturer": row.manufacturer,
+                "Class": row.aircraft_class,
+                "Capacity": row.capacity,
+                "Range (km)": row.range_km,
+                "Max Altitude (ft)": row.max_altitude_ft,
+                "Upcoming Flights": row.upcoming,
+                "Next Departure": row.next_departure.strftime("%Y-%m-%d %H:%M") if row.next_departure else "",
+                "Status": "Active" if row.upcoming > 0 else "Available"
+            }
+            for row in fleet_status_query(session)
+        ]
         
         df = pd.DataFrame(aircraft_data)
         
@@ -603,6 +843,8 @@ def load_aircraft_status_view():
     finally:
         session.close()
     
+    numeric_columns = {"Capacity", "Range (km)", "Max Altitude (ft)", "Upcoming Flights"}
+    
     return html.Div([
         dbc.Card([
             dbc.CardHeader([
@@ -611,7 +853,10 @@ def load_aircraft_status_view():
             dbc.CardBody([
                 dash_table.DataTable(
                     data=df.to_dict("records") if not df.empty else [],
-                    columns=[{"name": col, "id": col} for col in df.columns] if not df.empty else [],
+                    columns=[
+                        {"name": col, "id": col, "type": "numeric" if col in numeric_columns else "text"}
+                        for col in df.columns
+                    ] if not df.empty else [],
                     sort_action="native",
                     filter_action="native",
                     page_action="native",
@@ -642,30 +887,12 @@ def load_daily_operations_view():
     """Load daily operations overview"""
     session = get_session()
     try:
-        today = datetime.now().date()
-        
-        # Today's flights
-        today_flights = session.query(FlightSchedule).filter(
-            func.date(FlightSchedule.scheduled_departure_time) == today
-        ).join(Flight).all()
-        
-        # Create operations summary
-        ops_data = []
-        for schedule in today_flights:
-            ops_data.append({
-                "Time": schedule.scheduled_departure_time.strftime("%H:%M"),
-                "Flight": schedule.flight.flight_number,
-                "Route": f"{schedule.departure_airport} → {schedule.arrival_airport}",
-                "Aircraft": schedule.flight.aircraft.registration_number,
-                "Status": schedule.status.value if schedule.status else "Scheduled",
-                "Gate": schedule.departure_gate or "TBA"
-            })
-        
-        df = pd.DataFrame(ops_data)
+        # Today's flights; the board then follows status and gate changes as they happen
+        board, board_state = load_flight_board(session, datetime.now().date())
         
     except Exception as e:
         print(f"Error loading daily operations: {e}")
-        df = pd.DataFrame()
+        board, board_state = [], None
     finally:
         session.close()
     
@@ -675,94 +902,79 @@ def load_daily_operations_view():
                 html.H5(f"📊 Daily Operations - {datetime.now().strftime('%Y-%m-%d')}", className="mb-0")
             ]),
             dbc.CardBody([
-                dash_table.DataTable(
-                    data=df.to_dict("records") if not df.empty else [],
-                    columns=[{"name": col, "id": col} for col in df.columns] if not df.empty else [],
-                    sort_action="native",
-                    page_size=20,
-                    style_cell={"textAlign": "left"},
-                    style_header={"backgroundColor": "rgb(230, 230, 230)", "fontWeight": "bold"}
-                ) if not df.empty else dbc.Alert("No flights scheduled for today", color="info")
+                create_flight_board("staff-daily-operations", board, board_state, page_size=20)
+                if board else dbc.Alert("No flights scheduled for today", color="info")
             ])
         ])
     ])
 
-def load_performance_reports_view():
-    """Load performance reports with comprehensive flight analytics"""
-    session = get_session()
-    try:
-        # COMPLEX QUERY 2: Comprehensive Flight Performance Analysis
-        # This uses multiple joins, subqueries, conditional aggregations, and performance metrics
-        performance_analysis = session.execute(text("""
-            SELECT 
-                f.flight_number,
-                fs.departure_airport as origin,
-                fs.arrival_airport as destination,
-                a.registration_number as aircraft,
-                a.model_number,
-                COUNT(fs.id) as total_schedules,
-                SUM(CASE WHEN fs.status = 'SCHEDULED' THEN 1 ELSE 0 END) as scheduled_flights,
-                SUM(CASE WHEN fs.status = 'DELAYED' THEN 1 ELSE 0 END) as delayed_flights,
-                SUM(CASE WHEN fs.status = 'CANCELLED' THEN 1 ELSE 0 END) as cancelled_flights,
-                ROUND(
-                    (SUM(CASE WHEN fs.status = 'SCHEDULED' THEN 1 ELSE 0 END) * 100.0) / 
-                    COUNT(fs.id), 2
-                ) as on_time_percentage,
-                COUNT(b.id) as total_bookings,
-                COALESCE(SUM(b.cost_charged), 0) as total_revenue,
-                ROUND(AVG(b.cost_charged), 2) as avg_booking_value,
-                ROUND(
-                    (COUNT(b.id) * 100.0) / 
-                    NULLIF(COUNT(fs.id), 0), 2
-                ) as load_factor_percentage,
-                MIN(fs.scheduled_departure_time) as first_flight,
-                MAX(fs.scheduled_departure_time) as last_flight
-            FROM flights f
-            JOIN aircraft a ON f.aircraft_id = a.id
-            LEFT JOIN flight_schedules fs ON f.id = fs.flight_id
-            LEFT JOIN bookings b ON fs.id = b.flight_schedule_id
-            WHERE fs.scheduled_departure_time >= DATE('now', '-90 days')
-            GROUP BY f.id, f.flight_number, fs.departure_airport, fs.arrival_airport, a.registration_number, a.model_number
-            HAVING COUNT(fs.id) > 0
-            ORDER BY on_time_percentage DESC, total_revenue DESC
-        """)).fetchall()
-        
-        # Aircraft efficiency analysis with subqueries
-        aircraft_efficiency = session.execute(text("""
-            SELECT 
-                a.registration_number,
-                a.model_number,
-                a.manufacturer,
-                COUNT(DISTINCT f.id) as routes_operated,
-                COUNT(fs.id) as total_flights,
-                AVG(
-                    CASE 
-                        WHEN fs.status = 'SCHEDULED' THEN 1.0
-                        WHEN fs.status = 'DELAYED' THEN 0.7
-                        ELSE 0.0
-                    END
-                ) as efficiency_score,
-                SUM(b.cost_charged) as revenue_generated,
-                COUNT(b.id) as passengers_carried,
-                ROUND(
-                    SUM(b.cost_charged) / NULLIF(COUNT(fs.id), 0), 2
-                ) as revenue_per_flight
-            FROM aircraft a
-            LEFT JOIN flights f ON a.id = f.aircraft_id
-            LEFT JOIN flight_schedules fs ON f.id = fs.flight_id
-            LEFT JOIN bookings b ON fs.id = b.flight_schedule_id
-            WHERE fs.scheduled_departure_time >= DATE('now', '-90 days')
-            GROUP BY a.id, a.registration_number, a.model_number, a.manufacturer
-            HAVING COUNT(fs.id) > 0
-            ORDER BY efficiency_score DESC, revenue_generated DESC
-        """)).fetchall()
-        
-    except Exception as e:
-        print(f"Error loading performance reports: {e}")
-        performance_analysis = []
-        aircraft_efficiency = []
-    finally:
-        session.close()
+def build_performance_reports(session):
+    """Route and aircraft performance over the last 90 days"""
+    # COMPLEX QUERY 2: Comprehensive Flight Performance Analysis
+    # This uses multiple joins, subqueries, conditional aggregations, and performance metrics
+    performance_analysis = session.execute(text("""
+        SELECT 
+            f.flight_number,
+            fs.departure_airport as origin,
+            fs.arrival_airport as destination,
+            a.registration_number as aircraft,
+            a.model_number,
+            COUNT(fs.id) as total_schedules,
+            SUM(CASE WHEN fs.status = 'SCHEDULED' THEN 1 ELSE 0 END) as scheduled_flights,
+            SUM(CASE WHEN fs.status = 'DELAYED' THEN 1 ELSE 0 END) as delayed_flights,
+            SUM(CASE WHEN fs.status = 'CANCELLED' THEN 1 ELSE 0 END) as cancelled_flights,
+            ROUND(
+                (SUM(CASE WHEN fs.status = 'SCHEDULED' THEN 1 ELSE 0 END) * 100.0) / 
+                COUNT(fs.id), 2
+            ) as on_time_percentage,
+            COUNT(b.id) as total_bookings,
+            COALESCE(SUM(b.cost_charged), 0) as total_revenue,
+            ROUND(AVG(b.cost_charged), 2) as avg_booking_value,
+            ROUND(
+                (COUNT(b.id) * 100.0) / 
+                NULLIF(COUNT(fs.id), 0), 2
+            ) as load_factor_percentage,
+            MIN(fs.scheduled_departure_time) as first_flight,
+            MAX(fs.scheduled_departure_time) as last_flight
+        FROM flights f
+        JOIN aircraft a ON f.aircraft_id = a.id
+        LEFT JOIN flight_schedules fs ON f.id = fs.flight_id
+        LEFT JOIN bookings b ON fs.id = b.flight_schedule_id
+        WHERE fs.scheduled_departure_time >= DATE('now', '-90 days')
+        GROUP BY f.id, f.flight_number, fs.departure_airport, fs.arrival_airport, a.registration_number, a.model_number
+        HAVING COUNT(fs.id) > 0
+        ORDER BY on_time_percentage DESC, total_revenue DESC
+    """)).fetchall()
+    
+    # Aircraft efficiency analysis with subqueries
+    aircraft_efficiency = session.execute(text("""
+        SELECT 
+            a.registration_number,
+            a.model_number,
+            a.manufacturer,
+            COUNT(DISTINCT f.id) as routes_operated,
+            COUNT(fs.id) as total_flights,
+            AVG(
+                CASE 
+                    WHEN fs.status = 'SCHEDULED' THEN 1.0
+                    WHEN fs.status = 'DELAYED' THEN 0.7
+                    ELSE 0.0
+                END
+            ) as efficiency_score,
+            SUM(b.cost_charged) as revenue_generated,
+            COUNT(b.id) as passengers_carried,
+            ROUND(
+                SUM(b.cost_charged) / NULLIF(COUNT(fs.id), 0), 2
+            ) as revenue_per_flight
+        FROM aircraft a
+        LEFT JOIN flights f ON a.id = f.aircraft_id
+        LEFT JOIN flight_schedules fs ON f.id = fs.flight_id
+        LEFT JOIN bookings b ON fs.id = b.flight_schedule_id
+        WHERE fs.scheduled_departure_time >= DATE('now', '-90 days')
+        GROUP BY a.id, a.registration_number, a.model_number, a.manufacturer
+        HAVING COUNT(fs.id) > 0
+        ORDER BY efficiency_score DESC, revenue_generated DESC
+    """)).fetchall()
     
     # Create flight performance data
     performance_data = []
@@ -797,6 +1009,18 @@ def load_performance_reports_view():
     
     efficiency_df = pd.DataFrame(efficiency_data)
     
+    return {
+        "performance": performance_df,
+        "efficiency": efficiency_df
+    }
+
+@cached_report("performance-reports", build_performance_reports,
+               tables=("aircraft", "flights", "flight_schedules", "bookings"), role="technical_staff")
+def load_performance_reports_view(report):
+    """Load performance reports with comprehensive flight analytics"""
+    performance_df = report["performance"]
+    efficiency_df = report["efficiency"]
+    
     return html.Div([
         dbc.Card([
             dbc.CardHeader([
@@ -905,6 +1129,9 @@ def create_flight(n_clicks, flight_number, aircraft_id, cost):
         
         session.add(new_flight)
         session.commit()
+        audit(AuditCategory.ADMIN, "flight_created", target=new_flight.flight_number, details={
+            "flight_id": new_flight.id, "aircraft_id": aircraft_id, "base_cost": float(cost)
+        })
         
         return dbc.Alert([
             html.H6("✅ Flight Created Successfully!", className="mb-2"),
@@ -966,8 +1193,12 @@ def create_schedule(n_clicks, flight_id, origin, destination, departure_date, de
             arrival_airport=destination
         )
         
-        session.add(new_schedule)
-        session.commit()
+        # Rejected if the flight's aircraft is already flying or turning around then
+        schedule_id = add_schedule(session, new_schedule)
+        audit(AuditCategory.ADMIN, "schedule_created", target=flight.flight_number, details={
+            "schedule_id": schedule_id, "route": f"{origin}-{destination}",
+            "departure": departure_datetime.isoformat()
+        })
         
         return dbc.Alert([
             html.H6("✅ Schedule Created Successfully!", className="mb-2"),
@@ -976,10 +1207,163 @@ def create_schedule(n_clicks, flight_id, origin, destination, departure_date, de
             html.P(f"Departure: {departure_date} at {departure_time}", className="mb-0")
         ], color="success")
         
+    except ScheduleConflict as e:
+        return dbc.Alert([
+            html.H6("Schedule Not Created", className="mb-2"),
+            html.P(str(e), className="mb-0")
+        ], color="danger")
     except ValueError as e:
         return dbc.Alert("Invalid date or time format", color="danger")
     except Exception as e:
         session.rollback()
         return dbc.Alert(f"Error creating schedule: {str(e)}", color="danger")
     finally:
-        session.close() 
\ No newline at end of file
+        session.close()
+
+# Callback for creating a recurring schedule
+@callback(
+    Output("recurring-schedule-output", "children"),
+    Input("submit-recurring-schedule", "n_clicks"),
+    [State("recurring-schedule-flight", "value"),
+     State("recurring-schedule-origin", "value"),
+     State("recurring-schedule-destination", "value"),
+     State("recurring-schedule-start", "value"),
+     State("recurring-schedule-end", "value"),
+     State("recurring-schedule-weekdays", "value"),
+     State("recurring-schedule-times", "value"),
+     State("recurring-schedule-block", "value"),
+     State("recurring-schedule-gate", "value")],
+    prevent_initial_call=True
+)
+def create_recurring_schedule(n_clicks, flight_id, origin, destination, start_date, end_date, weekdays,
+                              departure_times, block_minutes, gate):
+    if not is_technical_staff():
+        return dbc.Alert("Access denied", color="danger")
+    if not all([flight_id, origin, destination, start_date, end_date, departure_times, block_minutes]):
+        return dbc.Alert("Please fill in all required fields", color="danger")
+    
+    session = get_session()
+    try:
+        pattern = RecurringSchedule(
+            flight_id=flight_id,
+            origin=origin,
+            destination=destination,
+            departure_times=parse_departure_times(departure_times),
+            weekdays=weekdays or [],
+            start_date=datetime.strptime(start_date, "%Y-%m-%d").date(),
+            end_date=datetime.strptime(end_date, "%Y-%m-%d").date(),
+            block_minutes=int(block_minutes),
+            gate=gate if gate else None
+        )
+        flight, created = create_recurring_schedules(session, pattern)
+        audit(AuditCategory.ADMIN, "recurring_schedule_created", target=flight.flight_number, details={
+            "route": f"{origin}-{destination}", "schedules": created,
+            "from": start_date, "to": end_date,
+            "weekdays": [WEEKDAYS[day] for day in sorted(pattern.weekdays)],
+            "times": [departure_time.strftime("%H:%M") for departure_time in pattern.departure_times]
+        })
+        
+        return dbc.Alert([
+            html.H6("✅ Recurring Schedule Created!", className="mb-2"),
+            html.P(f"{created} schedules created for flight {flight.flight_number}"),
+            html.P(f"Route: {origin} → {destination}"),
+            html.P(f"From {start_date} to {end_date}", className="mb-0")
+        ], color="success")
+        
+    except ValueError as e:
+        return dbc.Alert(str(e), color="danger")
+    except Exception as e:
+        print(f"Error creating recurring schedule: {e}")
+        return dbc.Alert(f"Error creating schedules: {str(e)}", color="danger")
+    finally:
+        session.close()
+
+# Callback for updating a schedule's status and gate
+@callback(
+    Output("update-schedule-output", "children"),
+    Input("submit-update-schedule", "n_clicks"),
+    [State("schedules-table", "selected_rows"),
+     State("schedules-table", "data"),
+     State("update-schedule-status", "value"),
+     State("update-schedule-gate", "value"),
+     State("update-schedule-rebook", "value")],
+    prevent_initial_call=True
+)
+def update_schedule_status(n_clicks, selected_rows, table_data, status, gate, rebook):
+    if not is_technical_staff():
+        return dbc.Alert("Access denied", color="danger")
+    if not selected_rows:
+        return dbc.Alert("Please select a schedule in the table", color="danger")
+    if not status and not gate:
+        return dbc.Alert("Please choose a new status or gate", color="danger")
+    
+    schedule_id = table_data[selected_rows[0]]["ID"]
+    
+    session = get_session()
+    try:
+        schedule = session.query(FlightSchedule).filter_by(id=schedule_id).first()
+        if not schedule:
+            return dbc.Alert("Schedule not found", color="danger")
+        
+        was_cancelled = schedule.status == FlightStatus.CANCELLED
+        previous_status = schedule.status
+        
+        # Everyone booked on the schedule sees the change, so note them before bookings move
+        affected_users = schedule_passenger_ids(session, schedule_id)
+        if status:
+            schedule.status = FlightStatus[status]
+        if gate:
+            schedule.departure_gate = gate
+        is_cancelled = schedule.status == FlightStatus.CANCELLED
+        
+        aircraft_index = get_aircraft_schedule_index()
+        with aircraft_index.lock:
+            # A reinstated schedule takes its aircraft's time again, so it must still be free
+            if was_cancelled and not is_cancelled:
+                slot = (schedule.scheduled_departure_time, schedule.scheduled_arrival_time)
+                aircraft_id = schedule.flight.aircraft_id
+                aircraft_index.check(session, {aircraft_id: [slot]})
+            
+            # Cancelling a schedule rebooks or refunds everyone booked on it
+            disruption = None
+            if is_cancelled and not was_cancelled:
+                disruption = handle_schedule_cancellation(session, schedule, rebook=bool(rebook))
+            
+            session.commit()
+            if was_cancelled and not is_cancelled:
+                aircraft_index.add(aircraft_id, [(*slot, schedule_id)])
+            elif is_cancelled and not was_cancelled:
+                aircraft_index.discard([schedule_id])
+        get_itinerary_cache().invalidate_users(affected_users)
+        
+        details = {"schedule_id": schedule_id, "from": previous_status.value, "to": schedule.status.value}
+        if gate:
+            details["gate"] = gate
+        if disruption is not None:
+            details.update(rebooked=disruption.total_rebooked, refunded=disruption.refunded)
+        audit(AuditCategory.ADMIN, "schedule_status_changed", target=schedule.flight.flight_number, details=details)
+        
+        # A cancelled schedule is off sale, and rebooked passengers fill up later ones
+        if disruption is not None:
+            price_table = get_price_table()
+            price_table.discard([schedule_id])
+            price_table.record_bookings(disruption.rebooked)
+        
+        message = [html.H6("✅ Schedule Updated", className="mb-2"),
+                   html.P(f"Schedule {schedule_id} is now {schedule.status.value}", className="mb-0")]
+        if disruption is not None:
+            message.append(html.P(
+                f"{disruption.total_rebooked} booking(s) moved to "
+                f"{len(disruption.rebooked)} later flight(s), {disruption.refunded} refunded.",
+                className="mb-0 mt-2"
+            ))
+        return dbc.Alert(message, color="success")
+        
+    except ScheduleConflict as e:
+        session.rollback()
+        return dbc.Alert(f"Schedule {schedule_id} cannot be reinstated: {str(e)}", color="danger")
+    except Exception as e:
+        session.rollback()
+        return dbc.Alert(f"Error updating schedule: {str(e)}", color="danger")
+    finally:
+        session.close()
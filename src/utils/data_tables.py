@@ -0,0 +1,228 @@
+import datetime
+import math
+import re
+from sqlalchemy import String, func, and_, or_, type_coerce
+
+# Column kinds, which decide how filter values are read and how the
+# DataTable column is typed
+TEXT = "text"
+NUMBER = "number"
+DATETIME = "datetime"
+ENUM = "enum"
+
+DATATABLE_TYPES = {TEXT: "text", NUMBER: "numeric", DATETIME: "datetime", ENUM: "text"}
+
+# One term of a Dash filter query, e.g. {Price} >= 100 or {Passenger} icontains "smith".
+# The optional i/s prefix asks for a case-insensitive or case-sensitive match.
+FILTER_TERM = re.compile(
+    r"^\{(?P<column>[^}]+)\}\s*"
+    r"(?P<case>[is]?)(?P<operator>contains|datestartswith|>=|<=|!=|=|>|<|eq|ne|ge|le|gt|lt)\s*"
+    r"(?P<value>.*)$",
+    re.IGNORECASE
+)
+
+OPERATOR_ALIASES = {"eq": "=", "ne": "!=", "ge": ">=", "le": "<=", "gt": ">", "lt": "<"}
+
+class TableColumn:
+    """A DataTable column backed by a SQL expression"""
+    __slots__ = ("id", "expression", "kind", "enum", "format")
+
+    def __init__(self, id, expression, kind=TEXT, enum=None, format=None):
+        self.id = id
+        self.expression = expression
+        self.kind = kind
+        self.enum = enum
+        self.format = format
+
+    def display(self, value):
+        if value is None:
+            return ""
+        if self.format is not None:
+            return self.format(value)
+        if self.kind == ENUM:
+            return value.value
+        return value
+
+    def to_json(self, value):
+        """A sort key value as stored in the browser"""
+        if isinstance(value, datetime.datetime):
+            return value.isoformat()
+        if self.kind == ENUM and value is not None:
+            return value.name
+        return value
+
+    def from_json(self, value):
+        if value is None:
+            return None
+        if self.kind == DATETIME:
+            return datetime.datetime.fromisoformat(value)
+        if self.kind == ENUM:
+            return self.enum[value]
+        return value
+
+    def datatable_column(self):
+        return {"name": self.id, "id": self.id, "type": DATATABLE_TYPES[self.kind]}
+
+def split_filter_query(filter_query):
+    """Break a Dash filter query into (column, case, operator, value) terms"""
+    terms = []
+    for part in (filter_query or "").split(" && "):
+        match = FILTER_TERM.match(part.strip())
+        if not match:
+            continue
+        operator = match.group("operator").lower()
+        value = match.group("value").strip()
+        # Quoted values may contain escaped quotes of the same kind
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"`":
+            value = value[1:-1].replace("\\" + value[0], value[0])
+        terms.append((
+            match.group("column"),
+            match.group("case").lower(),
+            OPERATOR_ALIASES.get(operator, operator),
+            value
+        ))
+    return terms
+
+def _compare(expression, operator, value):
+    if operator == "=":
+        return expression == value
+    if operator == "!=":
+        return expression != value
+    if operator == ">=":
+        return expression >= value
+    if operator == "<=":
+        return expression <= value
+    if operator == ">":
+        return expression > value
+    return expression < value
+
+def _filter_condition(column, case, operator, value):
+    """SQL condition for one filter term, or None if the term does not apply to the column"""
+    expression = column.expression
+
+    if column.kind == ENUM:
+        # Match against the displayed values, then filter on the stored names
+        needle = value.lower()
+        if operator == "contains":
+            members = [member for member in column.enum if needle in member.value.lower()]
+        elif operator in ("=", "!="):
+            members = [member for member in column.enum if member.value.lower() == needle]
+        else:
+            return None
+        condition = expression.in_(members)
+        return ~condition if operator == "!=" else condition
+
+    if operator == "datestartswith":
+        return type_coerce(expression, String).startswith(value, autoescape=True)
+
+    if operator == "contains":
+        text = type_coerce(expression, String)
+        if case == "s":
+            return func.instr(text, value) > 0
+        return func.lower(text).contains(value.lower(), autoescape=True)
+
+    if column.kind == NUMBER:
+        try:
+            value = float(value)
+        except ValueError:
+            return None
+    elif column.kind == DATETIME:
+        try:
+            value = datetime.datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    elif case == "i":
+        expression, value = func.lower(expression), value.lower()
+
+    return _compare(expression, operator, value)
+
+def filter_conditions(columns, filter_query):
+    """Translate a Dash filter query into SQL conditions; unknown columns and operators are ignored"""
+    by_id = {column.id: column for column in columns}
+    conditions = []
+    for column_id, case, operator, value in split_filter_query(filter_query):
+        column = by_id.get(column_id)
+        if column is None:
+            continue
+        condition = _filter_condition(column, case, operator, value)
+        if condition is not None:
+            conditions.append(condition)
+    return conditions
+
+def sort_keys(columns, sort_by, tiebreaker):
+    """
+    The (column, descending) pairs a page is ordered by.
+
+    The tiebreaker column, normally the primary key, always comes last so the
+    order is total and a keyset cursor identifies exactly one row.
+    """
+    by_id = {column.id: column for column in columns}
+    keys = []
+    for sort in sort_by or []:
+        column = by_id.get(sort.get("column_id"))
+        if column is not None and column is not tiebreaker:
+            keys.append((column, sort.get("direction") == "desc"))
+    keys.append((tiebreaker, False))
+    return keys
+
+def keyset_condition(keys, cursor):
+    """Rows strictly after the cursor in the order given by keys"""
+    alternatives = []
+    for position, (column, descending) in enumerate(keys):
+        value = column.from_json(cursor[position])
+        earlier_equal = [
+            previous.expression == previous.from_json(cursor[index])
+            for index, (previous, _) in enumerate(keys[:position])
+        ]
+        after = column.expression < value if descending else column.expression > value
+        alternatives.append(and_(*earlier_equal, after))
+    return or_(*alternatives)
+
+def fetch_page(query, columns, tiebreaker, page_current, page_size, sort_by, filter_query, state=None):
+    """
+    Read one page of a custom-paged DataTable.
+
+    query selects from the joined tables; the table's columns are added to it.
+    state is the dict returned by the previous call (kept in a dcc.Store). It
+    holds the row count for the current filter, so paging does not recount,
+    and the keyset cursor at which each visited page starts, so moving to the
+    next page or back to one already seen seeks on the index instead of
+    skipping rows with OFFSET. Pages reached any other way fall back to OFFSET.
+
+    Returns (records, page_count, state).
+    """
+    page_current = page_current or 0
+    keys = sort_keys(columns, sort_by, tiebreaker)
+    signature = [filter_query or "", page_size, [[column.id, descending] for column, descending in keys]]
+
+    state = state if state and state.get("signature") == signature else {"signature": signature, "cursors": {}}
+
+    query = query.filter(*filter_conditions(columns, filter_query))
+
+    if state.get("row_count") is None:
+        state["row_count"] = query.with_entities(func.count()).scalar() or 0
+    page_count = max(1, math.ceil(state["row_count"] / page_size))
+
+    selected = columns + ([tiebreaker] if tiebreaker not in columns else [])
+    page = query.with_entities(*(column.expression.label(column.id) for column in selected)).order_by(
+        *(column.expression.desc() if descending else column.expression.asc() for column, descending in keys)
+    )
+
+    cursor = state["cursors"].get(str(page_current))
+    if cursor is not None:
+        page = page.filter(keyset_condition(keys, cursor))
+    elif page_current > 0:
+        page = page.offset(page_current * page_size)
+
+    rows = page.limit(page_size).all()
+
+    # Remember where the following page starts
+    if len(rows) == page_size:
+        last = rows[-1]._mapping
+        state["cursors"][str(page_current + 1)] = [column.to_json(last[column.id]) for column, _ in keys]
+
+    records = [
+        {column.id: column.display(row._mapping[column.id]) for column in columns}
+        for row in rows
+    ]
+    return records, page_count, state
@@ -29,8 +29,13 @@ def init_db():
     from src.models.role import Role, UserRole
     from src.models.aircraft import Aircraft
     from src.models.flight import Flight, FlightSchedule
-    from src.models.booking import Booking
-    from src.models.rating import Rating
+    from src.models.booking import Booking, BookingDailyStats
+    from src.models.rating import Rating, RatingAggregate
+    from src.models.outbox import OutboxMessage
+    from src.models.kpi import KpiSnapshot
+    from src.models.audit import AuditEvent, ArchivedAuditEvent
+    # Registers the triggers that keep bookings.departure_time in step
+    import src.logic.itineraries
     
     # Create all tables
     Base.metadata.create_all(engine)
@@ -0,0 +1,98 @@
+import datetime
+import dash
+from dash import html, dcc, callback, clientside_callback, ClientsideFunction, Input, Output, State, MATCH, dash_table
+from src.utils.database import get_session
+from src.logic.flight_board import board_rows, current_board_version, day_bounds
+
+# How often a board applies the change events its page has received; this runs in the browser
+BOARD_EVENTS_APPLY_SECONDS = 1
+
+# How often the server checks a board for a new day or for changes the events missed
+BOARD_RESYNC_SECONDS = 60
+
+BOARD_COLUMNS = ["Departure", "Arrival", "Flight", "Route", "Aircraft", "Status", "Gate"]
+
+def _board_state(rows, version, day, days):
+    """What the board needs to remember between updates: its version and where each schedule sits in the table"""
+    return {
+        "version": version,
+        "day": day.isoformat(),
+        "days": days,
+        "index": {str(row.schedule_id): position for position, row in enumerate(rows)},
+    }
+
+def load_flight_board(session, day, days=1):
+    """Rows and initial state for a board covering days from day, plus the version they were read at"""
+    version = current_board_version(session)
+    rows = board_rows(session, *day_bounds(day, days))
+    return rows, _board_state(rows, version, day, days)
+
+def create_flight_board(board_id, rows, state, page_size=15):
+    """
+    A flight status table that keeps itself up to date.
+
+    Changes arrive over the page's server-sent event stream (see
+    assets/flight_board.js) and are patched into the rows in the browser.
+    The server only rebuilds the board when a schedule joins or leaves it,
+    when events were missed, or on the BOARD_RESYNC_SECONDS check for a
+    new day.
+    """
+    return html.Div([
+        dash_table.DataTable(
+            id={"type": "flight-board-table", "board": board_id},
+            data=[row.as_record() for row in rows],
+            columns=[{"name": column, "id": column} for column in BOARD_COLUMNS],
+            sort_action="native",
+            page_size=page_size,
+            style_cell={"textAlign": "left"},
+            style_header={"backgroundColor": "rgb(230, 230, 230)", "fontWeight": "bold"}
+        ),
+        dcc.Store(id={"type": "flight-board-state", "board": board_id}, data=state),
+        dcc.Store(id={"type": "flight-board-request", "board": board_id}),
+        dcc.Store(id={"type": "flight-board-reload", "board": board_id}),
+        dcc.Interval(id={"type": "flight-board-events", "board": board_id}, interval=BOARD_EVENTS_APPLY_SECONDS * 1000),
+        dcc.Interval(id={"type": "flight-board-resync", "board": board_id}, interval=BOARD_RESYNC_SECONDS * 1000)
+    ])
+
+# Runs in the browser: applies buffered events, or asks the server for a rebuild
+clientside_callback(
+    ClientsideFunction(namespace="flight_board", function_name="apply_events"),
+    [Output({"type": "flight-board-table", "board": MATCH}, "data"),
+     Output({"type": "flight-board-state", "board": MATCH}, "data"),
+     Output({"type": "flight-board-request", "board": MATCH}, "data")],
+    [Input({"type": "flight-board-events", "board": MATCH}, "n_intervals"),
+     Input({"type": "flight-board-reload", "board": MATCH}, "data")],
+    [State({"type": "flight-board-table", "board": MATCH}, "data"),
+     State({"type": "flight-board-state", "board": MATCH}, "data")],
+    prevent_initial_call=True
+)
+
+@callback(
+    Output({"type": "flight-board-reload", "board": MATCH}, "data"),
+    [Input({"type": "flight-board-request", "board": MATCH}, "data"),
+     Input({"type": "flight-board-resync", "board": MATCH}, "n_intervals")],
+    State({"type": "flight-board-state", "board": MATCH}, "data"),
+    prevent_initial_call=True
+)
+def reload_flight_board(request, n_intervals, state):
+    if not state:
+        return dash.no_update
+
+    ctx = dash.callback_context
+    resync = bool(ctx.triggered) and "flight-board-resync" in ctx.triggered[0]["prop_id"]
+
+    today = datetime.datetime.now().date()
+    session = get_session()
+    try:
+        # On the periodic check, rebuild only for a new day or if the events stopped arriving
+        if resync:
+            if state["day"] == today.isoformat() and current_board_version(session) <= state["version"]:
+                return dash.no_update
+
+        rows, state = load_flight_board(session, today, state["days"])
+        return {"data": [row.as_record() for row in rows], "state": state}
+    except Exception as e:
+        print(f"Error reloading flight board: {e}")
+        return dash.no_update
+    finally:
+        session.close()
@@ -0,0 +1,58 @@
+from sqlalchemy import inspect, text, select, update
+from sqlalchemy.schema import CreateColumn
+from src.utils.database import Base, engine, init_db
+from src.models.aircraft import Aircraft, parse_aip_info
+from src.logic.search import install_search_indexes
+from src.logic.flight_board import install_board_triggers
+from src.logic.itineraries import install_booking_departure_triggers
+
+def run_migrations():
+    """Bring an existing database up to date with the models"""
+    # Create any tables that do not exist yet
+    init_db()
+    
+    # create_all leaves existing tables alone, so add columns declared since
+    add_missing_columns()
+    
+    # Aircraft added before the typed specification columns only have them in the AIP info text
+    backfill_aircraft_specs()
+    
+    # create_all only indexes the tables it creates, so add indexes declared since
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    
+    # Full-text search indexes are SQLite virtual tables, which create_all does not know about
+    install_search_indexes(engine)
+    
+    # Change tracking for the live flight status board
+    install_board_triggers(engine)
+    
+    # Bookings carry their schedule's departure for the paged booking history
+    install_booking_departure_triggers(engine)
+
+def add_missing_columns():
+    """ALTER TABLE ... ADD COLUMN for every model column the database does not have yet"""
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    # New NOT NULL columns need a server_default for the rows already there
+                    definition = CreateColumn(column).compile(dialect=engine.dialect)
+                    connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {definition}"))
+
+def backfill_aircraft_specs():
+    """Parse the AIP info of aircraft whose typed specification columns were never filled"""
+    with engine.begin() as connection:
+        rows = connection.execute(select(Aircraft.id, Aircraft.aip_info).where(
+            Aircraft.aip_info.isnot(None),
+            Aircraft.capacity.is_(None),
+            Aircraft.range_km.is_(None),
+            Aircraft.max_altitude_ft.is_(None)
+        )).all()
+        for aircraft_id, aip_info in rows:
+            figures = parse_aip_info(aip_info)
+            if any(value is not None for value in figures.values()):
+                connection.execute(update(Aircraft).where(Aircraft.id == aircraft_id).values(**figures))
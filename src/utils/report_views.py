@@ -0,0 +1,118 @@
+import dash
+from dash import html, dcc, callback, Input, Output, MATCH
+import dash_bootstrap_components as dbc
+from functools import wraps
+from src.logic.reports import get_report_scheduler
+from src.utils.auth import has_role
+
+# How often an open report checks on a build in progress
+REPORT_POLL_MILLISECONDS = 500
+
+# Report renderers by name, for the refresh and cancel buttons
+_report_views = {}
+
+def cached_report(name, build, tables=(), role=None):
+    """
+    Decorator for report views rendered from a precomputed snapshot.
+
+    build(session) runs on the report workers and returns the report's data
+    (typically DataFrames); the decorated function receives that data and
+    only lays it out. The resulting view takes no arguments and never builds
+    the report itself: it shows the last snapshot and when it was computed,
+    and Refresh queues a rebuild whose progress the view follows, with the
+    option to cancel it.
+    """
+    def decorator(render):
+        get_report_scheduler().register(name, build, tables)
+        _report_views[name] = (render, role)
+
+        @wraps(render)
+        def view():
+            scheduler = get_report_scheduler()
+            snapshot = scheduler.snapshot(name)
+            job = scheduler.job(name)
+            if snapshot is None and job is None:
+                job = scheduler.submit(name)
+            return _report_layout(name, snapshot, job)
+        return view
+    return decorator
+
+def _report_id(kind, name):
+    return {"type": kind, "report": name}
+
+def _report_layout(name, snapshot, job):
+    status, progress, progress_style, cancel_style, refresh_disabled, polling = _report_state(snapshot, job)
+    return html.Div([
+        html.Div([
+            html.Small(status, id=_report_id("report-status", name), className="text-muted me-2"),
+            dbc.Button("Cancel", id=_report_id("report-cancel", name), color="outline-danger", size="sm",
+                       className="me-2", style=cancel_style),
+            dbc.Button("🔄 Refresh", id=_report_id("report-refresh", name), color="outline-secondary", size="sm",
+                       disabled=refresh_disabled)
+        ], className="d-flex justify-content-end align-items-center mb-2"),
+        dbc.Progress(id=_report_id("report-progress", name), value=progress, striped=True, animated=True,
+                     className="mb-3", style=progress_style),
+        dcc.Interval(id=_report_id("report-poll", name), interval=REPORT_POLL_MILLISECONDS, disabled=not polling),
+        html.Div(_report_content(name, snapshot, job), id=_report_id("report-content", name))
+    ])
+
+def _report_state(snapshot, job):
+    """Status line, progress bar value and style, cancel button style, refresh disabled, polling"""
+    hidden = {"display": "none"}
+    if job is not None:
+        expected = snapshot.seconds if snapshot else None
+        progress = job.progress(expected)
+        status = "Building report..." if job.started_at else "Waiting for a report worker..."
+        # With no previous build to go by, show a full animated bar instead of a guess
+        return status, 100 if progress is None else progress, {"height": "6px"}, None, True, True
+
+    if snapshot is None:
+        return "Not built yet", 0, hidden, hidden, False, False
+    status = f"Computed at {snapshot.computed_at.strftime('%Y-%m-%d %H:%M:%S')} in {snapshot.seconds:.2f}s"
+    return status, 0, hidden, hidden, False, False
+
+def _report_content(name, snapshot, job):
+    render, _ = _report_views[name]
+    if snapshot is not None:
+        return render(snapshot.data)
+    if job is not None:
+        return dbc.Alert("This report is being built and will appear here shortly.", color="info")
+    return dbc.Alert("This report could not be built. Press Refresh to try again.", color="danger")
+
+@callback(
+    [Output(_report_id("report-content", MATCH), "children"),
+     Output(_report_id("report-status", MATCH), "children"),
+     Output(_report_id("report-progress", MATCH), "value"),
+     Output(_report_id("report-progress", MATCH), "style"),
+     Output(_report_id("report-cancel", MATCH), "style"),
+     Output(_report_id("report-refresh", MATCH), "disabled"),
+     Output(_report_id("report-poll", MATCH), "disabled")],
+    [Input(_report_id("report-refresh", MATCH), "n_clicks"),
+     Input(_report_id("report-cancel", MATCH), "n_clicks"),
+     Input(_report_id("report-poll", MATCH), "n_intervals")],
+    prevent_initial_call=True
+)
+def update_report(refresh_clicks, cancel_clicks, n_intervals):
+    ctx = dash.callback_context
+    if not ctx.triggered:
+        return [dash.no_update] * 7
+
+    name = ctx.triggered_id["report"]
+    action = ctx.triggered_id["type"]
+    _, role = _report_views[name]
+    if action != "report-poll" and role and not has_role(role):
+        return [dash.no_update] * 7
+
+    scheduler = get_report_scheduler()
+    job = scheduler.job(name)
+    if action == "report-refresh":
+        job = scheduler.submit(name)
+    elif action == "report-cancel" and job is not None:
+        job.cancel()
+        job = None
+
+    snapshot = scheduler.snapshot(name)
+    status, progress, progress_style, cancel_style, refresh_disabled, polling = _report_state(snapshot, job)
+    # While a build runs the last snapshot stays on screen; the report is redrawn once the build finishes
+    content = dash.no_update if job is not None and snapshot is not None else _report_content(name, snapshot, job)
+    return content, status, progress, progress_style, cancel_style, refresh_disabled, not polling
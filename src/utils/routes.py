@@ -0,0 +1,50 @@
+import datetime
+import flask
+from src.utils.auth import has_role, get_user_roles
+from src.logic.exports import stream_bookings_csv, stream_bookings_parquet, parquet_available
+from src.logic.board_events import get_board_events
+
+# Plain Flask endpoints served alongside the Dash app
+routes = flask.Blueprint("routes", __name__)
+
+def _download(chunks, filename, mimetype):
+    """A streamed file download; chunks is consumed as the client reads"""
+    return flask.Response(
+        chunks,
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+@routes.route("/admin/export/bookings.<file_format>")
+def export_bookings(file_format):
+    """Every booking with its passenger, schedule and flight, for finance"""
+    if not has_role("admin"):
+        flask.abort(403)
+
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M")
+    if file_format == "csv":
+        return _download(stream_bookings_csv(), f"bookings-{stamp}.csv", "text/csv")
+    if file_format == "parquet":
+        if not parquet_available():
+            flask.abort(501, "Parquet export needs pyarrow installed")
+        return _download(stream_bookings_parquet(), f"bookings-{stamp}.parquet", "application/vnd.apache.parquet")
+    flask.abort(404)
+
+@routes.route("/events/flight-board")
+def flight_board_events():
+    """Server-sent flight board changes; one long-lived stream per browser tab"""
+    if not {"admin", "technical_staff"} & set(get_user_roles()):
+        flask.abort(403)
+
+    # A reconnecting EventSource sends the id of the last event it received
+    since = flask.request.headers.get("Last-Event-ID") or flask.request.args.get("since")
+    try:
+        since = int(since) if since is not None else None
+    except ValueError:
+        flask.abort(400)
+
+    return flask.Response(
+        get_board_events().stream(since),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )